@@ -0,0 +1,94 @@
+"""
+배경색 추정 벤치마크: 영역별 루프(기존 get_dominant_color) vs 일괄 처리(border_colors mean/median)
+
+단색 배경 패치 위에 테두리까지 닿는 글자를 그린 합성 이미지를 만들고,
+처리 시간과 실제 배경색 대비 오차(채널 평균 절대 오차)를 비교합니다.
+
+사용법:
+    python -m benchmarks.color_estimation --regions 50,500,2000
+"""
+import time
+import argparse
+import cv2
+import numpy as np
+
+from src.color_utils import box_rects, border_colors, get_text_color
+
+
+def legacy_dominant_color(image_cv2, border=5):
+    """
+    기존 구현: 영역마다 네 변을 잘라 펼치고 합친 뒤 평균
+    """
+    if image_cv2 is None or image_cv2.size == 0:
+        return (0, 0, 0)
+    h, w = image_cv2.shape[:2]
+    if h <= border * 2 or w <= border * 2:
+        avg_bgr = np.mean(image_cv2, axis=(0, 1))
+    else:
+        border_pixels = np.concatenate([
+            image_cv2[:border, :].reshape(-1, 3), image_cv2[h - border:, :].reshape(-1, 3),
+            image_cv2[:, :border].reshape(-1, 3), image_cv2[:, w - border:].reshape(-1, 3),
+        ])
+        avg_bgr = np.mean(border_pixels, axis=0)
+    return tuple(avg_bgr.astype(int)[::-1])
+
+
+def make_case(count, seed=0):
+    """
+    격자 모양으로 배경 패치를 깔고, 패치마다 박스 가장자리까지 닿는 글자를 그립니다.
+    Returns: 이미지, 박스 리스트, 실제 배경색(RGB) 배열
+    """
+    rng = np.random.default_rng(seed)
+    cols = int(np.ceil(np.sqrt(count)))
+    cell_w, cell_h = 220, 60
+    image = np.zeros((cell_h * cols, cell_w * cols, 3), np.uint8)
+    boxes, truth = [], []
+    for i in range(count):
+        x, y = (i % cols) * cell_w, (i // cols) * cell_h
+        bg = rng.integers(0, 256, 3)
+        image[y:y + cell_h, x:x + cell_w] = bg
+        fg = (255 - bg).tolist()
+        # 패딩(5px) 테두리 안쪽까지 글자가 걸치도록 박스 경계 근처에 굵게 그림
+        cv2.putText(image, "Sample", (x + 2, y + cell_h - 12), cv2.FONT_HERSHEY_SIMPLEX, 1.4, fg, 4)
+        bx0, by0, bx1, by1 = x + 10, y + 10, x + cell_w - 10, y + cell_h - 10
+        boxes.append(np.array([[bx0, by0], [bx1, by0], [bx1, by1], [bx0, by1]], dtype=np.int32))
+        truth.append(bg[::-1])
+    return image, boxes, np.array(truth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background color estimation benchmark")
+    parser.add_argument("--regions", default="50,500,2000", help="Region counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'regions':>7} | {'method':<16} | {'best (ms)':>9} | {'mean abs err':>12} | {'text color flips':>16}")
+    for count in [int(c) for c in args.regions.split(",")]:
+        image, boxes, truth = make_case(count)
+        h, w = image.shape[:2]
+        truth_text = get_text_color(truth)
+
+        def legacy():
+            colors = []
+            for x0, y0, x1, y1 in box_rects(boxes, 5, w, h):
+                colors.append(legacy_dominant_color(image[y0:y1, x0:x1]))
+            return np.array(colors)
+
+        methods = {
+            "loop (legacy)": legacy,
+            "batched mean": lambda: border_colors(image, box_rects(boxes, 5, w, h), estimator="mean"),
+            "batched median": lambda: border_colors(image, box_rects(boxes, 5, w, h), estimator="median"),
+        }
+        for name, run in methods.items():
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                colors = run()
+                times.append(time.perf_counter() - start)
+            error = np.abs(colors.astype(int) - truth).mean()
+            flips = int((get_text_color(colors) != truth_text).any(axis=1).sum())
+            print(f"{count:>7} | {name:<16} | {min(times) * 1000:>9.2f} | {error:>12.1f} | {flips:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+탐지 백엔드 벤치마크: PaddleOCR vs ONNX Runtime (fp32 / int8)
+
+같은 이미지들에 대해 백엔드마다 새 프로세스에서 다음을 측정합니다.
+    - 모델 로드 시간 (import 포함)
+    - 이미지당 탐지+인식 지연 (중앙값 / p95, 첫 실행 제외)
+    - 최대 RSS (프로세스 전체)
+    - 정확도: 합성 이미지(기본)는 정답 배치와, --images로 준 실제 이미지는 첫 번째 백엔드 결과와 비교
+        box recall / precision (IoU 0.5), 일치한 박스의 텍스트 완전 일치율, 문자 오류율(CER)
+
+ONNX 백엔드는 onnxruntime과 PP-OCR에서 내보낸 모델이 필요합니다. (ONNX_DET_MODEL / ONNX_REC_MODEL / ONNX_REC_DICT)
+
+사용법:
+    python -m benchmarks.detector_backends --backends paddleocr,onnx,onnx-int8 --threads 4
+    python -m benchmarks.detector_backends --images samples/ --repeat 3
+"""
+import os
+import sys
+import json
+import time
+import glob
+import argparse
+import tempfile
+import subprocess
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child(args):
+    """
+    한 백엔드로 모든 이미지를 감지하고 결과를 JSON 한 줄로 출력합니다.
+    """
+    from src.telemetry import peak_rss
+
+    start = time.perf_counter()
+    from src.detector import create_detector
+
+    kwargs = {'min_confidence': args.min_confidence}
+    if args.child.startswith("onnx"):
+        kwargs.update(int8=args.child == "onnx-int8", intra_op_threads=args.threads, inter_op_threads=1)
+    else:
+        kwargs['lang'] = args.lang
+    detector = create_detector("onnx" if args.child.startswith("onnx") else "paddleocr", **kwargs).warmup()
+    load_seconds = time.perf_counter() - start
+
+    with open(args.manifest, encoding="utf-8") as f:
+        paths = json.load(f)
+    images = [cv2.imread(path) for path in paths]
+    detector.detect(images[0])  # 첫 실행 비용(메모리 할당, 그래프 최적화) 제외
+
+    times, results = [], []
+    for image in images:
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            regions = detector.detect(image)
+            times.append(time.perf_counter() - t0)
+        results.append({'boxes': regions.polygons.tolist(), 'texts': list(regions.texts)})
+    print(json.dumps({
+        'load_seconds': load_seconds,
+        'median_ms': float(np.median(times)) * 1000,
+        'p95_ms': float(np.percentile(times, 95)) * 1000,
+        'peak_rss_mb': peak_rss() / 1024 ** 2,
+        'results': results,
+    }, ensure_ascii=False))
+
+
+def edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def accuracy(predicted, reference):
+    """
+    이미지별 (박스, 텍스트)를 정답(또는 기준 백엔드)과 IoU 0.5로 짝지어 비교합니다.
+    """
+    from src.tiling import polygon_overlap
+
+    matched = exact = predicted_total = reference_total = 0
+    errors = characters = 0
+    for pred, ref in zip(predicted, reference):
+        pred_boxes = [np.array(b, dtype=np.int32) for b in pred['boxes']]
+        ref_boxes = [np.array(b, dtype=np.int32) for b in ref['boxes']]
+        predicted_total += len(pred_boxes)
+        reference_total += len(ref_boxes)
+        used = set()
+        for ref_box, ref_text in zip(ref_boxes, ref['texts']):
+            characters += len(ref_text)
+            best, best_iou = None, 0.5
+            for i, pred_box in enumerate(pred_boxes):
+                if i not in used:
+                    iou = polygon_overlap(ref_box, pred_box)[0]
+                    if iou >= best_iou:
+                        best, best_iou = i, iou
+            if best is None:
+                errors += len(ref_text)
+                continue
+            used.add(best)
+            matched += 1
+            pred_text = pred['texts'][best]
+            exact += pred_text.strip().lower() == ref_text.strip().lower()
+            errors += edit_distance(pred_text.strip().lower(), ref_text.strip().lower())
+    return {
+        'recall': matched / reference_total if reference_total else 1.0,
+        'precision': matched / predicted_total if predicted_total else 1.0,
+        'text_exact': exact / matched if matched else 0.0,
+        'cer': errors / characters if characters else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detector backend benchmark (PaddleOCR vs ONNX Runtime)")
+    parser.add_argument("--backends", default="paddleocr,onnx,onnx-int8", help="paddleocr, onnx, onnx-int8")
+    parser.add_argument("--images", default=None, help="Image file, directory or glob (default: synthetic images)")
+    parser.add_argument("--sizes", default="1280x720,1920x1080", help="[synthetic] Image sizes WxH")
+    parser.add_argument("--regions", type=int, default=30, help="[synthetic] Text lines per image")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0, help="[onnx] intra-op threads (0: onnxruntime default)")
+    parser.add_argument("--lang", default="en", help="[paddleocr] OCR language")
+    parser.add_argument("--min-confidence", type=float, default=0.5)
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--manifest", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return 0
+
+    with tempfile.TemporaryDirectory() as workdir:
+        truth = None
+        if args.images:
+            if os.path.isdir(args.images):
+                paths = sorted(p for p in glob.glob(os.path.join(args.images, "*"))
+                               if os.path.splitext(p)[1].lower() in (".png", ".jpg", ".jpeg", ".webp", ".bmp"))
+            else:
+                paths = sorted(glob.glob(args.images))
+        else:
+            from benchmarks.pipeline_suite import make_layout_image
+
+            paths, truth = [], []
+            for index, size in enumerate(args.sizes.split(",")):
+                width, height = (int(v) for v in size.lower().split("x"))
+                image, layout = make_layout_image(width, height, args.regions, seed=index)
+                paths.append(os.path.join(workdir, f"synthetic_{index}.png"))
+                cv2.imwrite(paths[-1], image)
+                truth.append({'boxes': [item['box'].tolist() for item in layout], 'texts': [item['text'] for item in layout]})
+        if not paths:
+            raise SystemExit(f"No images found: {args.images}")
+        manifest = os.path.join(workdir, "manifest.json")
+        with open(manifest, "w", encoding="utf-8") as f:
+            json.dump(paths, f)
+
+        backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+        print(f"{len(paths)} images, reference: {'synthetic ground truth' if truth else backends[0]}")
+        print(f"{'backend':<10} | {'load s':>6} | {'median ms':>9} | {'p95 ms':>8} | {'peak MB':>7} | "
+              f"{'recall':>6} | {'prec.':>6} | {'text ok':>7} | {'CER':>6}")
+        reference = truth
+        for backend in backends:
+            cmd = [sys.executable, "-m", "benchmarks.detector_backends", "--child", backend, "--manifest", manifest,
+                   "--repeat", str(args.repeat), "--threads", str(args.threads), "--lang", args.lang,
+                   "--min-confidence", str(args.min_confidence)]
+            completed = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+            if completed.returncode != 0:
+                print(f"{backend:<10} | failed: {completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else completed.returncode}")
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            if reference is None:
+                reference = result['results']
+            score = accuracy(result['results'], reference)
+            print(f"{backend:<10} | {result['load_seconds']:>6.2f} | {result['median_ms']:>9.1f} | {result['p95_ms']:>8.1f} | "
+                  f"{result['peak_rss_mb']:>7.0f} | {score['recall']:>6.2f} | {score['precision']:>6.2f} | "
+                  f"{score['text_exact']:>7.2f} | {score['cer']:>6.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+여러 언어 출력 벤치마크: 언어마다 파이프라인 전체 실행 vs 한 번 탐지/Inpainting 후 언어별 렌더링(target_langs)
+
+합성 이미지 한 장을 파일로 만든 뒤 같은 언어 목록에 대해
+    - separate: 언어마다 run() (탐지, Inpainting, 번역, 렌더링, 저장을 언어 수만큼 반복)
+    - fanout:   run(target_langs=...) 한 번
+을 실행하고 전체 시간, 탐지/Inpainting 호출 수, 번역 요청 수를 비교합니다.
+탐지/Inpainting/번역은 스텁 지연으로 실제 모델/API 왕복을 흉내 냅니다. (렌더링은 실제 TextRenderer)
+
+사용법:
+    python -m benchmarks.language_fanout --langs Japanese,English,Chinese --detect-latency 1.0 --inpaint-latency 2.0
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+import cv2
+
+from benchmarks.pipeline_suite import make_layout_image, LayoutDetector
+from src.pipeline import VisualTranslatorPipeline, language_output_path
+from src.renderer import TextRenderer
+from src.stubs import StubInpainter, StubTranslator
+
+
+class CountingDetector(LayoutDetector):
+    """
+    파일에서 읽은 이미지에 대해서도 합성 배치를 돌려주는 탐지기 (호출 수 기록)
+    """
+
+    def __init__(self, layout, latency=0.0):
+        super().__init__({}, latency)
+        self.layout = layout
+        self.calls = 0
+
+    def detect(self, image):
+        self.calls += 1
+        self.layouts = {id(image): self.layout}
+        return super().detect(image)
+
+
+class CountingInpainter(StubInpainter):
+    calls = 0
+
+    def inpaint(self, image, mask):
+        self.calls += 1
+        return super().inpaint(image, mask)
+
+
+def run_mode(mode, args, image_path, layout, langs, workdir):
+    detector = CountingDetector(layout, latency=args.detect_latency)
+    inpainter = CountingInpainter(latency=args.inpaint_latency)
+    translator = StubTranslator(latency=args.translate_latency)
+    renderer = TextRenderer(font_path=args.font) if args.font else TextRenderer()
+    pipeline = VisualTranslatorPipeline(detector, inpainter, translator, renderer)
+    output = os.path.join(workdir, f"{mode}.png")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "separate":
+            for lang in langs:
+                translator.target_lang = lang
+                pipeline.run(image_path, language_output_path(output, lang))
+        else:
+            pipeline.run(image_path, output, target_langs=langs)
+    seconds = time.perf_counter() - start
+    outputs = [cv2.imread(language_output_path(output, lang)) for lang in langs]
+    return seconds, detector.calls, inpainter.calls, translator.calls, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-language runs vs one run with target_langs")
+    parser.add_argument("--langs", default="Japanese,English,Chinese", help="Comma-separated target languages")
+    parser.add_argument("--size", default="1920x1080", help="Image size WxH")
+    parser.add_argument("--regions", type=int, default=40)
+    parser.add_argument("--detect-latency", type=float, default=1.0, help="Stub detection latency (s)")
+    parser.add_argument("--inpaint-latency", type=float, default=2.0, help="Stub inpainting latency (s, e.g. remote API)")
+    parser.add_argument("--translate-latency", type=float, default=0.5, help="Stub latency per translate_batch call (s)")
+    parser.add_argument("--font", default=None, help="Font path for TextRenderer")
+    args = parser.parse_args()
+
+    langs = [lang.strip() for lang in args.langs.split(",") if lang.strip()]
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    image, layout = make_layout_image(width, height, args.regions)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        image_path = os.path.join(workdir, "input.png")
+        cv2.imwrite(image_path, image)
+        print(f"{len(langs)} languages, {width}x{height}, {args.regions} regions")
+        print(f"{'mode':<9} | {'total s':>7} | {'per lang s':>10} | {'detect':>6} | {'inpaint':>7} | {'translate':>9}")
+        results = {}
+        for mode in ("separate", "fanout"):
+            seconds, detects, inpaints, translates, outputs = run_mode(mode, args, image_path, layout, langs, workdir)
+            results[mode] = outputs
+            print(f"{mode:<9} | {seconds:>7.2f} | {seconds / len(langs):>10.2f} | {detects:>6} | {inpaints:>7} | {translates:>9}")
+        same = all(a is not None and b is not None and (a == b).all() for a, b in zip(results["separate"], results["fanout"]))
+        print(f"same outputs: {same}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+메모리 예산 벤치마크: 일반 모드 vs 저메모리 모드의 단계별 최대 RSS
+
+큰 합성 이미지(기본 50MP)를 파일로 만든 뒤, 모드마다 새 프로세스에서
+decode → detect → build_mask → inpaint → translate → render → save를 실행하고
+단계별 최대 RSS(telemetry.track_memory)와 처리 시간, 결과 차이를 비교합니다.
+(탐지/번역은 스텁, Inpainting은 OpenCVInpainter, 렌더링은 TextRenderer)
+
+사용법:
+    python -m benchmarks.memory_budget --size 8660x5773 --regions 300 --font C:/Windows/Fonts/msgothic.ttc
+"""
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+import subprocess
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ["decode", "detection", "mask", "inpainting", "translation", "rendering", "save"]
+
+
+class FixedDetector:
+    """
+    합성할 때 저장한 정답 영역을 돌려주는 탐지기
+    """
+
+    def __init__(self, layout_path):
+        with open(layout_path, encoding="utf-8") as f:
+            self.layout = json.load(f)
+
+    def detect(self, image):
+        return [{'box': np.array(item['box'], dtype=np.int32), 'text': item['text'], 'confidence': 0.99}
+                for item in self.layout]
+
+
+def child(args):
+    """
+    한 가지 모드로 한 번 실행하고 결과를 JSON 한 줄로 출력합니다.
+    """
+    from src.pipeline import VisualTranslatorPipeline
+    from src.inpainter import OpenCVInpainter
+    from src.renderer import TextRenderer
+    from src.stubs import StubTranslator
+    from src.telemetry import telemetry
+
+    telemetry.track_memory = True
+    renderer = TextRenderer(font_path=args.font) if args.font else TextRenderer()
+    budget = 1 if args.child == "low" else 0
+    pipeline = VisualTranslatorPipeline(FixedDetector(args.layout), OpenCVInpainter(), StubTranslator(), renderer,
+                                        memory_budget_mb=budget)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ctx = pipeline.run(args.image, args.output)
+    print(json.dumps({
+        "seconds": time.perf_counter() - start,
+        "memory": ctx.get('memory', {}),
+        "low_memory": bool(ctx.get('low_memory')),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Low-memory mode benchmark")
+    parser.add_argument("--size", default="8660x5773", help="Image size WxH (default ~50MP)")
+    parser.add_argument("--regions", type=int, default=300)
+    parser.add_argument("--font", default=None)
+    parser.add_argument("--child", choices=["normal", "low"], help=argparse.SUPPRESS)
+    parser.add_argument("--image", help=argparse.SUPPRESS)
+    parser.add_argument("--layout", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return 0
+
+    from benchmarks.pipeline_suite import make_layout_image
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    with tempfile.TemporaryDirectory() as workdir:
+        image, layout = make_layout_image(width, height, args.regions)
+        image_path = os.path.join(workdir, "input.png")
+        layout_path = os.path.join(workdir, "layout.json")
+        cv2.imwrite(image_path, image, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+        with open(layout_path, "w", encoding="utf-8") as f:
+            json.dump([{'box': item['box'].tolist(), 'text': item['text']} for item in layout], f)
+        del image
+        print(f"Input: {width}x{height} ({width * height / 1e6:.0f} MP, {width * height * 3 / 1024 ** 2:.0f} MB as BGR), "
+              f"{args.regions} regions")
+
+        results = {}
+        for mode in ("normal", "low"):
+            output_path = os.path.join(workdir, f"{mode}.png")
+            cmd = [sys.executable, "-m", "benchmarks.memory_budget", "--child", mode, "--image", image_path,
+                   "--layout", layout_path, "--output", output_path]
+            if args.font:
+                cmd += ["--font", args.font]
+            completed = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+            if completed.returncode != 0:
+                print(completed.stderr[-2000:])
+                raise RuntimeError(f"{mode} run failed")
+            results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+            results[mode]["output"] = output_path
+
+        print(f"{'stage':<12} | {'normal MB':>9} | {'low MB':>9}")
+        for stage in STAGES:
+            normal, low = results["normal"]["memory"].get(stage), results["low"]["memory"].get(stage)
+            print(f"{stage:<12} | {normal if normal is not None else '-':>9} | {low if low is not None else '-':>9}")
+        peaks = [max(results[mode]["memory"].values()) for mode in ("normal", "low")]
+        print(f"{'max':<12} | {peaks[0]:>9.1f} | {peaks[1]:>9.1f}")
+        print(f"{'seconds':<12} | {results['normal']['seconds']:>9.2f} | {results['low']['seconds']:>9.2f}")
+
+        normal = cv2.imread(results["normal"]["output"]).astype(np.int16)
+        low = cv2.imread(results["low"]["output"]).astype(np.int16)
+        diff = np.abs(normal - low).max(axis=2)
+        print(f"Output difference: mean {diff.mean():.3f}, max {diff.max()}, "
+              f"pixels > 8: {np.count_nonzero(diff > 8) / diff.size:.4%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
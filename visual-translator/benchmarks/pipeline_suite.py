@@ -0,0 +1,241 @@
+"""
+전체 파이프라인 오프라인 벤치마크 (PaddleOCR 모델 / OpenAI 키 / Stability 키 불필요)
+
+해상도 x 영역 수 조합마다 글자 배치를 알고 있는 합성 이미지를 만들고,
+결정적인 스텁(탐지/번역, 선택적으로 Inpainting) + 실제 OpenCVInpainter / TextRenderer로
+detect → build_mask → inpaint → translate → render를 실행해서 다음을 출력합니다.
+    - 단계별 지연 시간 (반복 실행의 중앙값)
+    - 처리량 (이미지/초, 메가픽셀/초)
+    - 최대 메모리 (tracemalloc 최대 할당량 = Python/NumPy 배열 기준, 시간 측정과 별도 실행)
+    - 탐지된 영역 수 (합성 배치의 정답 개수와 비교)
+
+탐지기:
+    layout - 합성 때 기록한 정답 박스를 그대로 돌려줌 (완전히 결정적, 기본값)
+    stub   - src.stubs.StubDetector (이미지에서 글자 덩어리를 실제로 찾음)
+
+기준선(baseline) 비교:
+    --save-baseline FILE 로 결과를 저장하고, 이후 --baseline FILE 로 비교합니다.
+    단계 시간 또는 최대 메모리가 허용 범위(--tolerance, 작은 값은 --min-delta-ms)를 넘게 늘면
+    REGRESSION을 출력하고 종료 코드 1로 끝납니다.
+
+사용법:
+    python -m benchmarks.pipeline_suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.pipeline_suite --baseline benchmarks/baseline.json
+    python -m benchmarks.pipeline_suite --sizes 1920x1080 --regions 50 --translate-latency 0.3 --inpainter stub
+"""
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+import contextlib
+import cv2
+import numpy as np
+
+from src.pipeline import VisualTranslatorPipeline
+from src.inpainter import OpenCVInpainter
+from src.renderer import TextRenderer
+from src.stubs import StubDetector, StubInpainter, StubTranslator
+
+STAGES = ["detection", "mask", "inpainting", "translation", "rendering"]
+WORDS = ["SALE", "menu", "coffee", "Open 24h", "price", "Tea", "noodle", "special", "new", "event", "Floor 3"]
+
+
+def make_layout_image(width, height, regions, seed=0):
+    """
+    격자 칸마다 텍스트 한 줄을 그린 이미지와 정답 영역 리스트를 만듭니다.
+    (배경은 그라데이션 + 잡음이라 Inpainting이 실제 사진과 비슷하게 일함)
+    """
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(150, 230, width, dtype=np.float32)[None, :, None]
+    image = np.clip(gradient + rng.normal(0, 6, (height, width, 3)), 0, 255).astype(np.uint8)
+
+    cols = max(1, int(np.ceil(np.sqrt(regions * width / height))))
+    rows = int(np.ceil(regions / cols))
+    cell_w, cell_h = width // cols, height // rows
+    layout = []
+    for i in range(regions):
+        x, y = (i % cols) * cell_w, (i // cols) * cell_h
+        text = " ".join(rng.choice(WORDS, size=int(rng.integers(1, 3))))
+        # 칸 안에 들어가는 가장 큰 글자 크기 (칸 높이의 절반 이하)
+        scale = 4.0
+        while scale > 0.3:
+            thickness = max(1, int(scale * 1.5))
+            (tw, th), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+            if tw <= cell_w * 0.85 and th + baseline <= cell_h * 0.5:
+                break
+            scale *= 0.9
+        ox, oy = x + (cell_w - tw) // 2, y + (cell_h + th) // 2
+        color = (20, 20, 20) if i % 3 else (200, 40, 40)
+        cv2.putText(image, text, (ox, oy), cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness, cv2.LINE_AA)
+        x0, y0, x1, y1 = ox - 2, oy - th - 2, ox + tw + 2, oy + baseline + 2
+        layout.append({
+            'box': np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.int32),
+            'text': text,
+            'confidence': 0.99,
+        })
+    return image, layout
+
+
+class LayoutDetector:
+    """
+    합성 이미지의 정답 영역을 돌려주는 탐지기 (latency: 호출당 지연 초)
+    """
+
+    def __init__(self, layouts, latency=0.0):
+        self.layouts = layouts
+        self.latency = latency
+
+    def detect(self, image):
+        time.sleep(self.latency)
+        return [dict(item, box=item['box'].copy()) for item in self.layouts[id(image)]]
+
+
+def build_pipeline(args, layouts):
+    if args.detector == "layout":
+        detector = LayoutDetector(layouts, latency=args.detect_latency)
+    else:
+        detector = StubDetector(latency=args.detect_latency)
+    if args.inpainter == "opencv":
+        inpainter = OpenCVInpainter()
+    else:
+        inpainter = StubInpainter(latency=args.inpaint_latency)
+    translator = StubTranslator(latency=args.translate_latency)
+    renderer = TextRenderer(font_path=args.font) if args.font else TextRenderer()
+    return VisualTranslatorPipeline(detector, inpainter, translator, renderer)
+
+
+def run_once(pipeline, image):
+    """
+    파이프라인 단계를 한 번 실행하고 (단계별 지연, 전체 시간, 영역 수)를 반환합니다.
+    """
+    # 단계마다 찍는 로그는 측정에 방해되므로 숨김
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        ctx = pipeline.detect(image, debug=False)
+        pipeline.build_mask(ctx)
+        pipeline.inpaint(ctx)
+        pipeline.translate(ctx)
+        pipeline.render(ctx)
+        pipeline.result_array(ctx)
+        total = time.perf_counter() - start
+    return ctx['latency'], total, len(ctx['regions'])
+
+
+def run_case(args, width, height, regions):
+    image, layout = make_layout_image(width, height, regions, seed=args.seed)
+    pipeline = build_pipeline(args, {id(image): layout})
+
+    run_once(pipeline, image)  # 폰트 로드 등 첫 실행 비용 제외
+    stage_times = {stage: [] for stage in STAGES}
+    totals = []
+    for _ in range(args.repeat):
+        latency, total, found = run_once(pipeline, image)
+        for stage in STAGES:
+            stage_times[stage].append(latency.get(stage, 0.0))
+        totals.append(total)
+
+    tracemalloc.start()
+    run_once(pipeline, image)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = float(np.median(totals))
+    return {
+        'case': f"{width}x{height}/{regions}",
+        'expected_regions': regions,
+        'found_regions': found,
+        'stages_ms': {stage: float(np.median(times)) * 1000 for stage, times in stage_times.items()},
+        'total_ms': total * 1000,
+        'total_p95_ms': float(np.percentile(totals, 95)) * 1000,
+        'images_per_sec': 1.0 / total,
+        'megapixels_per_sec': width * height / 1e6 / total,
+        'peak_mb': peak / 1024 ** 2,
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """
+    기준선보다 느려지거나 메모리를 더 쓰는 항목을 찾습니다. Returns: 회귀 설명 리스트
+    """
+    regressions = []
+    previous = {item['case']: item for item in baseline['results']}
+    for result in results:
+        base = previous.get(result['case'])
+        if base is None:
+            continue
+        metrics = [(f"{stage} ms", result['stages_ms'][stage], base['stages_ms'].get(stage, 0.0), min_delta_ms)
+                   for stage in STAGES]
+        metrics.append(("total ms", result['total_ms'], base['total_ms'], min_delta_ms))
+        metrics.append(("peak MB", result['peak_mb'], base['peak_mb'], 1.0))
+        for name, value, old, floor in metrics:
+            if value > old * (1 + tolerance) and value - old > floor:
+                regressions.append(f"{result['case']} {name}: {old:.1f} -> {value:.1f} (+{(value / old - 1) * 100 if old else 0:.0f}%)")
+        if result['found_regions'] != base['found_regions']:
+            regressions.append(f"{result['case']} regions: {base['found_regions']} -> {result['found_regions']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark")
+    parser.add_argument("--sizes", default="800x600,1920x1080,3840x2160", help="Image sizes WxH")
+    parser.add_argument("--regions", default="10,50,200", help="Region counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--detector", choices=["layout", "stub"], default="layout")
+    parser.add_argument("--inpainter", choices=["opencv", "stub"], default="opencv")
+    parser.add_argument("--detect-latency", type=float, default=0.0, help="Simulated detector latency (s)")
+    parser.add_argument("--translate-latency", type=float, default=0.0, help="Simulated translation round trip (s)")
+    parser.add_argument("--inpaint-latency", type=float, default=0.0, help="[stub inpainter] Simulated latency (s)")
+    parser.add_argument("--font", default=None, help="Font for TextRenderer (default: renderer default)")
+    parser.add_argument("--json", default=None, help="Write results to this JSON file")
+    parser.add_argument("--save-baseline", default=None, help="Save results as a baseline JSON file")
+    parser.add_argument("--baseline", default=None, help="Compare against a baseline and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown / memory growth")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    sizes = [tuple(int(v) for v in size.lower().split("x")) for size in args.sizes.split(",")]
+    counts = [int(c) for c in args.regions.split(",")]
+
+    header = " | ".join(f"{stage[:9]:>9}" for stage in STAGES)
+    print(f"{'case':<16} | {'regions':>9} | {header} | {'total ms':>8} | {'img/s':>6} | {'MP/s':>6} | {'peak MB':>7}")
+    results = []
+    for width, height in sizes:
+        for regions in counts:
+            result = run_case(args, width, height, regions)
+            results.append(result)
+            stages = " | ".join(f"{result['stages_ms'][stage]:>9.1f}" for stage in STAGES)
+            print(f"{result['case']:<16} | {result['found_regions']:>4}/{regions:<4} | {stages} | {result['total_ms']:>8.1f} | "
+                  f"{result['images_per_sec']:>6.2f} | {result['megapixels_per_sec']:>6.1f} | {result['peak_mb']:>7.1f}")
+
+    report = {
+        'config': {k: v for k, v in vars(args).items() if k not in ("json", "save_baseline", "baseline")},
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(), 'opencv': cv2.__version__},
+        'results': results,
+    }
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Saved results to {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get('config') != report['config']:
+            print("Warning: baseline was recorded with different options; comparing matching cases only.")
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\nREGRESSION ({len(regressions)}) against {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+영역 자료구조 벤치마크: 영역별 dict 리스트(기존) vs RegionBatch(배열)
+
+영역 수별로 파이프라인이 영역마다 하던 부가 작업만 떼어 비교합니다. (Inpainting / 글자 레이어 생성 제외)
+    - 마스크: 여백 사각형 계산 + 글자색 기록 + fillPoly
+    - 렌더 배치: 회전 각도 / 중심 / 레이어 크기 계산
+    - 스트림 갱신: 바뀐 사각형과 겹치는 영역 제거 + 새 영역 좌표 이동 후 합치기
+두 방식의 결과(마스크, 배치 값)가 같은지도 확인합니다.
+
+사용법:
+    python -m benchmarks.region_batch --regions 100,1000,10000
+"""
+import sys
+import time
+import argparse
+import cv2
+import numpy as np
+
+from src.color_utils import box_rects
+from src.regions import RegionBatch
+
+
+def make_regions(count, width, height, seed=0):
+    """
+    이미지 안에 흩어진 (일부는 기울어진) 사각형 영역 dict 리스트
+    """
+    rng = np.random.default_rng(seed)
+    regions = []
+    for i in range(count):
+        w, h = int(rng.integers(20, 200)), int(rng.integers(10, 40))
+        x, y = int(rng.integers(0, width - w)), int(rng.integers(0, height - h - 10))
+        tilt = int(rng.integers(-8, 9)) if i % 5 == 0 else 0
+        regions.append({
+            'box': np.array([[x, y], [x + w, y + tilt], [x + w, y + h + tilt], [x, y + h]], dtype=np.int32),
+            'text': f"text {i}",
+            'confidence': 0.99,
+        })
+    return regions
+
+
+def with_dicts(regions, colors, width, height, changed):
+    boxes = [item['box'] for item in regions]
+    rects = box_rects(boxes, 5, width, height)
+    for item, color in zip(regions, colors):
+        item['text_color'] = tuple(int(v) for v in color)
+    mask = np.zeros((height, width), np.uint8)
+    cv2.fillPoly(mask, boxes, 255)
+
+    layout = []
+    for item in regions:
+        box = item['box']
+        vec = box[1] - box[0]
+        size = (int(np.linalg.norm(box[1] - box[0])), int(np.linalg.norm(box[3] - box[0])))
+        center = (int(np.mean(box[:, 0])), int(np.mean(box[:, 1])))
+        layout.append((-np.degrees(np.arctan2(vec[1], vec[0])), center, size, item['text_color']))
+
+    kept = regions
+    for x0, y0, x1, y1 in changed:
+        kept = [item for item in kept
+                if not (item['box'][:, 0].min() < x1 and x0 < item['box'][:, 0].max() and
+                        item['box'][:, 1].min() < y1 and y0 < item['box'][:, 1].max())]
+        for item in regions[:10]:
+            kept.append(dict(item, box=item['box'] + np.array([x0, y0], dtype=item['box'].dtype)))
+    return rects, mask, layout, len(kept)
+
+
+def with_batch(regions, colors, width, height, changed):
+    rects = regions.rects(5, width, height)
+    regions.text_colors = colors
+    mask = np.zeros((height, width), np.uint8)
+    cv2.fillPoly(mask, list(regions.polygons), 255)
+
+    layout = (-regions.angles, regions.centers, np.stack([regions.widths, regions.heights], axis=1), regions.text_colors)
+
+    kept = regions
+    new = regions.select(slice(0, 10))
+    for x0, y0, x1, y1 in changed:
+        bx0, by0, bx1, by1 = kept.bounds.T
+        kept = kept.select(~((bx0 < x1) & (x0 < bx1) & (by0 < y1) & (y0 < by1)))
+        kept = RegionBatch.concatenate([kept, new.offset(x0, y0)])
+    return rects, mask, layout, len(kept)
+
+
+def best(setup, fn, repeat):
+    """
+    setup()으로 새 입력을 만든 뒤 fn(입력)만 잰 최소 시간 (입력 생성/변환 시간은 제외)
+    """
+    times = []
+    for _ in range(repeat):
+        inputs = setup()
+        start = time.perf_counter()
+        result = fn(inputs)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-region dicts vs RegionBatch")
+    parser.add_argument("--regions", default="100,1000,10000", help="Region counts")
+    parser.add_argument("--size", default="3840x2160", help="Image size WxH")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    changed = [(100, 100, 600, 400), (2000, 800, 2600, 1200), (3000, 1500, 3600, 2000)]
+    print(f"{'regions':>8} | {'dicts ms':>9} | {'batch ms':>9} | {'speedup':>7} | same")
+    for count in (int(c) for c in args.regions.split(",")):
+        colors = np.random.default_rng(count).integers(0, 256, (count, 3), dtype=np.uint8)
+        dict_time, (d_rects, d_mask, d_layout, d_kept) = best(
+            lambda: make_regions(count, width, height),
+            lambda regions: with_dicts(regions, colors, width, height, changed), args.repeat)
+        # 탐지기가 처음부터 RegionBatch를 만드는 경우 (dict 변환 시간 제외)
+        batch_time, (b_rects, b_mask, b_layout, b_kept) = best(
+            lambda: RegionBatch.from_regions(make_regions(count, width, height)),
+            lambda regions: with_batch(regions, colors, width, height, changed), args.repeat)
+
+        angles, centers, sizes, text_colors = b_layout
+        same = (np.array_equal(d_rects, b_rects) and np.array_equal(d_mask, b_mask) and d_kept == b_kept and
+                np.allclose([a for a, _, _, _ in d_layout], angles) and
+                np.array_equal([c for _, c, _, _ in d_layout], centers) and
+                np.array_equal([s for _, _, s, _ in d_layout], sizes) and
+                np.array_equal([t for _, _, _, t in d_layout], text_colors))
+        print(f"{count:>8} | {dict_time * 1000:>9.2f} | {batch_time * 1000:>9.2f} | "
+              f"{dict_time / batch_time:>6.1f}x | {same}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
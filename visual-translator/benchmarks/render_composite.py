@@ -0,0 +1,100 @@
+"""
+렌더링 합성 벤치마크: 영역별 회전 + paste(기존) vs 오버레이 한 번 합성(render_regions)
+
+기존 파이프라인은 영역마다 render를 두 번 호출하고, render 안에서도 paste를 두 번 해서
+영역당 4번 그리고/합성했습니다. 영역 수별로 세 가지를 비교합니다.
+    before  - 기존 방식 (render 2회 x paste 2회)
+    single  - 영역당 render 1회, paste 1회 (중복만 제거한 경우)
+    overlay - TextRenderer.render_regions (레이어 중복 제거 + warpAffine + 한 번 블렌딩)
+overlay와 single 결과의 픽셀 차이(평균/99% 분위)도 함께 출력합니다.
+
+사용법:
+    python -m benchmarks.render_composite --font C:/Windows/Fonts/msgothic.ttc --regions 10,100,500
+"""
+import time
+import random
+import argparse
+import numpy as np
+from PIL import Image
+
+from src.renderer import TextRenderer
+
+TEXTS = ["営業時間 10:00-22:00", "本日のおすすめ", "SALE 50% OFF", "いちごパフェ", "お問い合わせはこちら"]
+SIZES = [(240, 40), (360, 60), (180, 32), (520, 90), (300, 48)]
+
+
+def make_regions(count, width, height, seed=0):
+    rng = random.Random(seed)
+    regions = []
+    for _ in range(count):
+        w, h = rng.choice(SIZES)
+        x, y = rng.randint(0, width - w), rng.randint(0, height - h)
+        angle = rng.choice([0.0, 0.0, 0.0, rng.uniform(-20, 20)])
+        box = np.array([[x, y], [x + w, y], [x + w, y + h], [x, y + h]], dtype=np.int32)
+        color = rng.choice([(0, 0, 0), (255, 255, 255)])
+        regions.append((rng.choice(TEXTS), box, angle, color))
+    return regions
+
+
+def paste_render(renderer, image, regions, renders, pastes):
+    """
+    기존 방식: 영역마다 레이어를 만들고 PIL로 회전해 paste
+    """
+    for text, box, angle, color in regions:
+        for _ in range(renders):
+            width = int(np.linalg.norm(box[1] - box[0]))
+            height = int(np.linalg.norm(box[3] - box[0]))
+            layer = Image.fromarray(renderer.render_layer(text, width, height, color), 'RGBA')
+            rotated = layer.rotate(angle, expand=True, resample=Image.BICUBIC)
+            rw, rh = rotated.size
+            position = (int(np.mean(box[:, 0])) - rw // 2, int(np.mean(box[:, 1])) - rh // 2)
+            for _ in range(pastes):
+                image.paste(rotated, position, rotated)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overlay compositing benchmark")
+    parser.add_argument("--font", default="C:/Windows/Fonts/msgothic.ttc")
+    parser.add_argument("--regions", default="10,100,500", help="Region counts")
+    parser.add_argument("--size", default="2000x1500", help="Image size WxH")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    rng = np.random.default_rng(0)
+    background = rng.integers(120, 200, (height, width, 3), dtype=np.uint8)
+    renderer = TextRenderer(font_path=args.font)
+
+    print(f"{'regions':>7} | {'before (ms)':>11} | {'single (ms)':>11} | {'overlay (ms)':>12} | {'speedup':>7} | {'diff mean':>9} | {'diff p99':>8}")
+    for count in [int(c) for c in args.regions.split(",")]:
+        regions = make_regions(count, width, height)
+
+        def best(fn):
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = fn()
+                times.append(time.perf_counter() - start)
+            return min(times), result
+
+        def before():
+            image = Image.fromarray(background)
+            paste_render(renderer, image, regions, renders=2, pastes=2)
+            return image
+
+        def single():
+            image = Image.fromarray(background)
+            paste_render(renderer, image, regions, renders=1, pastes=1)
+            return np.asarray(image)
+
+        before_time, _ = best(before)
+        single_time, single_result = best(single)
+        overlay_time, overlay_result = best(lambda: renderer.render_regions(background.copy(), regions))
+
+        diff = np.abs(single_result.astype(int) - overlay_result.astype(int)).max(axis=2)
+        print(f"{count:>7} | {before_time * 1000:>11.1f} | {single_time * 1000:>11.1f} | {overlay_time * 1000:>12.1f} | "
+              f"{before_time / overlay_time:>6.1f}x | {diff.mean():>9.2f} | {np.percentile(diff, 99):>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
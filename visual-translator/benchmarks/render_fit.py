@@ -0,0 +1,92 @@
+"""
+폰트 크기 맞추기 마이크로벤치마크
+
+이전 방식(높이부터 1씩 줄이며 매번 ImageFont.truetype 재로드)과
+현재 TextRenderer(이진 탐색 + 폰트/측정 캐시)의 영역당 렌더링 시간을 비교합니다.
+
+사용법:
+    python -m benchmarks.render_fit --font C:/Windows/Fonts/msgothic.ttc --regions 50
+"""
+import time
+import random
+import argparse
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from src import renderer as renderer_module
+from src.renderer import TextRenderer
+
+TEXTS = ["営業時間 10:00-22:00", "本日のおすすめ", "SALE 50% OFF", "いちごパフェ", "お問い合わせはこちら"]
+
+
+def legacy_render(image, font_path, text, box):
+    """
+    변경 전 TextRenderer.render의 폰트 맞추기 + 그리기 + 붙여넣기 (비교 기준)
+    """
+    width = int(np.linalg.norm(box[1] - box[0]))
+    height = int(np.linalg.norm(box[3] - box[0]))
+    layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+
+    font_size = height
+    font = ImageFont.truetype(font_path, font_size)
+    while font_size > 5:
+        bbox = draw.textbbox((0, 0), text, font=font)
+        if bbox[2] - bbox[0] <= width and bbox[3] - bbox[1] <= height:
+            break
+        font_size -= 1
+        font = ImageFont.truetype(font_path, font_size)
+
+    bbox = draw.textbbox((0, 0), text, font=font)
+    x = (width - (bbox[2] - bbox[0])) // 2
+    y = (height - (bbox[3] - bbox[1])) // 2
+    draw.text((x, y), text, font=font, fill=(0, 0, 0), stroke_width=max(1, font_size // 15), stroke_fill=(255, 255, 255))
+    image.paste(layer, (int(box[0][0]), int(box[0][1])), layer)
+
+
+def make_boxes(count, seed=0):
+    rng = random.Random(seed)
+    boxes = []
+    for _ in range(count):
+        w, h = rng.randint(80, 900), rng.randint(20, 200)
+        x, y = rng.randint(0, 1000), rng.randint(0, 1000)
+        boxes.append((rng.choice(TEXTS), np.array([[x, y], [x + w, y], [x + w, y + h], [x, y + h]], dtype=np.int32)))
+    return boxes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TextRenderer font fitting benchmark")
+    parser.add_argument("--font", default="C:/Windows/Fonts/msgothic.ttc")
+    parser.add_argument("--regions", type=int, default=50)
+    args = parser.parse_args()
+
+    boxes = make_boxes(args.regions)
+    canvas = Image.new('RGB', (2000, 1300), (255, 255, 255))
+
+    start = time.perf_counter()
+    for text, box in boxes:
+        legacy_render(canvas, args.font, text, box)
+    legacy = (time.perf_counter() - start) / len(boxes)
+
+    renderer = TextRenderer(font_path=args.font)
+    renderer_module._load_font_cached.cache_clear()
+    renderer_module._measure_text.cache_clear()
+    start = time.perf_counter()
+    for text, box in boxes:
+        renderer.render(canvas, text, box, 0)
+    cold = (time.perf_counter() - start) / len(boxes)
+
+    # 캐시가 채워진 상태 (같은 폰트로 다음 이미지를 처리하는 경우)
+    start = time.perf_counter()
+    for text, box in boxes:
+        renderer.render(canvas, text, box, 0)
+    warm = (time.perf_counter() - start) / len(boxes)
+
+    print(f"regions: {len(boxes)}")
+    print(f"before (linear, reload per size): {legacy * 1000:8.2f} ms/region")
+    print(f"after  (binary search, cold)    : {cold * 1000:8.2f} ms/region")
+    print(f"after  (binary search, warm)    : {warm * 1000:8.2f} ms/region")
+
+
+if __name__ == "__main__":
+    main()
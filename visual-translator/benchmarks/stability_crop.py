@@ -0,0 +1,50 @@
+"""
+StabilityAIInpainter 크롭 업로드 모드 검증 / 벤치마크 (오프라인)
+
+로컬 Erase 대역 서버에 전체 업로드 모드와 크롭 모드로 같은 이미지를 보내
+업로드 바이트, 처리 시간, 마스크 바깥 픽셀 변화량을 비교합니다.
+
+사용법:
+    python -m benchmarks.stability_crop --megapixels 12 --latency-per-mp 0.1
+"""
+import os
+import time
+import argparse
+import cv2
+import numpy as np
+
+from benchmarks.stub_stability_server import StubStabilityServer
+from benchmarks.inpaint_roi import make_case
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StabilityAIInpainter crop mode benchmark")
+    parser.add_argument("--megapixels", type=float, default=12)
+    parser.add_argument("--density", type=float, default=0.01)
+    parser.add_argument("--latency-per-mp", type=float, default=0.1)
+    args = parser.parse_args()
+
+    image, mask = make_case(args.megapixels, args.density)
+
+    with StubStabilityServer(latency_per_mp=args.latency_per_mp) as server:
+        os.environ.setdefault("STABILITY_API_KEY", "stub")
+        from src.inpainter import StabilityAIInpainter
+
+        print(f"{'mode':>5} | {'requests':>8} | {'uploaded MB':>11} | {'seconds':>7} | {'changed px outside mask':>23}")
+        for crop_mode in (False, True):
+            inpainter = StabilityAIInpainter(crop_mode=crop_mode)
+            inpainter.url = server.url
+            requests_before = server.requests
+
+            start = time.perf_counter()
+            restored = inpainter.inpaint(image, mask)
+            elapsed = time.perf_counter() - start
+
+            outside = (mask == 0)
+            changed = int(np.count_nonzero(cv2.absdiff(restored, image).max(axis=2)[outside]))
+            print(f"{'crop' if crop_mode else 'full':>5} | {server.requests - requests_before:>8} | "
+                  f"{inpainter.bytes_sent / 1e6:>11.2f} | {elapsed:>7.2f} | {changed:>23}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+CLI 시작 시간 벤치마크: cold(매번 새 프로세스) vs warm(데몬으로 전달)
+
+1. `main.py --help` 시간 (무거운 import 없이 끝나야 함)
+2. cold: `main.py IMAGE --no-daemon` (import + 모델 로드 + 처리)
+3. warm: 데몬을 띄운 뒤 `main.py IMAGE` (클라이언트 → 데몬 전달)
+
+사용법:
+    python -m benchmarks.startup menu.png --repeat 3
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+
+
+def timed(cmd, env):
+    start = time.perf_counter()
+    result = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stdout[-2000:], result.stderr[-2000:])
+        raise RuntimeError(f"Command failed: {' '.join(cmd)}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold vs warm CLI startup benchmark")
+    parser.add_argument("image_path")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    image_path = os.path.abspath(args.image_path)
+    socket_path = os.path.join(tempfile.mkdtemp(), "bench.sock")
+    env = dict(os.environ, VISUAL_TRANSLATOR_SOCKET=socket_path)
+    output = os.path.join(tempfile.mkdtemp(), "out.png")
+
+    help_times = [timed([sys.executable, MAIN, "--help"], env) for _ in range(args.repeat)]
+    cold_times = [timed([sys.executable, MAIN, image_path, "--output", output, "--no-daemon"], env)
+                  for _ in range(args.repeat)]
+
+    daemon_start = time.perf_counter()
+    daemon = subprocess.Popen([sys.executable, MAIN, "--daemon"], cwd=ROOT, env=env,
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    try:
+        for line in daemon.stdout:
+            if "[Daemon] Listening" in line:
+                break
+        else:
+            raise RuntimeError("Daemon exited before it started listening")
+        daemon_ready = time.perf_counter() - daemon_start
+
+        warm_times = [timed([sys.executable, MAIN, image_path, "--output", output], env)
+                      for _ in range(args.repeat)]
+    finally:
+        subprocess.run([sys.executable, MAIN, "--daemon-stop"], cwd=ROOT, env=env, capture_output=True)
+        daemon.wait(timeout=30)
+
+    best = lambda times: min(times)
+    mean = lambda times: sum(times) / len(times)
+    print(f"{'':<24} | {'best (s)':>8} | {'mean (s)':>8}")
+    print(f"{'--help':<24} | {best(help_times):>8.2f} | {mean(help_times):>8.2f}")
+    print(f"{'cold (--no-daemon)':<24} | {best(cold_times):>8.2f} | {mean(cold_times):>8.2f}")
+    print(f"{'warm (via daemon)':<24} | {best(warm_times):>8.2f} | {mean(warm_times):>8.2f}")
+    print(f"daemon startup (one-time): {daemon_ready:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+로컬 OpenAI 호환 스텁 서버 (/v1/chat/completions)
+
+API 키나 네트워크 없이 Translator를 시험하기 위한 서버입니다.
+지연(latency)과 오류(429 + Retry-After, 500)를 일정 확률로 주입할 수 있습니다.
+slow_rate 확률로 slow_latency만큼 더 늦게 답해서 꼬리 지연(p95 이상)도 흉내 낼 수 있습니다.
+
+사용법:
+    python -m benchmarks.stub_openai_server --port 8765 --latency 0.3 --rate-limit-rate 0.1
+    OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python main.py menu.png
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_translate(text):
+    return f"[JA] {text}"
+
+
+class StubOpenAIServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0,
+                 rate_limit_rate=0.0, retry_after=0.1, translate_fn=fake_translate, seed=None,
+                 slow_rate=0.0, slow_latency=0.0):
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.translate_fn = translate_fn
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _roll(self):
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return 200
+
+    def _complete(self, body):
+        prompt = body["messages"][-1]["content"]
+        if body.get("response_format", {}).get("type") == "json_object":
+            payload = json.loads(prompt.split("Input:", 1)[1])
+            return json.dumps({k: self.translate_fn(v) for k, v in payload.items()}, ensure_ascii=False)
+        text = prompt.split("Original Text:", 1)[1].split("Translation:", 1)[0].strip()
+        return self.translate_fn(text)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+
+                delay = server.latency
+                if server.slow_rate:
+                    with server._lock:
+                        slow = server._random.random() < server.slow_rate
+                    if slow:
+                        delay += server.slow_latency
+                if delay:
+                    time.sleep(delay)
+
+                status = server._roll()
+                if status != 200:
+                    with server._lock:
+                        server.errors += 1
+                    headers = {"Retry-After": str(server.retry_after)} if status == 429 else None
+                    error = {"message": "injected error", "type": "stub_error", "code": status}
+                    self._send(status, {"error": error}, headers)
+                    return
+
+                content = server._complete(body)
+                self._send(200, {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                })
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to sleep per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 500 response")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of a 429 response")
+    parser.add_argument("--retry-after", type=float, default=0.1, help="Retry-After seconds sent with 429")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Probability of an extra --slow-latency delay")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="Extra seconds for slow responses")
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(args.host, args.port, args.latency, args.error_rate,
+                              args.rate_limit_rate, args.retry_after,
+                              slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+    print(f"Stub OpenAI server listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+로컬 Stability AI Erase 엔드포인트 대역 서버
+
+multipart/form-data로 image/mask PNG를 받아 cv2.inpaint로 지운 PNG를 돌려줍니다.
+지연(latency, 고정 + 메가픽셀당)과 오류를 주입할 수 있습니다.
+
+사용법:
+    python -m benchmarks.stub_stability_server --port 8766 --latency 0.5
+    STABILITY_API_KEY=stub STABILITY_ERASE_URL=http://127.0.0.1:8766/v2beta/stable-image/edit/erase python main.py menu.png
+"""
+import time
+import random
+import argparse
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+
+def parse_multipart(content_type, body):
+    """
+    multipart/form-data 본문을 {필드 이름: bytes} 딕셔너리로 변환합니다.
+    """
+    message = BytesParser(policy=HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body)
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        fields[name] = part.get_payload(decode=True)
+    return fields
+
+
+class StubStabilityServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, latency_per_mp=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.latency_per_mp = latency_per_mp
+        self.error_rate = error_rate
+        self.requests = 0
+        self.bytes_received = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v2beta/stable-image/edit/erase"
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, content_type, data):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                with server._lock:
+                    server.requests += 1
+                    server.bytes_received += length
+                    failed = server._random.random() < server.error_rate
+
+                if not self.headers.get("authorization", "").startswith("Bearer "):
+                    self._send(401, "application/json", b'{"errors": ["missing authorization"]}')
+                    return
+
+                fields = parse_multipart(self.headers["Content-Type"], body)
+                image = cv2.imdecode(np.frombuffer(fields["image"], np.uint8), cv2.IMREAD_COLOR)
+                mask = cv2.imdecode(np.frombuffer(fields["mask"], np.uint8), cv2.IMREAD_GRAYSCALE)
+
+                time.sleep(server.latency + server.latency_per_mp * image.shape[0] * image.shape[1] / 1e6)
+                if failed:
+                    self._send(500, "application/json", b'{"errors": ["injected error"]}')
+                    return
+
+                restored = cv2.inpaint(image, mask, 3, cv2.INPAINT_TELEA)
+                _, encoded = cv2.imencode(".png", restored)
+                self._send(200, "image/png", encoded.tobytes())
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Stability AI erase stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="Fixed seconds per request")
+    parser.add_argument("--latency-per-mp", type=float, default=0.0, help="Extra seconds per megapixel")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 500 response")
+    args = parser.parse_args()
+
+    server = StubStabilityServer(args.host, args.port, args.latency, args.latency_per_mp, args.error_rate)
+    print(f"Stub Stability server listening on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+타일 감지 벤치마크: 한 번에 감지(single) vs 타일(tiled) vs 저해상도→정밀(coarse-to-fine)
+
+큰 합성 포스터(작은 글자 ~ 큰 제목)를 만들고, 정답 박스 대비 재현율(recall),
+정밀도(precision), 처리 시간을 비교합니다.
+
+백엔드:
+    stub   - StubDetector를 감지 모델처럼 긴 변 --limit-side 로 줄여서 실행 (PaddleOCR 불필요)
+    paddle - 실제 TextDetector (paddleocr 설치 필요, 합성 텍스트는 영어)
+
+사용법:
+    python -m benchmarks.tiled_detection --size 6000x4000 --lines 120
+    python -m benchmarks.tiled_detection --backend paddle --tile-size 1280
+"""
+import time
+import argparse
+import cv2
+import numpy as np
+
+from src.stubs import StubDetector
+from src.tiling import detect_tiled
+
+WORDS = ["SALE", "menu", "coffee", "Open 24h", "price", "Tea", "noodle", "special", "new", "event", "Floor 3"]
+
+
+def make_poster(width, height, lines, seed=0):
+    """
+    크기가 다양한 텍스트 줄을 겹치지 않게 배치한 이미지와 정답 박스 [(x0, y0, x1, y1), ...]를 반환합니다.
+    """
+    rng = np.random.default_rng(seed)
+    image = np.full((height, width, 3), 235, np.uint8)
+    occupied = np.zeros((height, width), np.uint8)
+    truth = []
+    attempts = 0
+    while len(truth) < lines and attempts < lines * 50:
+        attempts += 1
+        text = " ".join(rng.choice(WORDS, size=int(rng.integers(1, 4))))
+        # 작은 글자가 많고 큰 제목은 드물게
+        scale = float(np.exp(rng.uniform(np.log(0.35), np.log(4.0))))
+        thickness = max(1, int(scale * 1.5))
+        (tw, th), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+        if tw >= width - 20 or th >= height - 20:
+            continue
+        x, y = int(rng.integers(10, width - tw - 10)), int(rng.integers(th + 10, height - baseline - 10))
+        box = (x, y - th, x + tw, y + baseline)
+        margin = max(12, th)
+        if occupied[max(0, box[1] - margin):box[3] + margin, max(0, box[0] - margin):box[2] + margin].any():
+            continue
+        cv2.putText(image, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (30, 30, 30), thickness, cv2.LINE_AA)
+        occupied[box[1]:box[3], box[0]:box[2]] = 1
+        truth.append(box)
+    return image, truth
+
+
+class LimitedSideDetector(StubDetector):
+    """
+    감지 모델처럼 긴 변을 limit_side로 줄여서 감지하는 StubDetector
+    (PaddleOCR 기본 det_limit_side_len=960 동작을 흉내 냄)
+    """
+
+    def __init__(self, limit_side=960, **kwargs):
+        super().__init__(**kwargs)
+        self.limit_side = limit_side
+
+    def _find_regions(self, image):
+        h, w = image.shape[:2]
+        scale = min(1.0, self.limit_side / max(h, w))
+        if scale < 1.0:
+            image = cv2.resize(image, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+        regions = super()._find_regions(image)
+        for region in regions:
+            region['box'] = np.round(region['box'] / scale).astype(np.int32)
+        return regions
+
+
+def score(detections, truth):
+    """
+    recall: 정답 박스 면적의 50% 이상을 덮고 정답보다 4배 이상 크지 않은 감지 결과가 있으면 찾은 것으로 봅니다.
+    precision: 감지 결과 면적의 50% 이상이 어떤 정답 박스 안에 있으면 맞은 것으로 봅니다.
+        (큰 글자의 단어가 따로 감지된 경우도 맞은 것으로 셈)
+    """
+    boxes = []
+    for region in detections:
+        pts = region['box']
+        boxes.append((pts[:, 0].min(), pts[:, 1].min(), pts[:, 0].max(), pts[:, 1].max()))
+
+    def inter(a, b):
+        return max(0, min(a[2], b[2]) - max(a[0], b[0])) * max(0, min(a[3], b[3]) - max(a[1], b[1]))
+
+    area = lambda r: max(1, (r[2] - r[0]) * (r[3] - r[1]))
+    found = sum(1 for t in truth
+                if any(inter(t, d) >= 0.5 * area(t) and area(d) <= 4 * area(t) for d in boxes))
+    correct = sum(1 for d in boxes if any(inter(t, d) >= 0.5 * area(d) for t in truth))
+    return found / max(1, len(truth)), correct / max(1, len(boxes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiled text detection benchmark")
+    parser.add_argument("--backend", choices=["stub", "paddle"], default="stub")
+    parser.add_argument("--size", default="6000x4000", help="Poster size WxH")
+    parser.add_argument("--lines", type=int, default=120, help="Number of text lines")
+    parser.add_argument("--tile-size", type=int, default=1280)
+    parser.add_argument("--overlap", type=int, default=160)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--limit-side", type=int, default=960, help="[stub] Model input limit (long side)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    image, truth = make_poster(width, height, args.lines)
+    print(f"Poster {width}x{height}, {len(truth)} text lines, backend={args.backend}")
+
+    if args.backend == "paddle":
+        from src.detector import TextDetector
+        detector = TextDetector(lang="en", tile_size=0).warmup()
+        single = detector.detect
+        batch = detector.detect_batch
+    else:
+        detector = LimitedSideDetector(limit_side=args.limit_side)
+        single = detector.detect
+        batch = detector.detect_batch
+
+    modes = {
+        "single": lambda: single(image),
+        "tiled": lambda: detect_tiled(image, batch, tile_size=args.tile_size, overlap=args.overlap,
+                                      max_workers=args.workers),
+        "coarse-to-fine": lambda: detect_tiled(image, batch, tile_size=args.tile_size, overlap=args.overlap,
+                                               max_workers=args.workers, coarse_to_fine=True),
+    }
+
+    print(f"{'mode':<16} | {'best (s)':>8} | {'regions':>7} | {'recall':>6} | {'precision':>9}")
+    for name, run in modes.items():
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            regions = run()
+            times.append(time.perf_counter() - start)
+        recall, precision = score(regions, truth)
+        print(f"{name:<16} | {min(times):>8.2f} | {len(regions):>7} | {recall:>6.1%} | {precision:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+번역 백엔드 라우팅 벤치마크 (오프라인)
+
+로컬 OpenAI 호환 스텁 서버 두 개(주 백엔드: 가끔 매우 느림 / 보조 백엔드: 조금 느리지만 안정적)를 띄우고
+같은 translate_batch 호출을 여러 번 반복해서 호출당 지연 분위수와 백엔드별 요청/hedge/오류 수를 비교합니다.
+    - primary: 주 백엔드만 사용 (기존 동작)
+    - hedged:  주 백엔드가 p95보다 늦으면 보조 백엔드에도 보냄
+    - failing: 주 백엔드가 항상 500 → 보조 백엔드로 넘어가는지
+    - glossary: 용어집(오프라인)을 먼저 쓰고 없는 항목만 주 백엔드로
+
+사용법:
+    python -m benchmarks.translate_hedging --calls 200 --latency 0.05 --slow-rate 0.03 --slow-latency 1.0
+"""
+import io
+import sys
+import time
+import argparse
+import contextlib
+import numpy as np
+
+from benchmarks.stub_openai_server import StubOpenAIServer, fake_translate
+
+
+def run_scenario(name, backends, texts, calls, hedge_percentile):
+    from src.translator import Translator
+    from src.translation_router import BackendRouter
+
+    router = BackendRouter(backends, hedge_percentile=hedge_percentile, max_workers=16)
+    with contextlib.redirect_stdout(io.StringIO()):
+        translator = Translator(cache=False, router=router)
+    times, correct = [], 0
+    expected = [fake_translate(t) for t in texts]
+    for _ in range(calls):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = translator.translate_batch(texts)
+        times.append(time.perf_counter() - start)
+        correct += result == expected
+    times = np.array(times) * 1000
+    stats = router.stats()
+    summary = " ".join(f"{backend}: {s['requests']} req / {s['errors']} err / {s['hedges']} hedged / {s['wins']} won"
+                       for backend, s in stats.items())
+    print(f"{name:<9} | {np.percentile(times, 50):>7.0f} | {np.percentile(times, 95):>7.0f} | "
+          f"{np.percentile(times, 99):>7.0f} | {times.max():>7.0f} | {correct:>4}/{calls:<4} | {summary}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Translation backend routing / hedging benchmark")
+    parser.add_argument("--calls", type=int, default=200, help="translate_batch calls per scenario")
+    parser.add_argument("--regions", type=int, default=5, help="Texts per call")
+    parser.add_argument("--latency", type=float, default=0.05, help="Primary base latency (s)")
+    parser.add_argument("--slow-rate", type=float, default=0.03, help="Primary probability of a slow response")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="Primary extra latency when slow (s)")
+    parser.add_argument("--secondary-latency", type=float, default=0.08, help="Secondary latency (s)")
+    parser.add_argument("--percentile", type=float, default=95, help="Hedge after this latency percentile")
+    args = parser.parse_args()
+
+    from src.translator import OpenAIBackend
+    from src.glossary import GlossaryBackend
+
+    texts = [f"region text {i}" for i in range(args.regions)]
+    glossary = GlossaryBackend({text: {"Japanese": fake_translate(text)} for text in texts[: args.regions // 2]})
+
+    print(f"{'scenario':<9} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | {'max ms':>7} | {'ok':>9} | backends")
+    for name in ("primary", "hedged", "failing", "glossary"):
+        primary_server = StubOpenAIServer(latency=args.latency, slow_rate=args.slow_rate, slow_latency=args.slow_latency,
+                                          error_rate=1.0 if name == "failing" else 0.0, seed=0)
+        secondary_server = StubOpenAIServer(latency=args.secondary_latency, seed=1)
+        with primary_server, secondary_server:
+            primary = OpenAIBackend("stub", base_url=primary_server.base_url, name="primary", max_retries=0)
+            secondary = OpenAIBackend("stub", base_url=secondary_server.base_url, name="secondary", max_retries=0)
+            backends = {"primary": [primary], "glossary": [glossary, primary]}.get(name, [primary, secondary])
+            run_scenario(name, backends, texts, args.calls, 0 if name == "primary" else args.percentile)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
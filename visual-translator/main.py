@@ -1,60 +1,365 @@
 import os
+import sys
+import json
+import time
 import argparse
-from dotenv import load_dotenv
-print("Starting main.py...")
-print("Importing pipeline...")
-from src.pipeline import VisualTranslatorPipeline
-print("Importing detector...")
-from src.detector import TextDetector
-print("Importing inpainter...")
-from src.inpainter import StabilityAIInpainter, OpenCVInpainter
-print("Importing translator...")
-from src.translator import Translator
-print("Importing renderer...")
-from src.renderer import TextRenderer
 import traceback
 
-def main():
-    load_dotenv()
-    
+# paddleocr / openai / cv2 / PIL 같은 무거운 모듈은 인자 검증이 끝난 뒤 필요한 시점에 import 합니다.
+# (--help 나 잘못된 경로는 모델 로드 없이 바로 끝남)
+_START = time.perf_counter()
+
+# 여러 프레임일 수 있는 입력 (애니메이션 GIF/WebP, 여러 페이지 TIFF/PDF, 동영상)
+STREAM_EXTENSIONS = (".gif", ".webp", ".tif", ".tiff", ".pdf", ".mp4", ".mov", ".avi", ".mkv", ".webm", ".m4v")
+STILL_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+
+def build_parser():
     parser = argparse.ArgumentParser(description="Visual Translator CLI")
-    parser.add_argument("image_path", help="Path to the input image")
+    parser.add_argument("image_path", nargs="?", help="Path to the input image (with --batch: directory, glob pattern or JSONL manifest)")
     parser.add_argument("--output", default="output.png", help="Path to save the translated image")
     parser.add_argument("--no-rotate", action="store_true", help="Disable text rotation correction")
-    args = parser.parse_args()
+    parser.add_argument("--debug-dir", default=None, help="Write debug crops/visualization/metrics under this directory (disabled by default)")
+    parser.add_argument("--debug-sample-rate", type=float, default=1.0, help="Fraction of runs that write debug artifacts")
+    parser.add_argument("--trace-file", default=None, help="Append per-stage/per-region spans as JSON lines to this file")
+    parser.add_argument("--metrics-file", default=None, help="Write counters and latency histograms in Prometheus text format")
+    parser.add_argument("--batch", action="store_true", help="Process many images with models loaded once")
+    parser.add_argument("--output-dir", default="outputs", help="[batch] Directory for translated images")
+    parser.add_argument("--detect-workers", type=int, default=1, help="[batch/serve] Number of detection workers")
+    parser.add_argument("--no-resume", action="store_true", help="[batch] Reprocess images already marked as done")
+    parser.add_argument("--daemon", action="store_true", help="Run a warm worker daemon that accepts jobs over a Unix socket")
+    parser.add_argument("--daemon-stop", action="store_true", help="Stop a running daemon")
+    parser.add_argument("--no-daemon", action="store_true", help="Do not forward to a running daemon; process in this process")
+    parser.add_argument("--socket", default=None, help="Daemon Unix socket path")
+    parser.add_argument("--serve", action="store_true", help="Run the HTTP service (sync + async job API)")
+    parser.add_argument("--host", default="127.0.0.1", help="[serve] Bind address")
+    parser.add_argument("--port", type=int, default=8080, help="[serve] Port")
+    parser.add_argument("--queue-size", type=int, default=32, help="[serve] Max jobs in progress before answering 429")
+    parser.add_argument("--workers", type=int, default=4, help="[serve] Threads for inpaint/translate/render per request")
+    parser.add_argument("--batch-window-ms", type=float, default=20, help="[serve] Collect images arriving within this window into one detection call")
+    parser.add_argument("--max-batch", type=int, default=8, help="[serve] Max images per detection call")
+    parser.add_argument("--keyframe-interval", type=int, default=0, help="[animation/video] Fully reprocess every N frames (0: only when the frame changes a lot)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the detection/inpainting stage cache")
+    parser.add_argument("--cache-info", action="store_true", help="Show stage and translation cache sizes and exit")
+    parser.add_argument("--cache-clear", nargs="?", const="all", choices=["all", "detect", "inpaint", "translate"],
+                        help="Clear cached results (default: all) and exit")
+    parser.add_argument("--memory-budget-mb", type=float, default=None, help="Process images whose estimated working set exceeds this in low-memory mode (env PIPELINE_MEMORY_BUDGET_MB)")
+    parser.add_argument("--memory-report", action="store_true", help="Record and print peak RSS for each stage")
+    parser.add_argument("--detector-backend", choices=["paddleocr", "onnx"], default=None, help="OCR backend (env DETECTOR_BACKEND, default paddleocr; onnx needs onnxruntime + exported PP-OCR models)")
+    parser.add_argument("--translate-backends", default=None, help="Comma-separated translation backends in priority order: openai, glossary, http(s)://host/v1#model (env TRANSLATE_BACKENDS, default openai); slow requests are hedged to the next one")
+    parser.add_argument("--min-confidence", type=float, default=None, help="Drop OCR results scoring below this (env OCR_MIN_CONFIDENCE, default 0.85)")
+    parser.add_argument("--do-not-translate", default=None, help="File of strings to leave untouched, one per line ('re:' prefix for regex; env DO_NOT_TRANSLATE_PATH)")
+    parser.add_argument("--target-langs", default=None, help="Comma-separated target languages (e.g. Japanese,English,Chinese): detect and inpaint once, write one output per language ('{lang}' in --output or an _<lang> suffix)")
+    parser.add_argument("--no-filter", action="store_true", help="Erase and translate every detected region (no number/URL/code/target-language filtering)")
+    parser.add_argument("--stub-backends", action="store_true", help="Use local stub detector/translator/inpainter (no models, no network)")
+    return parser
 
-    # Verify API Keys
-    if not os.getenv("OPENAI_API_KEY") and not os.getenv("GOOGLE_API_KEY"):
-        print("Warning: No API Key found (OPENAI_API_KEY or GOOGLE_API_KEY). Translation might be skipped.")
 
-    print(f"Processing {args.image_path}...")
+# build_pipeline()이 쓰는 인자 (데몬이 시작할 때와 다르면 데몬에 넘기지 않고 이 프로세스에서 처리)
+PIPELINE_OPTIONS = ("debug_dir", "debug_sample_rate", "trace_file", "metrics_file", "no_cache", "memory_budget_mb",
+                    "memory_report", "detector_backend", "translate_backends", "min_confidence", "do_not_translate",
+                    "no_filter", "stub_backends")
+
+
+def pipeline_options(args):
+    """
+    파이프라인 설정 인자 (경로는 절대 경로로 바꿔 작업 디렉터리가 달라도 같은 설정으로 비교)
+    """
+    options = {name: getattr(args, name, None) for name in PIPELINE_OPTIONS}
+    for name in ("debug_dir", "trace_file", "metrics_file", "do_not_translate"):
+        if options[name]:
+            options[name] = os.path.abspath(options[name])
+    return options
+
+
+def build_pipeline(args, use_stage_cache=True):
+    """
+    구성 요소를 생성합니다. (무거운 import는 여기서 처음 일어남)
+    use_stage_cache: False면 탐지/복원 배경 디스크 캐시를 쓰지 않음 (다시 볼 일 없는 동영상 프레임 등)
+    """
+    from src.pipeline import VisualTranslatorPipeline
+    from src.detector import create_detector
+    from src.inpainter import StabilityAIInpainter
+    from src.translator import Translator, create_backends
+    from src.renderer import TextRenderer
+    from src.artifacts import ArtifactSink
+    from src.cache import StageCache
+    from src.region_filter import RegionFilter
+    from src.telemetry import telemetry, JsonLinesExporter, PrometheusExporter
+
+    if args.trace_file:
+        telemetry.add_exporter(JsonLinesExporter(args.trace_file))
+    if args.metrics_file:
+        telemetry.add_exporter(PrometheusExporter(args.metrics_file))
+    if args.memory_report:
+        telemetry.track_memory = True
 
     # Initialize Components
     print("Initializing components...")
-    
-    # Detector (PaddleOCR)
-    detector = TextDetector()
-    
+
+    if getattr(args, "stub_backends", False):
+        # 모델/네트워크 없이 로컬에서 전체 흐름을 확인할 때 사용
+        from src.stubs import StubDetector, StubInpainter, StubTranslator, stub_latency
+        detector = StubDetector(latency=stub_latency("detect"))
+        inpainter = StubInpainter(latency=stub_latency("inpaint"))
+        translator = StubTranslator(latency=stub_latency("translate"))
+        artifacts = ArtifactSink(args.debug_dir, sample_rate=args.debug_sample_rate)
+        stage_cache = None if args.no_cache or not use_stage_cache else StageCache.from_env()
+        region_filter = None if args.no_filter else RegionFilter.from_env(translator.target_lang, args.do_not_translate)
+        return VisualTranslatorPipeline(detector, inpainter, translator, TextRenderer(), artifacts=artifacts,
+                                        stage_cache=stage_cache, memory_budget_mb=args.memory_budget_mb,
+                                        region_filter=region_filter)
+
+    # Detector (PaddleOCR 또는 ONNX Runtime) - 모델은 첫 탐지 때 로드
+    detector = create_detector(args.detector_backend, min_confidence=args.min_confidence)
+
     # Inpainter (Stability AI) - 핵심: 배경을 깨끗하게 지움
     inpainter = StabilityAIInpainter()
-    
-    # Translator (Gemini)
-    translator = Translator()
-    
+
+    # Translator (OpenAI 호환 API / 용어집 등 백엔드, 느린 요청은 다음 백엔드에도 보냄)
+    translator = Translator(backends=create_backends(args.translate_backends))
+
     # Renderer (Pillow) - 핵심: 폰트로 깔끔하게 찍음
     renderer = TextRenderer()
-    
+
     # Pipeline
-    print("Initializing pipeline...")
-    pipeline = VisualTranslatorPipeline(detector, inpainter, translator, renderer)
-    
+    # 탐지 결과/복원된 배경 캐시: 렌더링 설정만 바꿔 다시 실행하면 OCR/Inpainting을 건너뜀
+    artifacts = ArtifactSink(args.debug_dir, sample_rate=args.debug_sample_rate)
+    stage_cache = None if args.no_cache or not use_stage_cache else StageCache.from_env()
+    # 숫자/URL/코드/번역하지 않을 문자열/이미 대상 언어인 텍스트는 지우지도 번역하지도 않음
+    region_filter = None if args.no_filter else RegionFilter.from_env(translator.target_lang, args.do_not_translate)
+    return VisualTranslatorPipeline(detector, inpainter, translator, renderer, artifacts=artifacts,
+                                    stage_cache=stage_cache, memory_budget_mb=args.memory_budget_mb,
+                                    region_filter=region_filter)
+
+
+def run_cache_command(args):
+    """
+    --cache-info / --cache-clear: 모델을 로드하지 않고 캐시만 확인하거나 비웁니다.
+    """
+    from src.cache import StageCache, TranslationCache
+
+    stage_cache = StageCache.from_env()
+    translation_cache = TranslationCache.from_env()
+
+    if args.cache_clear:
+        stage = args.cache_clear
+        if stage in ("all", "detect", "inpaint") and stage_cache:
+            removed = stage_cache.clear(None if stage == "all" else stage)
+            print(f"Removed {removed} stage cache entries from {stage_cache.root}")
+        if stage in ("all", "translate") and translation_cache:
+            translation_cache.clear()
+            print(f"Cleared translation cache {translation_cache.path}")
+        return 0
+
+    if stage_cache:
+        stats = stage_cache.stats()
+        total = sum(stage["bytes"] for stage in stats["stages"].values())
+        print(f"Stage cache: {stats['path']} ({total / 1024 ** 2:.1f} / {stats['max_bytes'] / 1024 ** 2:.1f} MB)")
+        for name, stage in stats["stages"].items():
+            print(f"  {name:<10} {stage['entries']:>7} entries  {stage['bytes'] / 1024 ** 2:>9.1f} MB")
+    else:
+        print("Stage cache: disabled (STAGE_CACHE_DIR is empty)")
+    if translation_cache:
+        stats = translation_cache.stats()
+        print(f"Translation cache: {stats['path']} ({stats['entries']} / {stats['max_entries']} entries)")
+    else:
+        print("Translation cache: disabled (TRANSLATION_CACHE_PATH is empty)")
+    return 0
+
+
+def run_daemon(args, socket_path):
+    from src.daemon import TranslatorDaemon
+
+    pipeline = build_pipeline(args)
+    print("[Daemon] Warming up detector...")
+    pipeline.detector.warmup()
+    print(f"[Timing] Daemon ready in {time.perf_counter() - _START:.2f}s")
+    try:
+        TranslatorDaemon(pipeline, socket_path, options=pipeline_options(args)).serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.artifacts.flush()
+
+
+def run_service(args):
+    from src.service import serve
+
+    pipeline = build_pipeline(args)
+    print("[Service] Warming up detector...")
+    pipeline.detector.warmup()
+    print(f"[Timing] Service ready in {time.perf_counter() - _START:.2f}s")
+    try:
+        serve(
+            pipeline,
+            host=args.host,
+            port=args.port,
+            capacity=args.queue_size,
+            workers=args.workers,
+            detect_workers=args.detect_workers,
+            batch_window=args.batch_window_ms / 1000,
+            max_batch=args.max_batch,
+        )
+    finally:
+        pipeline.artifacts.flush()
+
+
+def stream_output_path(input_path, output_path):
+    """
+    여러 프레임 입력인데 --output이 정지 이미지 확장자면 입력과 같은 형식으로 바꿉니다. (WebP 애니메이션 → GIF)
+    """
+    root, ext = os.path.splitext(output_path)
+    if "%" in output_path or ext.lower() not in STILL_EXTENSIONS:
+        return output_path
+    input_ext = os.path.splitext(input_path)[1].lower()
+    return root + (".gif" if input_ext == ".webp" else input_ext)
+
+
+def run_stream(args):
+    from src.stream import StreamTranslator
+    from src.telemetry import telemetry
+
+    output_path = stream_output_path(args.image_path, args.output)
+    # 프레임/잘라낸 영역마다 해시하고 배경을 PNG로 디스크에 쓰면 느리고, 다시 쓰지 않을 항목이 캐시를 밀어냄
+    pipeline = build_pipeline(args, use_stage_cache=False)
+    translator = StreamTranslator(pipeline, keyframe_interval=args.keyframe_interval)
+    try:
+        translator.run(args.image_path, output_path, use_rotation=not args.no_rotate)
+    except Exception as e:
+        print(f"Error occurred: {e}")
+        traceback.print_exc()
+        return 1
+    finally:
+        pipeline.artifacts.flush()
+        telemetry.flush()
+    print(f"Done! Saved to {output_path}")
+    return 0
+
+
+def run_batch(args):
+    from src.batch import BatchRunner, collect_jobs
+    from src.telemetry import telemetry
+
+    jobs = collect_jobs(args.image_path, args.output_dir)
+    if not jobs:
+        print(f"No images found in {args.image_path}")
+        return 1
+    print(f"Found {len(jobs)} images in {args.image_path}")
+
+    pipeline = build_pipeline(args)
+    runner = BatchRunner(
+        pipeline,
+        progress_path=os.path.join(args.output_dir, "batch_progress.jsonl"),
+        detect_workers=args.detect_workers,
+        use_rotation=not args.no_rotate,
+        resume=not args.no_resume,
+    )
+    summary = runner.run(jobs)
+    pipeline.artifacts.flush()
+    telemetry.flush()
+    summary_path = os.path.join(args.output_dir, "batch_summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=4, ensure_ascii=False)
+    print(f"Done! Summary saved to {summary_path}")
+    return 0
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from src import daemon
+    socket_path = args.socket or daemon.DEFAULT_SOCKET
+
+    if args.daemon_stop:
+        response = daemon.send_request({"op": "shutdown"}, socket_path, timeout=5)
+        print("Daemon stopped." if response else "No daemon running.")
+        return 0
+    if args.daemon:
+        run_daemon(args, socket_path)
+        return 0
+    if args.serve:
+        run_service(args)
+        return 0
+    if args.cache_info or args.cache_clear:
+        return run_cache_command(args)
+
+    if not args.image_path:
+        parser.error("image_path is required")
+    if not args.batch and not os.path.isfile(args.image_path):
+        print(f"Error: Image file not found: {args.image_path}")
+        return 1
+
+    # Verify API Keys
+    if not os.getenv("OPENAI_API_KEY") and not os.getenv("GOOGLE_API_KEY"):
+        print("Warning: No API Key found (OPENAI_API_KEY or GOOGLE_API_KEY). Translation might be skipped.")
+
+    # 여러 언어 출력(--target-langs)은 이미지 한 장 처리에서만 지원 (배치/프레임 처리에서 조용히 무시하지 않도록)
+    if args.batch:
+        if args.target_langs:
+            parser.error("--target-langs is not supported with --batch (run each language separately)")
+        return run_batch(args)
+
+    # 애니메이션/동영상/여러 페이지 입력은 프레임 단위로 이 프로세스에서 처리
+    if os.path.splitext(args.image_path)[1].lower() in STREAM_EXTENSIONS:
+        from src.stream import is_multi_frame
+        if is_multi_frame(args.image_path):
+            if args.target_langs:
+                parser.error("--target-langs is not supported for animated/multi-page/video inputs")
+            return run_stream(args)
+
+    target_langs = [lang.strip() for lang in args.target_langs.split(",") if lang.strip()] if args.target_langs else None
+
+    # 실행 중인 데몬이 있으면 작업만 넘기고 끝냄 (모델 로드/무거운 import 없음)
+    if not args.no_daemon:
+        response = daemon.send_request({
+            "op": "run",
+            "image_path": os.path.abspath(args.image_path),
+            "output": os.path.abspath(args.output),
+            "use_rotation": not args.no_rotate,
+            "target_langs": target_langs,
+            "options": pipeline_options(args),
+        }, socket_path)
+        if response is not None and response.get("mismatch"):
+            print(f"[Daemon] Running daemon was started with different options ({', '.join(response['mismatch'])}); "
+                  f"processing in this process instead.")
+        elif response is not None:
+            total = time.perf_counter() - _START
+            if not response.get("ok"):
+                print(f"Error occurred (daemon): {response.get('error')}")
+                return 1
+            print(f"Done! Saved to {', '.join((response.get('outputs') or {}).values()) or args.output}")
+            print(f"[Timing] warm (daemon): total {total:.2f}s, job {response['seconds']:.2f}s, "
+                  f"client overhead {total - response['seconds']:.2f}s")
+            return 0
+
+    print(f"Processing {args.image_path}...")
+    pipeline = build_pipeline(args)
+
+    from src.telemetry import telemetry
+    job_start = time.perf_counter()
+    outputs = [args.output]
     try:
-        pipeline.run(args.image_path, args.output, use_rotation=not args.no_rotate)
+        ctx = pipeline.run(args.image_path, args.output, use_rotation=not args.no_rotate, target_langs=target_langs)
+        outputs = list((ctx.get('outputs') or {}).values()) or outputs
+        if ctx.get('memory'):
+            print("[Memory] Peak RSS per stage: " + ", ".join(f"{stage} {mb:.0f} MB" for stage, mb in ctx['memory'].items()))
     except Exception as e:
         print(f"Error occurred: {e}")
         traceback.print_exc()
+    finally:
+        pipeline.artifacts.flush()
+        telemetry.flush()
 
-    print(f"Done! Saved to {args.output}")
+    print(f"Done! Saved to {', '.join(outputs)}")
+    total = time.perf_counter() - _START
+    job = time.perf_counter() - job_start
+    print(f"[Timing] cold: total {total:.2f}s, job {job:.2f}s (incl. model load), startup {total - job:.2f}s")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import uuid
+import queue
+import random
+import threading
+import cv2
+
+
+class ArtifactRun:
+    """
+    한 번의 파이프라인 실행에 속한 디버그 산출물 기록기입니다.
+    모든 쓰기는 싱크의 백그라운드 스레드로 넘겨지므로 호출 측에서는 인코딩 비용이 들지 않습니다.
+    넘긴 배열은 이후에 수정하지 않아야 합니다.
+    """
+
+    def __init__(self, sink, run_dir):
+        self.sink = sink
+        self.run_dir = run_dir
+
+    def image(self, name, image):
+        self.sink._submit(os.path.join(self.run_dir, name), "image", image)
+
+    def json(self, name, data):
+        self.sink._submit(os.path.join(self.run_dir, name), "json", data)
+
+
+class ArtifactSink:
+    """
+    디버그 산출물(크롭, 탐지 시각화, 메트릭 JSON) 저장소입니다.
+    기본값(output_dir=None)은 비활성화 상태로, 아무것도 쓰지 않습니다.
+
+    Args:
+        output_dir: 실행별 하위 디렉터리가 만들어질 위치
+        sample_rate: 산출물을 기록할 실행의 비율 (0.0 ~ 1.0)
+        queue_size: 쓰기 대기열 크기. 가득 차면 요청 경로를 막지 않고 해당 산출물을 버립니다.
+    """
+
+    def __init__(self, output_dir=None, sample_rate=1.0, queue_size=64):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.output_dir is not None and self.sample_rate > 0
+
+    def open_run(self, label=None, force=None):
+        """
+        실행 하나의 기록기를 엽니다. 비활성화되었거나 샘플링에서 빠지면 None을 반환합니다.
+        force=True면 샘플링과 무관하게 기록하고, force=False면 기록하지 않습니다.
+        """
+        if force is False or self.output_dir is None:
+            return None
+        if force is None and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            return None
+
+        stem = os.path.splitext(os.path.basename(label))[0] if label else "array"
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}_{stem}_{uuid.uuid4().hex[:6]}"
+        return ArtifactRun(self, os.path.join(self.output_dir, run_id))
+
+    def _submit(self, path, kind, payload):
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((path, kind, payload))
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name="artifact-writer", daemon=True)
+                self._thread.start()
+
+    def _write_loop(self):
+        while True:
+            path, kind, payload = self._queue.get()
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if kind == "image":
+                    cv2.imwrite(path, payload)
+                else:
+                    with open(path, "w", encoding="utf-8") as f:
+                        json.dump(payload, f, indent=4, ensure_ascii=False)
+            except Exception as e:
+                print(f"[Artifacts] Failed to write {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """
+        대기 중인 쓰기가 모두 끝날 때까지 기다립니다.
+        """
+        if self._thread is not None:
+            self._queue.join()
+        if self.dropped:
+            print(f"[Artifacts] Dropped {self.dropped} artifact(s) because the write queue was full.")
@@ -0,0 +1,191 @@
+import os
+import glob
+import json
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp", ".tif", ".tiff")
+
+# 큐에서 단계 종료를 알리는 값
+_STOP = object()
+
+
+def collect_jobs(source, output_dir):
+    """
+    입력 소스(디렉터리 / glob 패턴 / JSONL 매니페스트)를 작업 목록으로 변환합니다.
+    Returns:
+        list[dict]: [{'input': 입력 경로, 'output': 출력 경로}, ...]
+    """
+    if source.endswith(".jsonl") and os.path.isfile(source):
+        # 매니페스트 한 줄: {"input": "a.png", "output": "out/a.png"} (output 생략 가능)
+        jobs = []
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                jobs.append({
+                    'input': entry['input'],
+                    'output': entry.get('output') or os.path.join(output_dir, os.path.basename(entry['input'])),
+                })
+        return jobs
+
+    if os.path.isdir(source):
+        paths = sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+    else:
+        paths = sorted(p for p in glob.glob(source, recursive=True) if p.lower().endswith(IMAGE_EXTENSIONS))
+
+    return [{'input': p, 'output': os.path.join(output_dir, os.path.basename(p))} for p in paths]
+
+
+class BatchRunner:
+    """
+    여러 이미지를 하나의 파이프라인(한 번 로드한 모델)으로 처리합니다.
+
+    단계 구성:
+    1. 탐지 + 마스크 생성: 워커 풀 (detect_workers)
+    2. Inpainting + 번역: 전용 스레드, 두 작업을 동시에 실행하며 다음 이미지의 탐지와 겹쳐 실행
+    3. 렌더링 + 저장: 쓰기 전용 스레드
+
+    진행 상황은 progress_path(JSONL)에 한 줄씩 기록되어, 다시 실행하면 성공한 이미지는 건너뜁니다.
+    """
+
+    def __init__(self, pipeline, progress_path, detect_workers=1, queue_size=4, use_rotation=True, resume=True):
+        # 주의: PaddleOCR 인스턴스는 스레드 안전이 보장되지 않으므로 detect_workers 기본값은 1입니다.
+        self.pipeline = pipeline
+        self.progress_path = progress_path
+        self.detect_workers = max(1, detect_workers)
+        self.queue_size = queue_size
+        self.use_rotation = use_rotation
+        self.resume = resume
+        self.results = []
+        self._translate_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch-translate")
+
+    def _load_done(self):
+        done = set()
+        if not self.resume or not os.path.exists(self.progress_path):
+            return done
+        with open(self.progress_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 중단 시 잘린 마지막 줄
+                if entry.get('status') == 'ok' and os.path.exists(entry.get('output', '')):
+                    done.add(entry['input'])
+        return done
+
+    def run(self, jobs):
+        """
+        작업 목록을 처리하고 이미지별 결과 요약을 반환합니다.
+        """
+        done = self._load_done()
+        pending = [job for job in jobs if job['input'] not in done]
+        skipped = len(jobs) - len(pending)
+        if skipped:
+            print(f"[Batch] Resuming: skipping {skipped} already processed image(s).")
+        print(f"[Batch] Processing {len(pending)} image(s)...")
+
+        progress_dir = os.path.dirname(self.progress_path)
+        if progress_dir:
+            os.makedirs(progress_dir, exist_ok=True)
+
+        stage_queue = queue.Queue(maxsize=self.queue_size)
+        write_queue = queue.Queue(maxsize=self.queue_size)
+        # 동시에 메모리에 올라가는 이미지 수를 제한
+        in_flight = threading.Semaphore(self.detect_workers + 2 * self.queue_size)
+
+        middle = threading.Thread(target=self._process_loop, args=(stage_queue, write_queue), name="batch-process")
+        writer = threading.Thread(target=self._write_loop, args=(write_queue, in_flight), name="batch-writer")
+        middle.start()
+        writer.start()
+
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=self.detect_workers, thread_name_prefix="batch-detect") as pool:
+            for job in pending:
+                in_flight.acquire()
+                future = pool.submit(self._detect, job)
+                future.add_done_callback(lambda f: stage_queue.put(f.result()))
+
+        stage_queue.put(_STOP)
+        middle.join()
+        writer.join()
+        self._translate_pool.shutdown()
+
+        elapsed = time.time() - start_time
+        succeeded = sum(1 for r in self.results if r['status'] == 'ok')
+        summary = {
+            'total': len(jobs),
+            'skipped': skipped,
+            'succeeded': succeeded,
+            'failed': len(self.results) - succeeded,
+            'seconds': elapsed,
+            'images': self.results,
+        }
+        print(f"[Batch] Done: {succeeded} succeeded, {summary['failed']} failed, {skipped} skipped. (Time: {elapsed:.2f}s)")
+        for r in self.results:
+            if r['status'] != 'ok':
+                print(f"    [FAIL] {r['input']}: {r['error']}")
+        return summary
+
+    def _detect(self, job):
+        job = dict(job, started=time.time())
+        try:
+            job['ctx'] = self.pipeline.build_mask(self.pipeline.detect(job['input']))
+        except Exception as e:
+            job['error'] = f"detect: {e}"
+        return job
+
+    def _process_loop(self, stage_queue, write_queue):
+        while True:
+            job = stage_queue.get()
+            if job is _STOP:
+                write_queue.put(_STOP)
+                return
+            if 'error' not in job:
+                ctx = job['ctx']
+                try:
+                    # 번역(네트워크 대기)과 Inpainting을 동시에 실행
+                    translate_future = self._translate_pool.submit(self.pipeline.translate, ctx)
+                    try:
+                        self.pipeline.inpaint(ctx)
+                    finally:
+                        translate_future.result()
+                except Exception as e:
+                    job['error'] = f"inpaint/translate: {e}"
+            write_queue.put(job)
+
+    def _write_loop(self, write_queue, in_flight):
+        with open(self.progress_path, "a", encoding="utf-8") as progress:
+            while True:
+                job = write_queue.get()
+                if job is _STOP:
+                    return
+                if 'error' not in job:
+                    try:
+                        ctx = self.pipeline.render(job['ctx'], use_rotation=self.use_rotation)
+                        output_dir = os.path.dirname(job['output'])
+                        if output_dir:
+                            os.makedirs(output_dir, exist_ok=True)
+                        self.pipeline.save(ctx, job['output'])
+                        self.pipeline.record_metrics(ctx)
+                    except Exception as e:
+                        job['error'] = f"render/save: {e}"
+
+                result = {
+                    'input': job['input'],
+                    'output': job['output'],
+                    'status': 'failed' if 'error' in job else 'ok',
+                    'error': job.get('error'),
+                    'seconds': time.time() - job['started'],
+                }
+                self.results.append(result)
+                progress.write(json.dumps(result, ensure_ascii=False) + "\n")
+                progress.flush()
+                in_flight.release()
@@ -0,0 +1,277 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def normalize_text(text):
+    """
+    캐시 키 생성을 위해 텍스트를 정규화합니다.
+    (NFKC 정규화 + 연속 공백 축약 + 앞뒤 공백 제거)
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class TranslationCache:
+    """
+    SQLite 기반의 영구 번역 캐시입니다.
+    - 키: 정규화된 원문 + 대상 언어 + 모델 이름 + 프롬프트 버전
+    - 최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다 (LRU).
+      항목 수는 매번 세지 않고 추정치가 최대치를 넘을 때만 세며, 한 번에 최대치의 1%를 더 지워 다음 확인까지 여유를 둡니다.
+    - WAL 모드로 열어 여러 워커 프로세스가 같은 파일을 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, path, max_entries=100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # timeout: 다른 프로세스가 쓰기 잠금을 잡고 있으면 최대 30초 대기
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_accessed ON translations (accessed)")
+        # 항목 수 추정치 (put마다 1 증가, 덮어쓰기나 다른 프로세스의 쓰기는 최대치를 넘었을 때 다시 세어 바로잡음)
+        (self._count,) = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+
+    @classmethod
+    def from_env(cls):
+        """
+        환경 변수로 캐시를 생성합니다. TRANSLATION_CACHE_PATH가 빈 문자열이면 캐시를 사용하지 않습니다.
+        """
+        path = os.getenv("TRANSLATION_CACHE_PATH", ".cache/translations.sqlite3")
+        if not path:
+            return None
+        max_entries = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "100000"))
+        return cls(path, max_entries=max_entries)
+
+    @staticmethod
+    def make_key(text, target_lang, model_name, prompt_version):
+        raw = "\x1f".join([normalize_text(text), target_lang, model_name or "", prompt_version])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE translations SET accessed = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO translations (key, value, accessed) VALUES (?, ?, ?)",
+                    (key, value, time.time()),
+                )
+                self._count += 1
+                if self._count > self.max_entries:
+                    # 전체 테이블을 세는 것은 추정치가 최대치를 넘었을 때만
+                    (count,) = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+                    overflow = count - self.max_entries
+                    if overflow > 0:
+                        overflow += max(1, self.max_entries // 100) - 1
+                        self._conn.execute(
+                            "DELETE FROM translations WHERE key IN"
+                            " (SELECT key FROM translations ORDER BY accessed LIMIT ?)",
+                            (overflow,),
+                        )
+                    self._count = count - max(0, overflow)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def stats(self):
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM translations")
+            self._count = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def array_digest(array):
+    """
+    ndarray(이미지/마스크)의 내용 해시 (모양과 dtype 포함)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{array.shape}|{array.dtype}".encode("ascii"))
+    digest.update(memoryview(array if array.flags.c_contiguous else array.copy()).cast("B"))
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    파이프라인 단계 결과(탐지 결과, 복원된 배경 등)를 내용 해시로 저장하는 디스크 캐시입니다.
+    - 키: 입력 내용 해시 + 단계 설정(모델/언어/파라미터)의 해시 → 입력이 바뀐 단계만 다시 계산
+    - 값: <root>/<stage>/<key 앞 2자리>/<key> 파일, 인덱스(크기/마지막 사용 시각)는 SQLite
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다 (LRU).
+    - 파일은 임시 파일에 쓴 뒤 rename하므로 여러 프로세스가 같은 디렉터리를 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, root, max_bytes=2 * 1024 ** 3):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(root, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite3"), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " stage TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed)")
+
+    @classmethod
+    def from_env(cls):
+        """
+        환경 변수로 캐시를 생성합니다. STAGE_CACHE_DIR가 빈 문자열이면 캐시를 사용하지 않습니다.
+        """
+        root = os.getenv("STAGE_CACHE_DIR", ".cache/stages")
+        if not root:
+            return None
+        max_mb = float(os.getenv("STAGE_CACHE_MAX_MB", "2048"))
+        return cls(root, max_bytes=int(max_mb * 1024 * 1024))
+
+    @staticmethod
+    def make_key(stage, *parts):
+        raw = "\x1f".join([stage] + [str(part) for part in parts])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, stage, key):
+        return os.path.join(self.root, stage, key[:2], key)
+
+    def get(self, stage, key):
+        """
+        저장된 bytes 또는 None
+        """
+        path = self._path(stage, key)
+        with self._lock:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                # 다른 프로세스가 지웠거나 인덱스만 남은 경우
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses[stage] = self.misses.get(stage, 0) + 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            self.hits[stage] = self.hits.get(stage, 0) + 1
+            return data
+
+    def put(self, stage, key, data):
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, stage, size, accessed) VALUES (?, ?, ?, ?)",
+                    (key, stage, len(data), time.time()),
+                )
+                evicted = self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        for old_stage, old_key in evicted:
+            self._remove_file(old_stage, old_key)
+
+    def _evict(self):
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        evicted = []
+        if total <= self.max_bytes:
+            return evicted
+        for key, stage, size in self._conn.execute("SELECT key, stage, size FROM entries ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append((stage, key))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for _, key in evicted])
+        return evicted
+
+    def _remove_file(self, stage, key):
+        try:
+            os.remove(self._path(stage, key))
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY stage ORDER BY stage").fetchall()
+        return {
+            "path": self.root,
+            "max_bytes": self.max_bytes,
+            "stages": {
+                stage: {"entries": entries, "bytes": size,
+                        "hits": self.hits.get(stage, 0), "misses": self.misses.get(stage, 0)}
+                for stage, entries, size in rows
+            },
+        }
+
+    def clear(self, stage=None):
+        """
+        stage를 지정하면 그 단계만, 아니면 전부 삭제합니다.
+        """
+        with self._lock:
+            if stage is None:
+                rows = self._conn.execute("SELECT stage, key FROM entries").fetchall()
+                self._conn.execute("DELETE FROM entries")
+            else:
+                rows = self._conn.execute("SELECT stage, key FROM entries WHERE stage = ?", (stage,)).fetchall()
+                self._conn.execute("DELETE FROM entries WHERE stage = ?", (stage,))
+        for row_stage, key in rows:
+            self._remove_file(row_stage, key)
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,54 +1,138 @@
-import cv2
+import os
 import numpy as np
 
-def get_dominant_color(image_cv2: np.ndarray) -> tuple:
+# 배경색 추정 방식: median(글자 픽셀에 덜 흔들림) / mean(기존 방식)
+COLOR_ESTIMATOR = os.getenv("COLOR_ESTIMATOR", "median")
+
+
+def box_rects(boxes, pad, width, height):
+    """
+    다각형 박스들을 pad만큼 넓힌 (x0, y0, x1, y1) 사각형 배열로 변환합니다. (이미지 범위로 자름)
+    Returns: (N, 4) int 배열
+    """
+    if len(boxes) == 0:
+        return np.zeros((0, 4), dtype=np.int64)
+    try:
+        points = np.stack([np.asarray(b) for b in boxes])
+        mins, maxs = points.min(axis=1), points.max(axis=1)
+    except ValueError:
+        # 꼭짓점 수가 다른 박스가 섞여 있으면 하나씩 계산
+        mins = np.array([np.asarray(b).min(axis=0) for b in boxes])
+        maxs = np.array([np.asarray(b).max(axis=0) for b in boxes])
+    rects = np.concatenate([mins - pad, maxs + pad], axis=1).astype(np.int64)
+    rects[:, [0, 2]] = np.clip(rects[:, [0, 2]], 0, width)
+    rects[:, [1, 3]] = np.clip(rects[:, [1, 3]], 0, height)
+    return rects
+
+
+def _ring_bands(rects, border):
+    """
+    각 사각형의 테두리(두께 border)를 서로 겹치지 않는 4개의 띠(상/하/좌/우)로 나눕니다.
+    사각형이 border*2보다 작으면 띠들이 사각형 전체를 덮습니다.
+    Returns: (N, 4, 4) 배열 - 사각형마다 [위, 아래, 왼쪽, 오른쪽] 띠의 (x0, y0, x1, y1)
+    """
+    x0, y0, x1, y1 = rects.T
+    inner_y0 = np.minimum(y0 + border, y1)
+    inner_y1 = np.maximum(y1 - border, inner_y0)
+    inner_x0 = np.minimum(x0 + border, x1)
+    inner_x1 = np.maximum(x1 - border, inner_x0)
+    return np.stack([
+        np.stack([x0, y0, x1, inner_y0], axis=1),               # 위
+        np.stack([x0, inner_y1, x1, y1], axis=1),               # 아래
+        np.stack([x0, inner_y0, inner_x0, inner_y1], axis=1),   # 왼쪽 (모서리 제외)
+        np.stack([inner_x1, inner_y0, x1, inner_y1], axis=1),   # 오른쪽 (모서리 제외)
+    ], axis=1)
+
+
+def _sample_ring(rects, border, samples):
+    """
+    각 사각형의 테두리 픽셀 중 samples개를 고르게 골라 (y, x) 좌표 배열을 만듭니다.
+    테두리를 띠 순서(위→아래→왼→오른쪽, 띠 안에서는 행 우선)로 한 줄로 세운 뒤 같은 간격으로 뽑으므로
+    모든 영역이 같은 개수의 샘플을 가지며, 픽셀이 samples개보다 적은 영역은 같은 픽셀을 여러 번 씁니다.
+    Returns: ys (N, samples), xs (N, samples), 테두리 픽셀 수 (N,)
+    """
+    bands = _ring_bands(rects, border).astype(np.int32)
+    widths = np.maximum(bands[..., 2] - bands[..., 0], 0)
+    areas = widths * np.maximum(bands[..., 3] - bands[..., 1], 0)
+    ends = np.cumsum(areas, axis=1, dtype=np.int32)
+    ring = ends[:, 3]
+
+    # 한 줄로 세운 테두리에서의 위치 → (띠 번호, 띠 안에서의 위치)
+    local = ((np.arange(samples, dtype=np.float32) + 0.5) / samples * ring[:, None]).astype(np.int32)
+    band = (local >= ends[:, 0, None]).astype(np.int32)
+    band += local >= ends[:, 1, None]
+    band += local >= ends[:, 2, None]
+    # (N, 4) 띠 속성을 평평하게 펴서 (영역 번호 * 4 + 띠 번호)로 한 번에 가져옴
+    flat = band + 4 * np.arange(len(rects), dtype=np.int32)[:, None]
+    offset = local - (ends - areas).ravel()[flat]
+    band_width = np.maximum(widths, 1).ravel()[flat]
+    ys = bands[..., 1].ravel()[flat] + offset // band_width
+    xs = bands[..., 0].ravel()[flat] + offset % band_width
+    return ys, xs, ring
+
+
+def border_colors(image_cv2: np.ndarray, rects, border=5, estimator=None, samples=256) -> np.ndarray:
+    """
+    여러 사각형 영역의 테두리 픽셀로 배경색을 한 번에 추정합니다.
+    영역마다 테두리에서 고르게 뽑은 samples개의 픽셀 좌표를 하나의 (N, samples) 인덱스 배열로 만들어
+    한 번에 가져오므로(gather), 영역 수만큼 잘라내고 합치는 작은 배열 할당이 없습니다.
+
+    Args:
+        image_cv2: BGR 이미지
+        rects: (N, 4) [x0, y0, x1, y1] 배열 (box_rects 결과)
+        border: 테두리 두께 (px)
+        estimator: "median"(채널별 중앙값, 테두리에 걸친 글자 픽셀에 강함) 또는 "mean"
+        samples: 영역당 샘플 픽셀 수
+    Returns: (N, 3) RGB uint8 배열 (빈 영역은 (0, 0, 0))
+    """
+    estimator = estimator or COLOR_ESTIMATOR
+    rects = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+    result = np.zeros((len(rects), 3), dtype=np.uint8)
+    if len(rects) == 0 or image_cv2 is None or image_cv2.size == 0:
+        return result
+
+    ys, xs, ring = _sample_ring(rects, border, samples)
+    present = ring > 0
+    width = image_cv2.shape[1]
+    pixels = image_cv2.reshape(-1, 3)[ys[present] * width + xs[present]]
+
+    if estimator == "mean":
+        bgr = pixels.mean(axis=1, dtype=np.float32)
+    elif estimator == "median":
+        bgr = np.median(pixels, axis=1)
+    else:
+        raise ValueError(f"Unknown color estimator: {estimator}")
+
+    # BGR -> RGB 변환
+    result[present] = bgr.astype(int)[:, ::-1]
+    return result
+
+
+def get_dominant_color(image_cv2: np.ndarray, estimator="mean") -> tuple:
     """
     이미지의 가장자리를 샘플링하여 배경색을 추정합니다.
     Returns: (r, g, b) tuple
     """
     if image_cv2 is None or image_cv2.size == 0:
         return (0, 0, 0)
-        
     h, w = image_cv2.shape[:2]
-    
-    # 테두리 두께
-    border = 5
-    
-    if h <= border * 2 or w <= border * 2:
-        # 이미지가 너무 작으면 전체 평균
-        avg_bgr = np.mean(image_cv2, axis=(0, 1))
-    else:
-        # 상하좌우 테두리 픽셀만 추출
-        top = image_cv2[:border, :]
-        bottom = image_cv2[h-border:, :]
-        left = image_cv2[:, :border]
-        right = image_cv2[:, w-border:]
-        
-        # 픽셀들을 1차원 배열로 펼침
-        top_flat = top.reshape(-1, 3)
-        bottom_flat = bottom.reshape(-1, 3)
-        left_flat = left.reshape(-1, 3)
-        right_flat = right.reshape(-1, 3)
-        
-        border_pixels = np.concatenate([top_flat, bottom_flat, left_flat, right_flat])
-        avg_bgr = np.mean(border_pixels, axis=0)
-        
-    # BGR -> RGB 변환
-    avg_rgb = avg_bgr.astype(int)[::-1]
-    return tuple(avg_rgb)
+    return tuple(int(v) for v in border_colors(image_cv2, [[0, 0, w, h]], estimator=estimator)[0])
+
 
-def get_text_color(bg_color_rgb: tuple) -> tuple:
+def get_text_color(bg_color_rgb):
     """
     배경색(RGB)의 밝기(Luminance)를 계산하여,
     가독성이 좋은 텍스트 색상(검정/흰색)을 반환합니다.
+    (r, g, b) 튜플을 넘기면 튜플을, (N, 3) 배열을 넘기면 (N, 3) 배열을 반환합니다.
     """
-    r, g, b = bg_color_rgb
-    
+    colors = np.asarray(bg_color_rgb, dtype=np.float64)
+
     # ITU-R BT.601 표준 루미넌스 공식
-    luminance = (0.299 * r + 0.587 * g + 0.114 * b)
-    
+    luminance = colors @ np.array([0.299, 0.587, 0.114])
+
     # 밝기가 128 이상이면 밝은 배경 -> 검은 글씨
-    if luminance > 128:
-        return (0, 0, 0)
-    else:
-        return (255, 255, 255)
+    text = np.where((luminance > 128)[..., None], 0, 255).astype(np.uint8)
+    text = np.broadcast_to(text, colors.shape)
+    if colors.ndim == 1:
+        return tuple(int(v) for v in text)
+    return text
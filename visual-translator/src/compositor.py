@@ -0,0 +1,161 @@
+import os
+import cv2
+import numpy as np
+from src.telemetry import telemetry
+
+# 오버레이를 나누는 타일 크기 (이보다 큰 이미지는 타일별로 오버레이를 만들고 합성해 메모리를 제한)
+OVERLAY_TILE_SIZE = int(os.getenv("RENDER_OVERLAY_TILE", "2048"))
+
+
+def premultiply(layer_rgba: np.ndarray) -> np.ndarray:
+    """
+    RGBA uint8 레이어를 premultiplied float32 (색 * 알파, 알파)로 변환합니다.
+    (보간/합성 시 투명한 가장자리가 어둡게 번지지 않도록)
+    """
+    layer = layer_rgba.astype(np.float32) * (1.0 / 255.0)
+    layer[..., :3] *= layer[..., 3:4]
+    return layer
+
+
+def glyph_transform(layer_size, center, angle):
+    """
+    레이어 좌표 → 이미지 좌표 아핀 변환(2x3)을 만듭니다.
+    레이어 중심을 center에 맞추고 angle(도, 반시계 방향이 양수 - PIL rotate와 같음)만큼 회전합니다.
+    회전이 없으면 (center - 크기 // 2) 정수 위치로 평행이동만 하므로 보간 없이 그대로 복사됩니다.
+    """
+    w, h = layer_size
+    matrix = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), angle, 1.0)
+    matrix[0, 2] += center[0] - w // 2
+    matrix[1, 2] += center[1] - h // 2
+    return matrix
+
+
+def _bounds(matrix, layer_size, width, height):
+    """
+    변환된 레이어가 차지하는 이미지 영역 (x0, y0, x1, y1) (이미지 밖은 자름, 보간 여유 1px)
+    """
+    w, h = layer_size
+    corners = np.array([[0, 0, 1], [w, 0, 1], [w, h, 1], [0, h, 1]], dtype=np.float64) @ matrix.T
+    x0, y0 = np.floor(corners.min(axis=0)).astype(int) - 1
+    x1, y1 = np.ceil(corners.max(axis=0)).astype(int) + 1
+    return max(0, x0), max(0, y0), min(width, x1), min(height, y1)
+
+
+def _integer_offset(matrix):
+    """
+    회전 없이 정수 픽셀만큼 평행이동하는 변환이면 (dx, dy), 아니면 None
+    """
+    if not np.allclose(matrix[:, :2], np.eye(2)):
+        return None
+    dx, dy = matrix[:, 2]
+    if abs(dx - round(dx)) > 1e-6 or abs(dy - round(dy)) > 1e-6:
+        return None
+    return int(round(dx)), int(round(dy))
+
+
+def _clusters(rects):
+    """
+    겹치는 사각형끼리 더 이상 겹치지 않을 때까지 합칩니다. (합친 사각형, 속한 번호 리스트)
+    """
+    clusters = [(rect, [i]) for i, rect in enumerate(rects)]
+    merged = True
+    while merged:
+        merged = False
+        result = []
+        for rect, members in clusters:
+            for i, (other, other_members) in enumerate(result):
+                if rect[0] < other[2] and other[0] < rect[2] and rect[1] < other[3] and other[1] < rect[3]:
+                    result[i] = ((min(rect[0], other[0]), min(rect[1], other[1]),
+                                  max(rect[2], other[2]), max(rect[3], other[3])), other_members + members)
+                    merged = True
+                    break
+            else:
+                result.append((rect, members))
+        clusters = result
+    return clusters
+
+
+class OverlayCompositor:
+    """
+    여러 글자 레이어를 하나의 오버레이에 모은 뒤 배경에 한 번만 알파 블렌딩합니다.
+
+    - 레이어는 아핀 변환(cv2.warpAffine)으로 오버레이 좌표에 바로 그려짐 (회전된 레이어를 따로 만들지 않음)
+    - 회전이 없고 정수 좌표면 warp 없이 그대로 복사
+    - 이미지가 tile_size보다 크면 타일마다 오버레이를 만들고 합성 (메모리 = 타일 하나 분량)
+    - 타일 안에서도 서로 떨어진 글자 묶음은 따로 오버레이를 만들어, 글자가 없는 곳은 블렌딩하지 않음
+    """
+
+    def __init__(self, tile_size=None, interpolation=cv2.INTER_LINEAR):
+        self.tile_size = tile_size or OVERLAY_TILE_SIZE
+        self.interpolation = interpolation
+
+    def composite(self, background: np.ndarray, glyphs) -> np.ndarray:
+        """
+        Args:
+            background: (H, W, 3) uint8 이미지 (제자리에서 수정됨)
+            glyphs: [(premultiplied float32 RGBA 레이어, 2x3 변환 행렬), ...] - 앞쪽부터 차례로 위에 덮임
+        Returns: background
+        """
+        height, width = background.shape[:2]
+        placed = []
+        for layer, matrix in glyphs:
+            lh, lw = layer.shape[:2]
+            x0, y0, x1, y1 = _bounds(matrix, (lw, lh), width, height)
+            if x1 > x0 and y1 > y0:
+                placed.append((layer, matrix, (x0, y0, x1, y1), _integer_offset(matrix)))
+
+        overlays = 0
+        for ty in range(0, height, self.tile_size):
+            for tx in range(0, width, self.tile_size):
+                tx1, ty1 = min(width, tx + self.tile_size), min(height, ty + self.tile_size)
+                members = [p for p in placed if p[2][0] < tx1 and tx < p[2][2] and p[2][1] < ty1 and ty < p[2][3]]
+                # 타일 안으로 자른 글자 영역을 겹치는 것끼리 묶어 묶음마다 오버레이 하나
+                clipped = [(max(tx, r[0]), max(ty, r[1]), min(tx1, r[2]), min(ty1, r[3])) for _, _, r, _ in members]
+                for rect, indices in _clusters(clipped):
+                    # 나중 글자가 위에 덮이도록 원래 순서 유지
+                    self._composite_overlay(background, rect, [members[i] for i in sorted(indices)])
+                    overlays += 1
+        telemetry.count("renderer_overlays_total", overlays)
+        return background
+
+    def _composite_overlay(self, background, rect, members):
+        ox0, oy0, ox1, oy1 = rect
+        overlay = np.zeros((oy1 - oy0, ox1 - ox0, 4), dtype=np.float32)
+
+        for layer, matrix, (x0, y0, x1, y1), offset in members:
+            # 글자 영역과 오버레이의 교집합
+            ix0, iy0, ix1, iy1 = max(x0, ox0), max(y0, oy0), min(x1, ox1), min(y1, oy1)
+            if ix1 <= ix0 or iy1 <= iy0:
+                continue
+
+            if offset is not None:
+                # 평행이동만 있으면 레이어에서 필요한 부분만 잘라서 사용
+                lh, lw = layer.shape[:2]
+                sx0, sy0 = ix0 - offset[0], iy0 - offset[1]
+                cx0, cy0 = max(0, sx0), max(0, sy0)
+                cx1, cy1 = min(lw, sx0 + (ix1 - ix0)), min(lh, sy0 + (iy1 - iy0))
+                if cx1 <= cx0 or cy1 <= cy0:
+                    continue
+                patch = layer[cy0:cy1, cx0:cx1]
+                ix0, iy0 = cx0 + offset[0], cy0 + offset[1]
+                ix1, iy1 = ix0 + (cx1 - cx0), iy0 + (cy1 - cy0)
+            else:
+                # 레이어 → (교집합 영역 기준) 좌표로 직접 warp
+                shifted = matrix.copy()
+                shifted[0, 2] -= ix0
+                shifted[1, 2] -= iy0
+                patch = cv2.warpAffine(layer, shifted, (ix1 - ix0, iy1 - iy0), flags=self.interpolation,
+                                       borderMode=cv2.BORDER_CONSTANT, borderValue=(0, 0, 0, 0))
+
+            # premultiplied "over": 나중 글자가 위에 덮임
+            region = overlay[iy0 - oy0:iy1 - oy0, ix0 - ox0:ix1 - ox0]
+            region *= 1.0 - patch[..., 3:4]
+            region += patch
+
+        # 배경에 한 번만 블렌딩: out = bg * (1 - a) + color
+        target = background[oy0:oy1, ox0:ox1]
+        blended = target.astype(np.float32)
+        blended *= 1.0 - overlay[..., 3:4]
+        blended += overlay[..., :3] * 255.0
+        np.clip(blended, 0, 255, out=blended)
+        target[...] = (blended + 0.5).astype(np.uint8)
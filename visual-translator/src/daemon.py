@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import socket
+import tempfile
+import threading
+import traceback
+from src.telemetry import telemetry
+
+# 기본 소켓 경로 (사용자별로 분리)
+DEFAULT_SOCKET = os.getenv(
+    "VISUAL_TRANSLATOR_SOCKET",
+    os.path.join(tempfile.gettempdir(), f"visual-translator-{os.getuid() if hasattr(os, 'getuid') else 'user'}.sock"),
+)
+
+
+def is_supported():
+    return hasattr(socket, "AF_UNIX")
+
+
+def _recv_line(conn):
+    buffer = b""
+    while not buffer.endswith(b"\n"):
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        buffer += chunk
+    return buffer
+
+
+def send_request(request, socket_path=DEFAULT_SOCKET, timeout=None):
+    """
+    데몬에 요청(JSON 한 줄)을 보내고 응답을 반환합니다.
+    데몬이 실행 중이 아니면 None을 반환합니다.
+    """
+    if not is_supported() or not os.path.exists(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(timeout)
+            conn.connect(socket_path)
+            conn.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+            response = _recv_line(conn)
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
+    if not response:
+        return None
+    return json.loads(response)
+
+
+class TranslatorDaemon:
+    """
+    탐지기/번역기를 메모리에 올려 둔 채 Unix 소켓으로 작업을 받는 로컬 데몬입니다.
+
+    요청 (JSON 한 줄):
+        {"op": "run", "image_path": "/abs/in.png", "output": "/abs/out.png", "use_rotation": true,
+         "target_langs": ["Japanese", "English"], "options": {...}}
+        (target_langs는 선택, 주면 언어별 경로를 "outputs"로 응답)
+        (options는 클라이언트의 파이프라인 설정, 데몬 시작 설정과 다르면 처리하지 않고 "mismatch"로 다른 항목을 응답)
+        {"op": "ping"} / {"op": "shutdown"}
+    응답 (JSON 한 줄):
+        {"ok": true, "output": "...", "seconds": 1.23} 또는 {"ok": false, "error": "..."}
+        또는 {"ok": false, "mismatch": ["no_cache", ...]}
+
+    run()은 탐지기(스레드 안전하지 않음)까지 함께 쓰므로 작업은 한 번에 하나씩 처리합니다.
+    (탐지만 한 스레드에서 하고 나머지 단계를 동시에 실행하려면 --serve(src/service.py)를 쓰세요)
+    """
+
+    def __init__(self, pipeline, socket_path=DEFAULT_SOCKET, options=None):
+        self.pipeline = pipeline
+        # 파이프라인을 만들 때 쓴 설정 (요청의 options와 비교)
+        self.options = options or {}
+        self.socket_path = socket_path
+        self.started = time.time()
+        self.jobs = 0
+        self._job_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server = None
+
+    def serve_forever(self):
+        if not is_supported():
+            raise RuntimeError("Unix domain sockets are not supported on this platform")
+
+        # 이전 실행이 남긴 소켓 파일 정리 (살아 있는 데몬이면 중복 실행 방지)
+        if os.path.exists(self.socket_path):
+            if send_request({"op": "ping"}, self.socket_path, timeout=2) is not None:
+                raise RuntimeError(f"Daemon already running on {self.socket_path}")
+            os.unlink(self.socket_path)
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self._server.listen(16)
+        self._server.settimeout(0.5)
+        print(f"[Daemon] Listening on {self.socket_path} (pid {os.getpid()})")
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn, _ = self._server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self._server.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            print("[Daemon] Stopped.")
+
+    def shutdown(self):
+        self._stop.set()
+
+    def _handle(self, conn):
+        with conn:
+            try:
+                request = json.loads(_recv_line(conn) or b"{}")
+                response = self._dispatch(request)
+            except Exception as e:
+                traceback.print_exc()
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            try:
+                conn.sendall(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            except OSError:
+                pass
+
+    def _dispatch(self, request):
+        op = request.get("op", "run")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid(), "uptime": time.time() - self.started, "jobs": self.jobs}
+        if op == "shutdown":
+            self.shutdown()
+            return {"ok": True}
+        if op != "run":
+            return {"ok": False, "error": f"Unknown op: {op}"}
+
+        options = request.get("options")
+        if options is not None:
+            mismatch = sorted(key for key in set(options) | set(self.options) if options.get(key) != self.options.get(key))
+            if mismatch:
+                return {"ok": False, "mismatch": mismatch}
+
+        with self._job_lock:
+            start = time.perf_counter()
+            ctx = self.pipeline.run(request["image_path"], request["output"], use_rotation=request.get("use_rotation", True),
+                                    target_langs=request.get("target_langs"))
+            self.jobs += 1
+            telemetry.flush()
+            return {"ok": True, "output": request["output"], "outputs": ctx.get('outputs'),
+                    "seconds": time.perf_counter() - start}
@@ -1,31 +1,64 @@
 import sys
 import os
+import threading
+from abc import ABC, abstractmethod
+import cv2
 import numpy as np
-from paddleocr import PaddleOCR
 from dotenv import load_dotenv
+from src.telemetry import telemetry
+from src.tiling import detect_tiled
+from src.regions import RegionBatch
 
 load_dotenv()
 
-class TextDetector:
-    def __init__(self):
-        # OCR 언어 설정 (기본값: korean)
-        lang = os.getenv("OCR_LANG", "korean")
-        
-        # PaddleOCR issue: It parses sys.argv and conflicts with main argparse
-        # Workaround: Clear sys.argv temporarily
-        original_argv = sys.argv
-        sys.argv = ['']
-        try:
-            # use_angle_cls=True: 텍스트 방향(각도) 분류 활성화
-            self.ocr = PaddleOCR(use_angle_cls=True, lang=lang)
-        finally:
-            sys.argv = original_argv
+class Detector(ABC):
+    """
+    텍스트 탐지기 공통 인터페이스 (PaddleOCR / ONNX Runtime 등 백엔드가 상속)
+    타일 감지, 신뢰도 필터, 여러 이미지 묶음 처리, 캐시 키 구성은 여기서 공통으로 처리하고
+    하위 클래스는 load()와 _detect_many()(또는 _detect_one())만 구현합니다.
+    """
+    backend = "base"
 
-    def detect(self, image_path):
+    def __init__(self, tile_size=None, tile_overlap=None, tile_workers=None, coarse_to_fine=None, min_confidence=None):
+        # 이 점수보다 낮은 인식 결과는 버림 (기본값 0.85: 손글씨/잡음 제거)
+        self.min_confidence = min_confidence if min_confidence is not None else float(os.getenv("OCR_MIN_CONFIDENCE", "0.85"))
+        # 타일 감지: 긴 변이 tile_size보다 큰 이미지는 겹치는 타일로 나눠 감지 (0이면 사용 안 함)
+        # PaddleOCR는 기본적으로 긴 변을 960px 근처로 줄여서 감지하므로, 큰 포스터/스캔본의 작은 글자를 놓치기 쉽습니다.
+        self.tile_size = tile_size if tile_size is not None else int(os.getenv("OCR_TILE_SIZE", "0"))
+        self.tile_overlap = tile_overlap if tile_overlap is not None else int(os.getenv("OCR_TILE_OVERLAP", "160"))
+        self.tile_workers = tile_workers if tile_workers is not None else int(os.getenv("OCR_TILE_WORKERS", "1"))
+        if coarse_to_fine is None:
+            coarse_to_fine = os.getenv("OCR_COARSE_TO_FINE", "0").lower() in ("1", "true", "yes")
+        self.coarse_to_fine = coarse_to_fine
+
+    @abstractmethod
+    def load(self):
+        """
+        모델을 로드합니다. (이미 로드했으면 아무것도 하지 않음, 여러 스레드에서 호출해도 안전해야 함)
+        """
+        pass
+
+    def warmup(self):
+        """
+        모델을 미리 로드합니다. (데몬/서비스 시작 시 호출)
+        """
+        self.load()
+        return self
+
+    def cache_identity(self):
+        """
+        탐지 결과 캐시 키에 들어가는 설정 (바뀌면 캐시된 탐지 결과를 쓰지 않음)
+        """
+        return (f"tile={self.tile_size}/{self.tile_overlap}|coarse_to_fine={self.coarse_to_fine}"
+                f"|min_confidence={self.min_confidence}")
+
+    def detect(self, image):
         """
         이미지에서 텍스트를 감지합니다.
+        Args:
+            image: 이미지 파일 경로 또는 이미 디코딩된 BGR 이미지(np.ndarray)
         Returns:
-            list[dict]: 감지된 텍스트 정보 리스트
+            RegionBatch: 감지된 텍스트 영역 (각 영역은 아래 dict처럼 접근 가능)
             [
                 {
                     'box': np.array([[x1,y1], [x2,y2], [x3,y3], [x4,y4]]),
@@ -35,61 +68,162 @@ class TextDetector:
                 ...
             ]
         """
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(f"Image file not found: {image_path}")
+        if not isinstance(image, np.ndarray) and not os.path.exists(image):
+            raise FileNotFoundError(f"Image file not found: {image}")
+
+        if self.tile_size:
+            if not isinstance(image, np.ndarray):
+                image = cv2.imread(image)
+            if max(image.shape[:2]) > self.tile_size:
+                return RegionBatch.from_regions(detect_tiled(
+                    image, self._detect_many,
+                    tile_size=self.tile_size,
+                    overlap=self.tile_overlap,
+                    max_workers=self.tile_workers,
+                    coarse_to_fine=self.coarse_to_fine,
+                ))
+        return self._detect_one(image)
+
+    def detect_batch(self, images):
+        """
+        여러 이미지를 한 번에 감지합니다. (백엔드가 지원하면 한 번의 모델 호출로 묶음)
+        Returns:
+            list[RegionBatch]: 입력 순서와 같은 이미지별 감지 결과
+        """
+        images = list(images)
+        if self.tile_size:
+            return [self.detect(image) for image in images]
+        return self._detect_many(images)
+
+    def _detect_one(self, image):
+        return self._detect_many([image])[0]
+
+    def _detect_many(self, images):
+        return [self._detect_one(image) for image in images]
+
+    def _regions(self, polys, texts, scores):
+        """
+        인식 결과(다각형, 문자열, 점수)에 신뢰도 필터를 적용해 RegionBatch로 만듭니다.
+        """
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        # Filter low confidence text (Garbage filtering)
+        # Threshold set high to avoid handwriting noise
+        keep = np.flatnonzero(scores >= self.min_confidence)
+        telemetry.count("detector_low_confidence_total", len(scores) - len(keep))
+        return RegionBatch.from_arrays([polys[i] for i in keep], [texts[i] for i in keep], scores[keep])
+
+
+class TextDetector(Detector):
+    """
+    PaddleOCR 백엔드 (기본값)
+    """
+    backend = "paddleocr"
+
+    def __init__(self, lang=None, tile_size=None, tile_overlap=None, tile_workers=None, coarse_to_fine=None,
+                 min_confidence=None):
+        super().__init__(tile_size=tile_size, tile_overlap=tile_overlap, tile_workers=tile_workers,
+                         coarse_to_fine=coarse_to_fine, min_confidence=min_confidence)
+        # OCR 언어 설정 (기본값: korean)
+        self.lang = lang or os.getenv("OCR_LANG", "korean")
+        # PaddleOCR 모델은 무겁기 때문에 처음 사용할 때(또는 warmup() 호출 시) 생성합니다.
+        self._ocr = None
+        self._ocr_lock = threading.Lock()
+
+    @property
+    def ocr(self):
+        if self._ocr is None:
+            with self._ocr_lock:
+                if self._ocr is None:
+                    with telemetry.span("detector.load_model", backend="paddleocr", lang=self.lang):
+                        self._ocr = self._build_ocr()
+        return self._ocr
+
+    def _build_ocr(self):
+        from paddleocr import PaddleOCR
+
+        # PaddleOCR issue: It parses sys.argv and conflicts with main argparse
+        # Workaround: Clear sys.argv temporarily
+        original_argv = sys.argv
+        sys.argv = ['']
+        try:
+            # use_angle_cls=True: 텍스트 방향(각도) 분류 활성화
+            return PaddleOCR(use_angle_cls=True, lang=self.lang)
+        finally:
+            sys.argv = original_argv
+
+    def load(self):
+        self.ocr
+
+    def cache_identity(self):
+        """
+        탐지 결과 캐시 키에 들어가는 설정 (바뀌면 캐시된 탐지 결과를 쓰지 않음)
+        """
+        from importlib.metadata import version, PackageNotFoundError
+        try:
+            paddleocr_version = version("paddleocr")
+        except PackageNotFoundError:
+            paddleocr_version = "unknown"
+        return f"paddleocr={paddleocr_version}|lang={self.lang}|{super().cache_identity()}"
 
-        # PaddleOCR 실행
+    def _detect_one(self, image):
+        # PaddleOCR 실행 (경로와 ndarray 모두 입력으로 받음)
         # cls=True: 방향 분류 실행 (에러 발생으로 제거)
-        result = self.ocr.ocr(image_path)
-        print(f"DEBUG: OCR result type: {type(result)}")
-        print(f"DEBUG: OCR result: {result}")
-        if result:
-             print(f"DEBUG: result[0] type: {type(result[0])}")
-        
-        parsed_results = []
-        
+        with telemetry.span("detector.ocr", backend="paddleocr") as span:
+            result = self.ocr.ocr(image)
+            span.set(result_type=type(result[0]).__name__ if result else None)
+
+        parsed_results = self._parse(result)
+        telemetry.count("detector_regions_total", len(parsed_results))
+        return parsed_results
+
+    def _detect_many(self, images):
+        if not hasattr(self.ocr, 'predict') or len(images) <= 1:
+            return [self._detect_one(image) for image in images]
+
+        with telemetry.span("detector.ocr", backend="paddleocr", batch=len(images)):
+            results = list(self.ocr.predict(images))
+
+        parsed = [self._parse([result]) for result in results]
+        telemetry.count("detector_regions_total", sum(len(p) for p in parsed))
+        return parsed
+
+    def _parse(self, result):
+        """
+        PaddleOCR 결과(PaddleX dict 형식 / 레거시 리스트 형식)를 RegionBatch로 변환합니다.
+        신뢰도 필터는 점수 배열에 한 번에 적용합니다.
+        """
         if not result:
-            return parsed_results
+            return RegionBatch.empty()
 
-        # PaddleX result format (dict-like object)
-        # result[0] is typically a dict with 'rec_texts', 'rec_polys', 'rec_scores'
         first_res = result[0]
-        
+
         # PaddleX result format (dict-like object)
-        first_res = result[0]
-        
-        # Check for PaddleX dict format
+        # result[0] is typically a dict with 'rec_texts', 'rec_polys', 'rec_scores'
         if hasattr(first_res, 'keys') and 'rec_texts' in first_res:
-             rec_texts = first_res['rec_texts']
-             rec_polys = first_res['rec_polys']
-             rec_scores = first_res['rec_scores']
-             
-             for poly, text, score in zip(rec_polys, rec_texts, rec_scores):
-                 # Filter low confidence text (Garbage filtering)
-                 if score < 0.85: # Threshold set high to avoid handwriting noise
-                     continue
-                     
-                 parsed_results.append({
-                     'box': np.array(poly).astype(np.int32),
-                     'text': text,
-                     'confidence': score
-                 })
+            polys = list(first_res['rec_polys'])
+            texts = list(first_res['rec_texts'])
+            scores = np.asarray(first_res['rec_scores'], dtype=np.float64)
         # Legacy list-of-lists format
         elif isinstance(first_res, list):
-            for line in first_res:
-                box_points = line[0] 
-                text_info = line[1]
-                score = text_info[1]
-                
-                if score < 0.85:
-                    continue
-
-                parsed_results.append({
-                    'box': np.array(box_points).astype(np.int32),
-                    'text': text_info[0],
-                    'confidence': score
-                })
+            polys = [line[0] for line in first_res]
+            texts = [line[1][0] for line in first_res]
+            scores = np.array([line[1][1] for line in first_res], dtype=np.float64)
         else:
             print(f"Warning: Unknown PaddleOCR result format: {type(first_res)}")
-            
-        return parsed_results
+            return RegionBatch.empty()
+
+        return self._regions(polys, texts, scores)
+
+
+def create_detector(backend=None, **kwargs):
+    """
+    설정된 백엔드의 탐지기를 만듭니다. (DETECTOR_BACKEND: paddleocr(기본값) / onnx)
+    ONNX Runtime 백엔드는 선택 의존성이므로 사용할 때만 import합니다.
+    """
+    backend = (backend or os.getenv("DETECTOR_BACKEND", "paddleocr")).lower()
+    if backend == "paddleocr":
+        return TextDetector(**kwargs)
+    if backend == "onnx":
+        from src.onnx_detector import OnnxTextDetector
+        return OnnxTextDetector(**kwargs)
+    raise ValueError(f"Unknown detector backend: {backend} (expected 'paddleocr' or 'onnx')")
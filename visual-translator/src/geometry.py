@@ -0,0 +1,40 @@
+def merge_rects(rects):
+    """
+    서로 겹치는 (x0, y0, x1, y1) 사각형들을 더 이상 겹치지 않을 때까지 합칩니다.
+    """
+    rects = list(rects)
+    merged = True
+    while merged:
+        merged = False
+        result = []
+        for rect in rects:
+            for i, other in enumerate(result):
+                if rect[0] < other[2] and other[0] < rect[2] and rect[1] < other[3] and other[1] < rect[3]:
+                    result[i] = (min(rect[0], other[0]), min(rect[1], other[1]),
+                                 max(rect[2], other[2]), max(rect[3], other[3]))
+                    merged = True
+                    break
+            else:
+                result.append(rect)
+        rects = result
+    return rects
+
+
+def cluster_rects(rects, max_count):
+    """
+    사각형 수가 max_count 이하가 될 때까지, 합쳤을 때 늘어나는 면적이 가장 작은 쌍부터 합칩니다.
+    """
+    rects = list(rects)
+    area = lambda r: (r[2] - r[0]) * (r[3] - r[1])
+    while len(rects) > max_count:
+        best = None
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                a, b = rects[i], rects[j]
+                union = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                cost = area(union) - area(a) - area(b)
+                if best is None or cost < best[0]:
+                    best = (cost, i, j, union)
+        _, i, j, union = best
+        rects = [r for k, r in enumerate(rects) if k not in (i, j)] + [union]
+    return merge_rects(rects)
@@ -0,0 +1,65 @@
+import os
+import csv
+import json
+from dotenv import load_dotenv
+from src.cache import normalize_text
+from src.translator import TranslationBackend
+
+load_dotenv()
+
+# 오프라인 용어집 파일 (TRANSLATE_BACKENDS에 glossary를 넣으면 사용)
+GLOSSARY_PATH = os.getenv("GLOSSARY_PATH", "")
+
+
+def _key(text):
+    return normalize_text(text).casefold()
+
+
+class GlossaryBackend(TranslationBackend):
+    """
+    용어집 파일로 번역하는 완전 오프라인 백엔드 (네트워크 / 모델 없음)
+    원문 전체가 용어집에 있는 텍스트만 번역하고(대소문자/공백 무시), 나머지는 결과에서 빠져 다음 백엔드로 넘어갑니다.
+    대상 언어 이름은 대소문자를 무시하고 비교합니다. (target_lang과 같은 이름을 쓰세요)
+
+    파일 형식:
+        - JSON: {"원문": {"Japanese": "번역문", "English": "..."}, ...}
+        - TSV/CSV: 첫 줄은 'source<TAB>Japanese<TAB>English' 같은 헤더, 다음 줄부터 원문과 언어별 번역 (빈 칸은 없음)
+    """
+    name = "glossary"
+    # 파일에서 바로 찾으므로 번역 캐시에 저장하지 않음
+    cacheable = False
+
+    def __init__(self, entries):
+        """
+        entries: {원문: {언어: 번역문}}
+        """
+        self.entries = {}
+        for source, translations in entries.items():
+            bucket = self.entries.setdefault(_key(source), {})
+            for lang, text in translations.items():
+                if text:
+                    bucket[lang.strip().casefold()] = text
+
+    @classmethod
+    def from_path(cls, path):
+        if os.path.splitext(path)[1].lower() == ".json":
+            with open(path, encoding="utf-8") as f:
+                return cls(json.load(f))
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f, delimiter="," if path.lower().endswith(".csv") else "\t"))
+        if not rows:
+            return cls({})
+        languages = rows[0][1:]
+        return cls({row[0]: dict(zip(languages, row[1:])) for row in rows[1:] if row and row[0].strip()})
+
+    def cache_identity(self):
+        return f"glossary({len(self.entries)})"
+
+    def translate_batch(self, texts, target_lang):
+        lang = (target_lang or "").strip().casefold()
+        results = {}
+        for i, text in enumerate(texts):
+            translated = self.entries.get(_key(text), {}).get(lang)
+            if translated is not None:
+                results[i] = translated
+        return results
@@ -3,44 +3,253 @@ import cv2
 import numpy as np
 import requests
 import os
-import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.telemetry import telemetry
+from src.geometry import merge_rects, cluster_rects
 
 class Inpainter(ABC):
+    """
+    inpaint()는 서비스 모드(src/service.py)에서 여러 작업 스레드가 동시에 호출하므로
+    호출 사이에 바뀌는 인스턴스 상태(통계, 연결 등)는 잠금이나 스레드별 저장소로 보호해야 합니다.
+    """
+
     @abstractmethod
     def inpaint(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
         pass
 
+    def cache_identity(self):
+        """
+        복원 결과 캐시 키에 들어가는 설정 (구현/파라미터가 바뀌면 캐시된 배경을 쓰지 않음)
+        """
+        return type(self).__name__
+
+    def last_result_cacheable(self):
+        """
+        이 스레드의 마지막 inpaint() 결과를 캐시해도 되는지 (일시적인 실패로 대체 결과를 만든 경우 False)
+        """
+        return True
+
+def mask_rois(mask: np.ndarray, padding: int) -> list:
+    """
+    마스크의 연결 요소마다 padding만큼 넓힌 bounding box를 구하고, 겹치는 박스는 합칩니다.
+    Returns:
+        list[tuple]: [(x0, y0, x1, y1), ...]
+    """
+    h, w = mask.shape[:2]
+    count, _, stats, _ = cv2.connectedComponentsWithStats((mask > 0).astype(np.uint8), connectivity=8)
+    rects = []
+    for x, y, bw, bh, _ in stats[1:count]:
+        rects.append((max(0, x - padding), max(0, y - padding),
+                      min(w, x + bw + padding), min(h, y + bh + padding)))
+    return merge_rects(rects)
+
+
 class OpenCVInpainter(Inpainter):
+    def __init__(self, radius=3, roi_padding=16, max_workers=None, full_frame_ratio=0.5):
+        """
+        Args:
+            radius: cv2.inpaint 반경
+            roi_padding: 마스크 연결 요소 주변으로 함께 잘라낼 여백 (복원 시 참고할 주변 배경)
+            max_workers: ROI 병렬 처리 스레드 수 (None이면 CPU 수 기준)
+            full_frame_ratio: ROI 면적 합이 전체의 이 비율을 넘으면 전체 프레임으로 처리
+        """
+        self.radius = radius
+        self.roi_padding = roi_padding
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.full_frame_ratio = full_frame_ratio
+
+    def cache_identity(self):
+        return f"OpenCVInpainter|radius={self.radius}|roi_padding={self.roi_padding}|full_frame_ratio={self.full_frame_ratio}"
+
     def inpaint(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
         """
         OpenCV의 inpaint 함수를 사용하여 텍스트 영역을 복원합니다.
+        마스크가 이미지 일부만 덮으면 연결 요소별 ROI만 잘라서 (스레드 풀에서 병렬로) 복원한 뒤
+        원래 위치에 다시 붙여넣습니다. (cv2.inpaint는 GIL을 해제하므로 스레드로 병렬화됩니다)
         """
-        restored_image = cv2.inpaint(image, mask, 3, cv2.INPAINT_NS)
+        with telemetry.span("inpainter.opencv") as span:
+            return self._inpaint(image, mask, span)
+
+    def _inpaint(self, image, mask, span):
+        rois = mask_rois(mask, self.roi_padding)
+        span.set(rois=len(rois))
+        if not rois:
+            return image.copy()
+
+        roi_area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rois)
+        span.set(roi_pixels=roi_area)
+        if roi_area >= self.full_frame_ratio * mask.shape[0] * mask.shape[1]:
+            span.set(mode="full_frame")
+            return cv2.inpaint(image, mask, self.radius, cv2.INPAINT_NS)
+
+        span.set(mode="roi")
+        restored_image = image.copy()
+
+        def inpaint_roi(rect):
+            x0, y0, x1, y1 = rect
+            restored_image[y0:y1, x0:x1] = cv2.inpaint(
+                np.ascontiguousarray(image[y0:y1, x0:x1]),
+                np.ascontiguousarray(mask[y0:y1, x0:x1]),
+                self.radius, cv2.INPAINT_NS)
+
+        # 합쳐진 ROI는 서로 겹치지 않으므로 각 스레드가 다른 영역에 씁니다.
+        if len(rois) == 1 or self.max_workers <= 1:
+            for rect in rois:
+                inpaint_roi(rect)
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                list(pool.map(inpaint_roi, rois))
         return restored_image
 
+STABILITY_ERASE_URL = os.getenv("STABILITY_ERASE_URL", "https://api.stability.ai/v2beta/stable-image/edit/erase")
+
+# Stability API가 받는 최소 변 길이
+STABILITY_MIN_SIDE = 64
+
+
+def _expand_rect(rect, min_side, width, height):
+    """
+    사각형의 각 변이 min_side 이상이 되도록 이미지 범위 안에서 넓힙니다.
+    """
+    x0, y0, x1, y1 = rect
+    if x1 - x0 < min_side:
+        x0 = max(0, min(x0 - (min_side - (x1 - x0)) // 2, width - min_side))
+        x1 = min(width, x0 + min_side)
+    if y1 - y0 < min_side:
+        y0 = max(0, min(y0 - (min_side - (y1 - y0)) // 2, height - min_side))
+        y1 = min(height, y0 + min_side)
+    return (x0, y0, x1, y1)
+
+
+def _feather_blend(original, restored, mask, rect, image_size, feather):
+    """
+    복원된 크롭을 원본 크롭에 섞습니다.
+    마스크 영역은 복원 결과를 그대로 쓰고, 이미지 내부에 있는 크롭 경계 쪽으로 갈수록
+    원본 비율을 높여(feather 픽셀) 이음새가 보이지 않게 합니다.
+    """
+    x0, y0, x1, y1 = rect
+    width, height = image_size
+    h, w = original.shape[:2]
+
+    def ramp(length, fade_start, fade_end):
+        weights = np.ones(length, np.float32)
+        n = min(feather, length // 2)
+        if n > 0:
+            steps = (np.arange(n, dtype=np.float32) + 1) / (n + 1)
+            if fade_start:
+                weights[:n] = steps
+            if fade_end:
+                weights[-n:] = steps[::-1]
+        return weights
+
+    weight = np.minimum.outer(ramp(h, y0 > 0, y1 < height), ramp(w, x0 > 0, x1 < width))
+    weight = np.maximum(weight, (mask > 0).astype(np.float32))[..., None]
+    blended = restored.astype(np.float32) * weight + original.astype(np.float32) * (1 - weight)
+    return np.clip(blended + 0.5, 0, 255).astype(np.uint8)
+
+
 class StabilityAIInpainter(Inpainter):
-    def __init__(self):
+    def __init__(self, crop_mode=True, crop_padding=64, max_crops=4, feather=16, timeout=(10, 120)):
+        """
+        Args:
+            crop_mode: True면 마스크 영역 주변만 잘라서 업로드하고 결과를 원본에 섞어 넣습니다.
+            crop_padding: 마스크 연결 요소 주변으로 함께 보낼 여백 (AI가 참고할 배경)
+            max_crops: 요청할 최대 크롭 수 (넘으면 가까운 크롭끼리 합침)
+            feather: 크롭 경계 블렌딩 폭 (픽셀)
+            timeout: requests 타임아웃 (연결, 읽기) 초
+        """
         self.api_key = os.getenv("STABILITY_API_KEY")
         if not self.api_key:
             print("Warning: STABILITY_API_KEY not found. Fallback to OpenCV.")
-            
+        self.url = STABILITY_ERASE_URL
+        self.crop_mode = crop_mode
+        self.crop_padding = crop_padding
+        self.max_crops = max_crops
+        self.feather = feather
+        self.timeout = timeout
+        # 연결(TLS 핸드셰이크 포함)을 요청 간에 재사용 - requests.Session은 스레드 안전하지 않으므로 스레드마다 하나씩
+        self.bytes_sent = 0
+        self._bytes_lock = threading.Lock()
+        self._local = threading.local()
+
+    def cache_identity(self):
+        if not self.api_key:
+            # 키가 없으면 항상 OpenCV로 복원하므로 그 결과와 같은 키를 사용
+            return OpenCVInpainter().cache_identity()
+        return (f"StabilityAIInpainter|url={self.url}|crop_mode={self.crop_mode}|crop_padding={self.crop_padding}"
+                f"|max_crops={self.max_crops}|feather={self.feather}")
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def last_result_cacheable(self):
+        # API 오류로 OpenCV 결과가 섞였으면 캐시하지 않음 (다음 실행에서 다시 시도)
+        return not getattr(self._local, "fell_back", False)
+
     def inpaint(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
         """
         Stability AI의 Erase API를 사용하여 텍스트 영역을 복원(지우기)합니다.
+        crop_mode에서는 마스크가 있는 영역(여백 포함)만 잘라 보내므로
+        업로드 크기와 인코딩/디코딩 시간이 전체 픽셀이 아닌 마스크 영역에 비례합니다.
         """
+        self._local.fell_back = False
         if not self.api_key:
             print("[Inpainter] Stability Key missing, fallback to OpenCV.")
+            telemetry.count("inpainter_opencv_fallbacks_total")
+            return OpenCVInpainter().inpaint(image, mask)
+
+        if not self.crop_mode:
+            return self._erase_or_fallback(image, mask)
+
+        height, width = mask.shape[:2]
+        rects = cluster_rects(mask_rois(mask, self.crop_padding), max(1, self.max_crops))
+        rects = merge_rects([_expand_rect(r, STABILITY_MIN_SIDE, width, height) for r in rects])
+        if not rects:
+            return image.copy()
+
+        restored_image = image.copy()
+        for rect in rects:
+            x0, y0, x1, y1 = rect
+            crop = image[y0:y1, x0:x1]
+            crop_mask = mask[y0:y1, x0:x1]
+            result = self._erase_or_fallback(crop, crop_mask)
+            restored_image[y0:y1, x0:x1] = _feather_blend(crop, result, crop_mask, rect, (width, height), self.feather)
+        return restored_image
+
+    def _erase_or_fallback(self, image, mask):
+        restored_image = self._erase(image, mask)
+        if restored_image is None:
+            print("Falling back to OpenCV inpainting...")
+            telemetry.count("inpainter_opencv_fallbacks_total")
+            self._local.fell_back = True
             return OpenCVInpainter().inpaint(image, mask)
+        return restored_image
 
-        print("Sending request to Stability AI for inpainting...")
-        
+    def _erase(self, image, mask):
+        """
+        Erase API를 한 번 호출합니다. 실패하면 None을 반환합니다.
+        """
+        with telemetry.span("inpainter.stability.request", width=image.shape[1], height=image.shape[0]) as span:
+            return self._erase_request(image, mask, span)
+
+    def _erase_request(self, image, mask, span):
         # 1. Encode image and mask to bytes
         _, img_encoded = cv2.imencode('.png', image)
         _, mask_encoded = cv2.imencode('.png', mask)
-        
+        sent = img_encoded.nbytes + mask_encoded.nbytes
+        with self._bytes_lock:
+            self.bytes_sent += sent
+        span.set(bytes_sent=sent)
+        telemetry.count("inpainter_api_calls_total", backend="stability")
+        telemetry.count("inpainter_bytes_sent_total", sent, backend="stability")
+
         try:
-            response = requests.post(
-                "https://api.stability.ai/v2beta/stable-image/edit/erase",
+            response = self._session().post(
+                self.url,
                 headers={
                     "authorization": f"Bearer {self.api_key}",
                     "accept": "image/*"
@@ -52,20 +261,26 @@ class StabilityAIInpainter(Inpainter):
                 data={
                     "output_format": "png"
                 },
+                timeout=self.timeout,
             )
-
-            if response.status_code == 200:
-                print("Stability AI Inpainting Success!")
-                # Convert bytes response back to numpy array
-                nparr = np.frombuffer(response.content, np.uint8)
-                restored_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                return restored_image
-            else:
-                print(f"Stability AI Error ({response.status_code}): {response.json()}")
-                print("Falling back to OpenCV inpainting...")
-                return OpenCVInpainter().inpaint(image, mask)
-                
         except Exception as e:
             print(f"Stability AI Request Failed: {e}")
-            print("Falling back to OpenCV inpainting...")
-            return OpenCVInpainter().inpaint(image, mask)
+            telemetry.count("inpainter_api_errors_total", backend="stability", status="exception")
+            return None
+
+        span.set(status=response.status_code, bytes_received=len(response.content))
+        if response.status_code != 200:
+            print(f"Stability AI Error ({response.status_code}): {response.text[:500]}")
+            telemetry.count("inpainter_api_errors_total", backend="stability", status=response.status_code)
+            return None
+
+        # Convert bytes response back to numpy array
+        nparr = np.frombuffer(response.content, np.uint8)
+        restored_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        if restored_image is None:
+            print("Stability AI returned an undecodable image.")
+            return None
+        # API가 크기를 조정해서 돌려준 경우 원래 크기로 맞춤
+        if restored_image.shape[:2] != image.shape[:2]:
+            restored_image = cv2.resize(restored_image, (image.shape[1], image.shape[0]), interpolation=cv2.INTER_CUBIC)
+        return restored_image
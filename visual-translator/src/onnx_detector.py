@@ -0,0 +1,283 @@
+import os
+import math
+import threading
+import cv2
+import numpy as np
+from dotenv import load_dotenv
+from src.detector import Detector
+from src.telemetry import telemetry
+
+load_dotenv()
+
+# PP-OCR 전처리 상수 (탐지: ImageNet 평균/표준편차, 인식/방향 분류: [-1, 1])
+DET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+DET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+REC_HEIGHT, REC_MIN_WIDTH = 48, 320
+CLS_HEIGHT, CLS_WIDTH = 48, 192
+
+
+def _mini_box(points):
+    """
+    점들을 감싸는 최소 회전 사각형의 꼭짓점(왼쪽 위부터 시계 방향)과 짧은 변 길이
+    """
+    rect = cv2.minAreaRect(np.asarray(points, dtype=np.float32).reshape(-1, 2))
+    corners = sorted(cv2.boxPoints(rect).tolist(), key=lambda p: p[0])
+    (tl, bl), (tr, br) = sorted(corners[:2], key=lambda p: p[1]), sorted(corners[2:], key=lambda p: p[1])
+    return np.array([tl, tr, br, bl], dtype=np.float32), min(rect[1])
+
+
+def _box_score(prob, box):
+    """
+    박스 안 확률의 평균 (PP-OCR DB 후처리의 fast 모드)
+    """
+    h, w = prob.shape
+    x0, y0 = np.clip(np.floor(box.min(axis=0)).astype(int), 0, [w - 1, h - 1])
+    x1, y1 = np.clip(np.ceil(box.max(axis=0)).astype(int), 0, [w - 1, h - 1])
+    mask = np.zeros((y1 - y0 + 1, x1 - x0 + 1), dtype=np.uint8)
+    cv2.fillPoly(mask, [np.round(box - [x0, y0]).astype(np.int32)], 1)
+    return cv2.mean(prob[y0:y1 + 1, x0:x1 + 1], mask)[0]
+
+
+def _unclip(box, ratio):
+    """
+    DB가 줄여서 예측한 글자 영역을 넓힙니다. (거리 = 넓이 * ratio / 둘레, PP-OCR과 같은 값)
+    pyclipper 다각형 오프셋 대신 회전 사각형의 각 변을 그 거리만큼 밀어 근사합니다. (모서리만 각짐)
+    """
+    (cx, cy), (w, h), angle = cv2.minAreaRect(box)
+    perimeter = 2 * (w + h)
+    if perimeter == 0:
+        return box
+    distance = w * h * ratio / perimeter
+    return cv2.boxPoints(((cx, cy), (w + 2 * distance, h + 2 * distance), angle))
+
+
+def _crop(image, box):
+    """
+    회전된 박스를 똑바로 펴서 잘라냅니다. (세로로 긴 박스는 90도 돌림)
+    """
+    width = int(max(np.linalg.norm(box[0] - box[1]), np.linalg.norm(box[2] - box[3])))
+    height = int(max(np.linalg.norm(box[0] - box[3]), np.linalg.norm(box[1] - box[2])))
+    width, height = max(width, 1), max(height, 1)
+    target = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(box.astype(np.float32), target)
+    crop = cv2.warpPerspective(image, matrix, (width, height), borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC)
+    if height / width >= 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+
+def _normalize_line(crop, height, width):
+    """
+    글자 줄 이미지를 높이 height로 맞춰 (3, height, width) [-1, 1] 배열로 만듭니다. (오른쪽은 0으로 채움)
+    """
+    h, w = crop.shape[:2]
+    resized_w = min(width, int(math.ceil(height * w / h)))
+    resized = cv2.resize(crop, (resized_w, height)).astype(np.float32) * (2.0 / 255.0) - 1.0
+    line = np.zeros((3, height, width), dtype=np.float32)
+    line[:, :, :resized_w] = resized.transpose(2, 0, 1)
+    return line
+
+
+def ctc_decode(probs, charset):
+    """
+    CTC 출력 (N, T, C)를 탐욕적으로 풉니다. (연속 중복 제거 후 blank(0) 제거)
+    Returns: [(문자열, 점수 = 남은 글자 확률 평균), ...]
+    """
+    indices = probs.argmax(axis=2)
+    best = probs.max(axis=2)
+    keep = indices != 0
+    keep[:, 1:] &= indices[:, 1:] != indices[:, :-1]
+    results = []
+    for row, row_keep, row_best in zip(indices, keep, best):
+        chars = row[row_keep]
+        text = "".join(charset[i] for i in chars if i < len(charset))
+        results.append((text, float(row_best[row_keep].mean()) if len(chars) else 0.0))
+    return results
+
+
+class OnnxTextDetector(Detector):
+    """
+    PP-OCR에서 내보낸 탐지(DB) / 인식(CRNN-CTC) 모델(.onnx)을 ONNX Runtime CPU로 실행하는 백엔드
+
+    - paddle 프레임워크 없이 onnxruntime만 import하므로 시작이 빠르고 가벼움
+    - intra_op_threads / inter_op_threads로 CPU 스레드 수를 직접 지정 (GPU 없는 워커에서 여러 프로세스를 띄울 때)
+    - int8=True면 가중치를 int8로 동적 양자화한 모델(<이름>.int8.onnx, 없으면 처음 한 번 만들어 둠)을 사용
+    - 인식은 모든 글자 줄(여러 이미지/타일 포함)을 종횡비 순으로 정렬해 rec_batch_size개씩 묶어 한 번에 실행
+    - cls_model을 주면 PaddleOCR의 use_angle_cls처럼 뒤집힌(180도) 글자 줄을 바로 세운 뒤 인식
+
+    결과 형식은 TextDetector와 같습니다. (RegionBatch, 신뢰도 필터/타일 감지 공통)
+    """
+    backend = "onnx"
+
+    def __init__(self, det_model=None, rec_model=None, rec_dict=None, cls_model=None, int8=None,
+                 intra_op_threads=None, inter_op_threads=None, rec_batch_size=None, det_limit_side=None,
+                 det_threshold=0.3, box_threshold=0.6, unclip_ratio=1.5, **kwargs):
+        super().__init__(**kwargs)
+        self.det_model = det_model or os.getenv("ONNX_DET_MODEL", "models/ppocr_det.onnx")
+        self.rec_model = rec_model or os.getenv("ONNX_REC_MODEL", "models/ppocr_rec.onnx")
+        self.rec_dict = rec_dict or os.getenv("ONNX_REC_DICT", "models/ppocr_keys.txt")
+        self.cls_model = cls_model if cls_model is not None else os.getenv("ONNX_CLS_MODEL", "")
+        if int8 is None:
+            int8 = os.getenv("ONNX_INT8", "0").lower() in ("1", "true", "yes")
+        self.int8 = int8
+        # 0이면 ONNX Runtime 기본값 (intra: 물리 코어 수)
+        self.intra_op_threads = intra_op_threads if intra_op_threads is not None else int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
+        self.inter_op_threads = inter_op_threads if inter_op_threads is not None else int(os.getenv("ONNX_INTER_OP_THREADS", "1"))
+        self.rec_batch_size = rec_batch_size or int(os.getenv("ONNX_REC_BATCH", "16"))
+        # 탐지 입력의 긴 변 최대 길이 (PaddleOCR det_limit_side_len과 같음)
+        self.det_limit_side = det_limit_side or int(os.getenv("ONNX_DET_LIMIT_SIDE", "960"))
+        self.det_threshold = det_threshold
+        self.box_threshold = box_threshold
+        self.unclip_ratio = unclip_ratio
+        self._models = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._models is None:
+            with self._lock:
+                if self._models is None:
+                    with telemetry.span("detector.load_model", backend="onnx", int8=self.int8):
+                        self._models = self._build_models()
+        return self._models
+
+    def _build_models(self):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("The onnx detector backend needs onnxruntime (pip install onnxruntime)") from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_PARALLEL if self.inter_op_threads > 1 else ort.ExecutionMode.ORT_SEQUENTIAL
+
+        def session(path):
+            if self.int8:
+                path = self._quantized(path)
+            return ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+        with open(self.rec_dict, encoding="utf-8") as f:
+            # 0번은 CTC blank, 마지막은 공백 (PaddleOCR use_space_char=True)
+            charset = ["<blank>"] + [line.rstrip("\r\n") for line in f] + [" "]
+        return {
+            'det': session(self.det_model),
+            'rec': session(self.rec_model),
+            'cls': session(self.cls_model) if self.cls_model else None,
+            'charset': charset,
+        }
+
+    @staticmethod
+    def _quantized(path):
+        """
+        int8 동적 양자화 모델 경로 (없거나 원본보다 오래됐으면 만듦)
+        """
+        quantized = os.path.splitext(path)[0] + ".int8.onnx"
+        if not os.path.exists(quantized) or os.path.getmtime(quantized) < os.path.getmtime(path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+
+            print(f"[Detector] Quantizing {path} -> {quantized} (int8 weights)")
+            temp_path = f"{quantized}.{os.getpid()}.tmp"
+            quantize_dynamic(path, temp_path, weight_type=QuantType.QUInt8)
+            os.replace(temp_path, quantized)
+        return quantized
+
+    def cache_identity(self):
+        from importlib.metadata import version, PackageNotFoundError
+        try:
+            ort_version = version("onnxruntime")
+        except PackageNotFoundError:
+            ort_version = "unknown"
+        models = "|".join(f"{os.path.basename(p)}@{os.path.getmtime(p) if os.path.exists(p) else 0:.0f}"
+                          for p in (self.det_model, self.rec_model, self.cls_model) if p)
+        return (f"onnxruntime={ort_version}|{models}|int8={self.int8}|limit={self.det_limit_side}"
+                f"|{super().cache_identity()}")
+
+    def _detect_many(self, images):
+        """
+        이미지마다 탐지를 실행한 뒤, 모든 이미지의 글자 줄을 모아 인식을 한 번에 실행합니다.
+        """
+        models = self.load()
+        images = [cv2.imread(image) if isinstance(image, str) else image for image in images]
+        with telemetry.span("detector.ocr", backend="onnx", batch=len(images)) as span:
+            boxes = [self._detect_boxes(models['det'], image) for image in images]
+            crops = [_crop(image, box) for image, image_boxes in zip(images, boxes) for box in image_boxes]
+            if models['cls'] is not None and crops:
+                crops = self._classify(models['cls'], crops)
+            recognized = self._recognize(models['rec'], models['charset'], crops)
+            span.set(lines=len(crops))
+
+        results, start = [], 0
+        for image_boxes in boxes:
+            lines = recognized[start:start + len(image_boxes)]
+            start += len(image_boxes)
+            results.append(self._regions([np.round(box) for box in image_boxes], [text for text, _ in lines],
+                                         [score for _, score in lines]))
+        telemetry.count("detector_regions_total", sum(len(r) for r in results))
+        return results
+
+    def _detect_boxes(self, session, image):
+        """
+        DB 탐지: 확률 맵 → 이진화 → 윤곽선별 회전 사각형 → 점수 필터 → 넓히기 → 원본 좌표
+        Returns: [(4, 2) float32 박스, ...]
+        """
+        height, width = image.shape[:2]
+        scale = min(1.0, self.det_limit_side / max(height, width))
+        resized_w = max(32, int(round(width * scale / 32)) * 32)
+        resized_h = max(32, int(round(height * scale / 32)) * 32)
+        blob = (cv2.resize(image, (resized_w, resized_h)).astype(np.float32) * (1.0 / 255.0) - DET_MEAN) / DET_STD
+        prob = session.run(None, {session.get_inputs()[0].name: blob.transpose(2, 0, 1)[None]})[0][0, 0]
+
+        bitmap = (prob > self.det_threshold).astype(np.uint8)
+        contours, _ = cv2.findContours(bitmap, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+        ratio = np.array([width / resized_w, height / resized_h], dtype=np.float32)
+        boxes = []
+        for contour in contours[:1000]:
+            box, short_side = _mini_box(contour)
+            if short_side < 3 or _box_score(prob, box) < self.box_threshold:
+                continue
+            box, short_side = _mini_box(_unclip(box, self.unclip_ratio))
+            if short_side < 5:
+                continue
+            box = box * ratio
+            box[:, 0] = np.clip(box[:, 0], 0, width)
+            box[:, 1] = np.clip(box[:, 1], 0, height)
+            boxes.append(box)
+        # 위에서 아래, 왼쪽에서 오른쪽 순서 (PaddleOCR 출력 순서와 비슷하게)
+        boxes.sort(key=lambda b: (int(b[0, 1] // 10), b[0, 0]))
+        return boxes
+
+    def _batches(self, crops):
+        """
+        종횡비가 비슷한 글자 줄끼리 rec_batch_size개씩 묶은 인덱스 배열들 (패딩 낭비를 줄임)
+        """
+        order = np.argsort([crop.shape[1] / crop.shape[0] for crop in crops])
+        return [order[i:i + self.rec_batch_size] for i in range(0, len(order), self.rec_batch_size)]
+
+    def _classify(self, session, crops):
+        """
+        방향 분류: 180도 뒤집혔다고 판단한 글자 줄을 바로 세움
+        """
+        crops = list(crops)
+        for indices in self._batches(crops):
+            blob = np.stack([_normalize_line(crops[i], CLS_HEIGHT, CLS_WIDTH) for i in indices])
+            probs = session.run(None, {session.get_inputs()[0].name: blob})[0]
+            for i, prob in zip(indices, probs):
+                if prob.argmax() == 1 and prob[1] > 0.9:
+                    crops[i] = cv2.rotate(crops[i], cv2.ROTATE_180)
+        return crops
+
+    def _recognize(self, session, charset, crops):
+        """
+        모든 글자 줄을 묶음 단위로 인식합니다. Returns: 입력 순서의 [(문자열, 점수), ...]
+        """
+        results = [("", 0.0)] * len(crops)
+        for indices in self._batches(crops):
+            max_ratio = max(REC_MIN_WIDTH / REC_HEIGHT, max(crops[i].shape[1] / crops[i].shape[0] for i in indices))
+            width = int(math.ceil(REC_HEIGHT * max_ratio))
+            blob = np.stack([_normalize_line(crops[i], REC_HEIGHT, width) for i in indices])
+            with telemetry.span("detector.recognize", backend="onnx", batch=len(indices), width=width):
+                probs = session.run(None, {session.get_inputs()[0].name: blob})[0]
+            for i, result in zip(indices, ctc_decode(probs, charset)):
+                results[i] = result
+        return results
@@ -1,170 +1,672 @@
+import os
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
-import time
 from PIL import Image
-from src.detector import TextDetector
-from src.inpainter import Inpainter, OpenCVInpainter, StabilityAIInpainter
-from src.translator import Translator
-from src.renderer import TextRenderer
-from src.color_utils import get_dominant_color, get_text_color
+from src.cache import StageCache, array_digest
+from src.color_utils import border_colors, get_text_color
+from src.geometry import merge_rects, cluster_rects
+from src.artifacts import ArtifactSink
+from src.regions import RegionBatch
+from src.telemetry import telemetry
+
+# 메모리 예산 (MB, 0 = 사용 안 함): 이미지 크기로 추정한 일반 모드 메모리가 이보다 크면 저메모리 모드로 처리
+MEMORY_BUDGET_MB = float(os.getenv("PIPELINE_MEMORY_BUDGET_MB", "0"))
+# 일반 모드에서 동시에 살아 있는 전체 프레임(BGR) 크기 버퍼 수
+# (원본, 마스크 + 팽창 마스크, 복원된 배경, PIL 결과 이미지(4채널), 연결 요소 라벨 등)
+FULL_FRAME_BUFFERS = 6
+# 저메모리 모드에서 영역 주변으로 잘라낼 여백 (마스크 팽창 4px + 복원 시 참고할 주변 배경)
+MASK_ROI_PADDING = 32
+# 저메모리 모드의 디버그 시각화 이미지 최대 변 길이
+DEBUG_VIS_MAX_SIDE = 2048
+
+
+def _identity(component):
+    """
+    단계 캐시 키에 들어가는 구성 요소 설정 (cache_identity()가 없으면 클래스 이름)
+    """
+    identity = getattr(component, 'cache_identity', None)
+    return identity() if identity else type(component).__name__
+
+
+def language_output_path(output_path, lang):
+    """
+    언어별 출력 경로: output_path에 '{lang}'이 있으면 언어 이름으로 바꾸고, 없으면 확장자 앞에 붙입니다.
+    (out.png + English → out_english.png, out/{lang}.png + ja → out/ja.png)
+    """
+    slug = re.sub(r"[^\w-]+", "_", lang.strip().lower()).strip("_") or "lang"
+    if "{lang}" in output_path:
+        return output_path.replace("{lang}", slug)
+    root, ext = os.path.splitext(output_path)
+    return f"{root}_{slug}{ext}"
+
+
+def _encode_regions(regions):
+    regions = RegionBatch.from_regions(regions)
+    return json.dumps({
+        'polygons': regions.polygons.tolist(), 'texts': regions.texts, 'scores': regions.scores.tolist(),
+    }, ensure_ascii=False).encode("utf-8")
+
+
+def _decode_regions(data):
+    data = json.loads(data.decode("utf-8"))
+    if isinstance(data, list):
+        # 이전 형식 (영역별 dict 리스트)
+        return RegionBatch.from_regions(
+            {'box': np.array(item['box'], dtype=np.int32), 'text': item['text'], 'confidence': item['confidence']}
+            for item in data)
+    return RegionBatch(np.array(data['polygons'], dtype=np.int32).reshape(-1, 4, 2), data['texts'], data['scores'])
 
 
 class VisualTranslatorPipeline:
-    def __init__(self, detector, inpainter, translator, renderer):
+    def __init__(self, detector, inpainter, translator, renderer, artifacts=None, stage_cache=None, memory_budget_mb=None,
+                 region_filter=None):
         self.detector = detector
         self.inpainter = inpainter
         self.translator = translator
         self.renderer = renderer
+        # 디버그 산출물 저장소 (기본값: 비활성화)
+        self.artifacts = artifacts or ArtifactSink()
+        # 탐지 결과/복원된 배경 디스크 캐시 (기본값: 비활성화, 번역은 Translator의 TranslationCache가 담당)
+        self.stage_cache = stage_cache
+        # 큰 이미지는 원본을 제자리에서 복원/렌더링하고 마스크를 영역(ROI)별로만 만드는 저메모리 모드로 처리
+        self.memory_budget_mb = MEMORY_BUDGET_MB if memory_budget_mb is None else memory_budget_mb
+        # 번역할 필요가 없는 영역(숫자, URL, 코드, 이미 대상 언어인 텍스트 등)을 마스크/번역 전에 제외 (기본값: 사용 안 함)
+        self.region_filter = region_filter
 
-    def run(self, input_path, output_path, use_rotation=True):
+    def run(self, input_path, output_path, use_rotation=True, debug=None, target_langs=None):
         """
         v5 Pipeline (Hybrid):
         1. Detect Text
         2. Inpaint (Erase) ALL text regions using Stability AI (High Quality Background)
         3. Translate & Render (Type) new text using Pillow (High Legibility)
+
+        각 단계는 개별 메서드(detect → build_mask → inpaint / translate → render → save)로
+        나뉘어 있어, 배치 모드(src/batch.py)에서 이미지 간에 단계를 겹쳐 실행할 수 있습니다.
+
+        debug: None이면 artifacts 싱크의 설정(샘플링)을 따르고, True/False로 이 실행만 강제할 수 있습니다.
+        target_langs: 대상 언어 리스트 (예: ["Japanese", "English"]). 주면 탐지/Inpainting은 한 번만 하고
+            언어마다 번역문을 같은 복원 배경의 복사본에 그려 language_output_path(output_path, 언어)에 저장합니다.
+            저장한 경로는 ctx['outputs'] ({언어: 경로})에 남습니다.
         """
         print(f"[Pipeline] Start processing (v5 Hybrid Mode): {input_path}")
         if not use_rotation:
              print("[Pipeline] Rotation correction DISABLED.")
-        
-        # 1. Text Search
-        start_time = time.time()
-        print(f"[Phase 6] Starting Detection...")
-        detection_results = self.detector.detect(input_path)
-        detect_time = time.time() - start_time
-        print(f"[Pipeline] Detected {len(detection_results)} text regions. (Time: {detect_time:.2f}s)")
-        
-        original_cv2 = cv2.imread(input_path)
-        if original_cv2 is None:
-            raise ValueError(f"Could not load image: {input_path}")
-            
-        # Inpainting을 위해 작업할 복사본
-        inpainted_cv2 = original_cv2.copy()
-        
-        # Inpainting Mask 생성 (전체 텍스트 영역)
-        full_mask = np.zeros(original_cv2.shape[:2], dtype=np.uint8)
-        
+
+        with telemetry.span("pipeline.run", input=input_path, languages=len(target_langs or ()) or 1):
+            ctx = self.detect(input_path, debug=debug, target_langs=target_langs)
+            self.build_mask(ctx)
+            self.inpaint(ctx)
+            self.translate(ctx)
+            if not target_langs:
+                self.render(ctx, use_rotation=use_rotation)
+                self.save(ctx, output_path)
+            else:
+                ctx['outputs'] = {}
+                for lang in ctx['target_langs']:
+                    ctx['outputs'][lang] = language_output_path(output_path, lang)
+                    self.render(ctx, use_rotation=use_rotation, target_lang=lang)
+                    self.save(ctx, ctx['outputs'][lang], target_lang=lang)
+            # 모든 언어를 저장한 뒤 한 번만 기록 (outputs / 언어별 지연 시간이 모두 채워진 상태)
+            self.record_metrics(ctx)
+        return ctx
+
+    def run_array(self, image: np.ndarray, use_rotation=True, debug=None) -> np.ndarray:
+        """
+        메모리 상의 BGR 이미지(ndarray)를 번역하고 결과를 BGR ndarray로 반환합니다.
+        파일을 읽거나 쓰지 않으며(디버그 싱크가 켜진 경우 제외), 입력 배열은 수정하지 않습니다.
+        """
+        with telemetry.span("pipeline.run", input="<array>"):
+            ctx = self.detect(image, debug=debug)
+            self.build_mask(ctx)
+            self.inpaint(ctx)
+            self.translate(ctx)
+            self.render(ctx, use_rotation=use_rotation)
+            self.record_metrics(ctx)
+            return self.result_array(ctx)
+
+    def run_bytes(self, data: bytes, output_format=".png", use_rotation=True, debug=None) -> bytes:
+        """
+        인코딩된 이미지(bytes)를 한 번만 디코딩해서 번역하고, output_format으로 인코딩한 bytes를 반환합니다.
+        """
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Could not decode image bytes")
+        ok, encoded = cv2.imencode(output_format, self.run_array(image, use_rotation=use_rotation, debug=debug))
+        if not ok:
+            raise ValueError(f"Could not encode result as {output_format}")
+        return encoded.tobytes()
+
+    def detect(self, source, debug=None, target_langs=None):
+        """
+        1. Text Search: 텍스트를 감지하고 작업 컨텍스트(dict)를 만듭니다.
+        source는 이미지 경로 또는 BGR ndarray이며, 경로인 경우에도 한 번만 디코딩해서
+        같은 배열을 탐지기/마스크 생성/Inpainting에 그대로 넘깁니다.
+        이 실행의 디버그 산출물 기록기(또는 None)도 여기서 열어 ctx['artifacts']에 둡니다.
+        target_langs: 대상 언어 리스트 (없으면 번역기의 기본 대상 언어 하나)
+        """
+        if isinstance(source, np.ndarray):
+            input_path = None
+            original_cv2 = source
+        else:
+            input_path = source
+            if not os.path.exists(input_path):
+                raise FileNotFoundError(f"Image file not found: {input_path}")
+            with telemetry.span("pipeline.decode") as decode_span:
+                original_cv2 = self._read_image(input_path)
+            if original_cv2 is None:
+                raise ValueError(f"Could not load image: {input_path}")
+
+        with telemetry.span("pipeline.detect", width=original_cv2.shape[1], height=original_cv2.shape[0]) as span:
+            detection_results, image_digest, cached = self._detect_cached(original_cv2)
+            span.set(regions=len(detection_results), cached=cached)
+        detect_time = span.duration
+        print(f"[Pipeline] Detected {len(detection_results)} text regions{' (cached)' if cached else ''}. "
+              f"(Time: {detect_time:.2f}s)")
+
+        ctx = self.make_context(original_cv2, detection_results, detect_time, input_path=input_path, debug=debug,
+                                target_langs=target_langs)
+        ctx['image_digest'] = image_digest
+        if input_path is not None:
+            self._record_memory(ctx, 'decode', decode_span)
+        self._record_memory(ctx, 'detection', span)
+        if input_path is not None:
+            # 파일에서 읽은 이미지는 이 파이프라인 소유이므로 저메모리 모드에서 제자리 수정 가능
+            ctx['low_memory'] = self._over_budget(original_cv2)
+        return ctx
+
+    def _read_image(self, input_path):
+        """
+        이미지 파일을 BGR로 읽습니다.
+        메모리 예산을 넘는 큰 이미지는 헤더에서 크기를 먼저 읽어 미리 할당한 배열에 바로 디코딩합니다.
+        (cv2.imread는 디코딩한 결과를 한 번 더 복사하므로 잠깐 동안 이미지 2장 분량을 씀)
+        """
+        if self.memory_budget_mb:
+            try:
+                with Image.open(input_path) as header:
+                    width, height = header.size
+                if width * height * 3 * FULL_FRAME_BUFFERS / 1024 ** 2 > self.memory_budget_mb and cv2.haveImageReader(input_path):
+                    return cv2.imread(input_path, np.empty((height, width, 3), dtype=np.uint8))
+            except (OSError, TypeError, cv2.error, Image.DecompressionBombError):
+                # 헤더를 읽을 수 없는 형식이거나, dst 인자를 지원하지 않는 OpenCV(4.10 미만)
+                pass
+        return cv2.imread(input_path)
+
+    def _over_budget(self, image):
+        """
+        일반 모드의 예상 메모리(전체 프레임 버퍼 수 x 이미지 크기)가 메모리 예산을 넘는지 확인합니다.
+        """
+        if not self.memory_budget_mb:
+            return False
+        estimated_mb = image.nbytes * FULL_FRAME_BUFFERS / 1024 ** 2
+        if estimated_mb <= self.memory_budget_mb:
+            return False
+        print(f"[Pipeline] Low-memory mode: estimated {estimated_mb:.0f} MB > budget {self.memory_budget_mb:.0f} MB")
+        telemetry.count("pipeline_low_memory_runs_total")
+        return True
+
+    def _record_memory(self, ctx, stage, span):
+        """
+        단계 구간의 최대 RSS(telemetry.track_memory가 켜진 경우)를 ctx['memory']에 MB 단위로 기록합니다.
+        """
+        if 'rss_peak_mb' in span.attrs:
+            memory = ctx.setdefault('memory', {})
+            # 여러 언어를 그리면 같은 단계가 반복되므로 가장 큰 값을 남김
+            memory[stage] = max(memory.get(stage, 0.0), span.attrs['rss_peak_mb'])
+
+    def _detect_cached(self, image):
+        """
+        단계 캐시가 있으면 이미지 내용 해시 + 탐지기 설정으로 이전 탐지 결과를 찾아 재사용합니다.
+        Returns: (탐지 결과, 이미지 해시 또는 None, 캐시 적중 여부)
+        """
+        if self.stage_cache is None:
+            return self.detector.detect(image), None, False
+        image_digest = array_digest(image)
+        key = StageCache.make_key("detect", image_digest, _identity(self.detector))
+        data = self.stage_cache.get("detect", key)
+        if data is not None:
+            telemetry.count("stage_cache_hits_total", stage="detect")
+            return _decode_regions(data), image_digest, True
+        telemetry.count("stage_cache_misses_total", stage="detect")
+        regions = self.detector.detect(image)
+        self.stage_cache.put("detect", key, _encode_regions(regions))
+        return regions, image_digest, False
+
+    def make_context(self, image, regions, detect_time=0.0, input_path=None, debug=None, target_langs=None):
+        """
+        이미 탐지가 끝난 결과로 작업 컨텍스트를 만듭니다.
+        (서비스 모드처럼 여러 요청의 탐지를 한 번에 묶어 실행한 경우 사용)
+        regions는 RegionBatch 또는 영역 dict 리스트 (dict 리스트는 RegionBatch로 변환)
+        """
+        if target_langs:
+            target_langs = list(dict.fromkeys(target_langs))
+        else:
+            target_langs = [getattr(self.translator, 'target_lang', None)]
+        return {
+            'input_path': input_path,
+            'image': image,
+            'target_langs': target_langs,
+            'regions': RegionBatch.from_regions(regions),
+            'latency': {'detection': detect_time},
+            'artifacts': self.artifacts.open_run(input_path, force=debug),
+        }
+
+    def build_mask(self, ctx):
+        """
+        번역할 필요가 없는 영역을 제외한 뒤, 영역별 글자색을 추정하고 Inpainting 마스크(팽창 포함)를 만듭니다.
+        디버그 기록기가 열려 있으면 크롭 이미지와 탐지 시각화 이미지를 (백그라운드에서) 저장합니다.
+        """
+        with telemetry.span("pipeline.build_mask", regions=len(ctx['regions'])) as span:
+            self._filter_regions(ctx)
+            self._build_mask(ctx)
+            if ctx.get('keep_original'):
+                ctx['original_patches'] = self._original_patches(ctx)
+        ctx['latency']['mask'] = span.duration
+        self._record_memory(ctx, 'mask', span)
+        return ctx
+
+    def _filter_regions(self, ctx):
+        """
+        region_filter가 번역할 필요가 없다고 판단한 영역을 ctx['regions']에서 빼서 ctx['skipped_regions']로 옮깁니다.
+        (빠진 영역은 지우지도 번역하지도 않으므로 원본 그대로 남음)
+        여러 언어로 번역할 때 일부 언어에서만 이미 대상 언어인 영역은 지우고 번역하되, 그 언어의 결과에는
+        원본 픽셀을 다시 붙이도록 ctx['keep_original'] ({언어: 영역별 bool 배열})에 표시합니다.
+        """
+        regions = ctx['regions']
+        if self.region_filter is None or not len(regions):
+            return
+        target_langs = ctx.get('target_langs') or [None]
+        keep, reasons = self.region_filter.split(regions.texts, target_langs)
+        if len(target_langs) > 1:
+            kept_texts = [text for text, kept in zip(regions.texts, keep) if kept]
+            keep_original = {}
+            for lang in target_langs:
+                flags = np.array([self.region_filter.in_target_script(text, lang) for text in kept_texts], dtype=bool)
+                if flags.any():
+                    keep_original[lang] = flags
+            ctx['keep_original'] = keep_original
+        if keep.all():
+            return
+        skipped = regions.select(~keep)
+        skipped_reasons = [reason for reason in reasons if reason is not None]
+        for item, reason in zip(skipped, skipped_reasons):
+            item['skip_reason'] = reason
+        ctx['regions'] = regions.select(keep)
+        ctx['skipped_regions'] = skipped
+
+        counts = {}
+        for reason in skipped_reasons:
+            counts[reason] = counts.get(reason, 0) + 1
+        for reason, count in counts.items():
+            telemetry.count("pipeline_regions_skipped_total", count, reason=reason)
+        summary = ", ".join(f"{reason} {count}" for reason, count in sorted(counts.items()))
+        print(f"[Pipeline] Skipped {len(skipped)} regions that need no translation ({summary}).")
+
+    def _build_mask(self, ctx):
+        original_cv2 = ctx['image']
+        artifacts = ctx.get('artifacts')
+        debug = artifacts is not None
+
+        regions = ctx['regions']
+        h, w = original_cv2.shape[:2]
+
+        # [Phase 4] Smart Color Extraction
+        # 원본 배색에 어울리는 글자색 결정 (모든 영역의 테두리를 한 번에 계산, 5px 여백)
+        rects = regions.rects(5, w, h)
+        regions.text_colors = np.array(get_text_color(border_colors(original_cv2, rects)), dtype=np.uint8).reshape(-1, 3)
+
         # [Phase 4] Debugging Setup
-        import os
-        debug_dir = "debug_crops"
-        os.makedirs(debug_dir, exist_ok=True)
-        debug_vis_image = original_cv2.copy()
-        
-        detected_texts = []
-        for idx, item in enumerate(detection_results):
-            box = item['box']
-            detected_texts.append(item)
-            
-            confidence = item.get('confidence', 0.0)
-            
-            # [Phase 4] Visualize Bounding Box & [Phase 6] Confidence
-            cv2.polylines(debug_vis_image, [box], True, (0, 255, 0), 2)
-            label = f"{idx+1} ({confidence:.2f})"
-            cv2.putText(debug_vis_image, label, (box[0][0], box[0][1]-5), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
-            
-            # [Phase 4] Save Crop Image
-            # Get bounding rect for cropping
-            x_min = int(np.min(box[:, 0]))
-            x_max = int(np.max(box[:, 0]))
-            y_min = int(np.min(box[:, 1]))
-            y_max = int(np.max(box[:, 1]))
-            
-            # Padding slightly
-            pad = 5
-            h, w, _ = original_cv2.shape
-            x_min = max(0, x_min - pad)
-            y_min = max(0, y_min - pad)
-            x_max = min(w, x_max + pad)
-            y_max = min(h, y_max + pad)
-            
-            cropped_cv2 = original_cv2[y_min:y_max, x_min:x_max]
-            if cropped_cv2.size > 0:
-                crop_path = os.path.join(debug_dir, f"crop_{idx+1}.png")
-                cv2.imwrite(crop_path, cropped_cv2)
-
-            # [Phase 4] Smart Color Extraction
-            # 원본 배색에 어울리는 글자색 결정
-            bg_color = get_dominant_color(cropped_cv2)
-            item['text_color'] = get_text_color(bg_color)
-
-            # 마스크에 영역 추가 (cv2.fillPoly expects a list of points)
-            cv2.fillPoly(full_mask, [box], 255)
+        if debug:
+            # 저메모리 모드에서는 원본 크기 복사본 대신 축소한 이미지에 그림
+            vis_scale = min(1.0, DEBUG_VIS_MAX_SIDE / max(h, w)) if ctx.get('low_memory') else 1.0
+            if vis_scale < 1.0:
+                debug_vis_image = cv2.resize(original_cv2, None, fx=vis_scale, fy=vis_scale, interpolation=cv2.INTER_AREA)
+            else:
+                debug_vis_image = original_cv2.copy()
+
+            vis_boxes = regions.polygons if vis_scale == 1.0 else np.round(regions.polygons * vis_scale).astype(np.int32)
+            for idx, (box, confidence, (x_min, y_min, x_max, y_max)) in enumerate(zip(vis_boxes, regions.scores, rects)):
+
+                # [Phase 4] Visualize Bounding Box & [Phase 6] Confidence
+                cv2.polylines(debug_vis_image, [box], True, (0, 255, 0), 2)
+                label = f"{idx+1} ({confidence:.2f})"
+                cv2.putText(debug_vis_image, label, (box[0][0], box[0][1]-5),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+
+                # [Phase 4] Save Crop Image
+                # 기록기는 백그라운드에서 쓰므로 복사본을 넘김 (저메모리 모드는 ctx['image']에 제자리로 복원/렌더링함)
+                cropped_cv2 = original_cv2[y_min:y_max, x_min:x_max]
+                if cropped_cv2.size > 0:
+                    artifacts.image(os.path.join("debug_crops", f"crop_{idx+1}.png"), cropped_cv2.copy())
 
         # [Phase 4] Save Visualization Image
-        cv2.imwrite("debug_detection.png", debug_vis_image)
-        print(f"[Phase 4] Debug outputs saved: 'debug_detection.png' and '{debug_dir}/'")
-            
-        # 2. Inpainting (Background Restoration)
-        # 텍스트 영역을 지운 배경 이미지 생성
-        
+        if debug:
+            artifacts.image("debug_detection.png", debug_vis_image)
+            print(f"[Phase 4] Debug outputs queued: '{artifacts.run_dir}'")
+
         # Mask dilation to cover edges better
         kernel = np.ones((5, 5), np.uint8) # v5에서는 넉넉하게 지움
-        dilated_mask = cv2.dilate(full_mask, kernel, iterations=2)
-        
-        print(f"[Pipeline] Restoring background (Erase text)...")
+        if ctx.get('low_memory'):
+            # 전체 크기 마스크 대신 영역 묶음(ROI)마다 작은 마스크를 만듦
+            ctx['mask'] = None
+            ctx['mask_rois'] = self._mask_rois(regions, w, h, kernel)
+            return
+
+        # Inpainting Mask 생성 (전체 텍스트 영역, cv2.fillPoly는 다각형 리스트를 한 번에 받음)
+        full_mask = np.zeros(original_cv2.shape[:2], dtype=np.uint8)
+        if len(regions):
+            cv2.fillPoly(full_mask, list(regions.polygons), 255)
+        ctx['mask'] = cv2.dilate(full_mask, kernel, iterations=2)
+
+    def _original_patches(self, ctx):
+        """
+        ctx['keep_original']에 표시된 영역의 원본 픽셀을 Inpainting 전에 잘라 둡니다.
+        (저메모리 모드는 원본을 제자리에서 복원하므로 전체 이미지 대신 영역 크기 조각만 보관)
+        Returns: {영역 번호: ((x0, y0, x1, y1), BGR 조각, 팽창한 다각형 마스크)}
+        """
+        image = ctx['image']
+        h, w = image.shape[:2]
+        regions = ctx['regions']
+        indices = np.flatnonzero(np.any(list(ctx['keep_original'].values()), axis=0))
+        # 마스크 팽창(5x5 커널 2회 = 4px)까지 덮도록 5px 여백
+        rects = regions.rects(5, w, h)
+        kernel = np.ones((5, 5), np.uint8)
+        patches = {}
+        for index in indices.tolist():
+            x0, y0, x1, y1 = rects[index].tolist()
+            patch_mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+            cv2.fillPoly(patch_mask, [regions.polygons[index]], 255, offset=(-x0, -y0))
+            patches[index] = ((x0, y0, x1, y1), image[y0:y1, x0:x1].copy(),
+                              cv2.dilate(patch_mask, kernel, iterations=2) > 0)
+        return patches
+
+    def _mask_rois(self, regions, w, h, kernel):
+        """
+        영역 박스를 MASK_ROI_PADDING만큼 넓혀 겹치는 것끼리 합친 사각형마다 (팽창까지 마친) 마스크를 만듭니다.
+        Returns: [((x0, y0, x1, y1), ROI 크기 uint8 마스크), ...] - 사각형끼리는 겹치지 않음
+        """
+        rects = merge_rects(tuple(rect) for rect in regions.rects(MASK_ROI_PADDING, w, h).tolist())
+        # 원격 Inpainter는 요청 수를 제한 (가까운 사각형끼리 합침)
+        max_crops = getattr(self.inpainter, 'max_crops', None)
+        if max_crops and len(rects) > max_crops:
+            rects = merge_rects(cluster_rects(rects, max_crops))
+
+        # 영역마다 (이미지 안으로 자른 왼쪽 위 꼭짓점이 들어가는) 첫 번째 사각형을 한 번에 찾음
+        # (자르지 않으면 음수 좌표에서 시작하는 영역이 어느 사각형에도 속하지 않아 마스크에서 빠짐)
+        corners = np.clip(regions.bounds[:, None, :2], 0, [w - 1, h - 1])
+        bounds = np.array(rects, dtype=np.int64).reshape(-1, 4)[None]
+        inside = ((bounds[..., 0] <= corners[..., 0]) & (corners[..., 0] < bounds[..., 2]) &
+                  (bounds[..., 1] <= corners[..., 1]) & (corners[..., 1] < bounds[..., 3]))
+        owner = np.where(inside.any(axis=1), inside.argmax(axis=1), -1)
+
+        rois = []
+        for index, (x0, y0, x1, y1) in enumerate(rects):
+            roi_mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+            polygons = regions.polygons[owner == index]
+            if len(polygons):
+                cv2.fillPoly(roi_mask, list(polygons), 255, offset=(-x0, -y0))
+            rois.append(((x0, y0, x1, y1), cv2.dilate(roi_mask, kernel, iterations=2)))
+        return rois
+
+    def inpaint(self, ctx):
+        """
+        2. Inpainting (Background Restoration)
+        텍스트 영역을 지운 배경 이미지 생성
+        """
+        # Inpainter는 입력을 수정하지 않고 새 배열을 반환하므로 원본을 복사하지 않고 그대로 넘김
         # 여기서 Stability AI가 사용됨 (API Key가 있으면)
-        start_time = time.time()
-        background_restored = self.inpainter.inpaint(inpainted_cv2, dilated_mask)
-        inpaint_time = time.time() - start_time
-        print(f"[Phase 6] Inpainting Time: {inpaint_time:.2f}s")
-        
-        # OpenCV -> PIL 변환 (렌더링은 PIL이 한글 폰트 처리에 유리)
-        background_restored_rgb = cv2.cvtColor(background_restored, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(background_restored_rgb)
-        
-        # 3. Translation & Rendering
-        for idx, item in enumerate(detected_texts):
-            original_text = item['text']
-            box = item['box'] # numpy array
-            
-            print(f"[Pipeline] Processing region {idx+1}/{len(detected_texts)}: '{original_text}'")
-            
-            # Translate (Simple translation)
-            # v5 uses basic translate, not analyze_and_translate
-            translated_text = self.translator.translate(original_text)
-            print(f"    -> Translated: '{translated_text}'")
-            
-            # 텍스트 회전 각도 계산
-            vec = box[1] - box[0]
-            angle_rad = np.arctan2(vec[1], vec[0])
-            angle_deg = np.degrees(angle_rad)
-            
-            # [Phase 4] Rotation Control
-            if use_rotation:
-                render_angle = -angle_deg
+        mask_rois = ctx.get('mask_rois')
+        if mask_rois is not None:
+            masked_pixels = sum(cv2.countNonZero(roi_mask) for _, roi_mask in mask_rois)
+        else:
+            masked_pixels = cv2.countNonZero(ctx['mask'])
+        with telemetry.span("pipeline.inpaint", inpainter=type(self.inpainter).__name__,
+                            masked_pixels=int(masked_pixels)) as span:
+            if not masked_pixels:
+                # 지울 영역이 없으면 Inpainter(원격 API 포함)를 호출하지 않음
+                ctx['background'], cached = ctx['image'], False
+            elif mask_rois is not None:
+                ctx['background'], cached = self._inpaint_rois(ctx)
+            else:
+                image_digest = ctx.get('image_digest') if self.stage_cache else None
+                ctx['background'], cached = self._inpaint_cached(ctx['image'], ctx['mask'], image_digest)
+            span.set(cached=cached)
+        ctx['latency']['inpainting'] = span.duration
+        self._record_memory(ctx, 'inpainting', span)
+        print(f"[Pipeline] Background restored{' (cached)' if cached else ''}. (Time: {span.duration:.2f}s)")
+        return ctx
+
+    def _inpaint_rois(self, ctx):
+        """
+        저메모리 모드: ROI마다 잘라서 복원하고 원본 이미지에 제자리로 써 넣습니다. (전체 크기 복사본 없음)
+        Returns: (복원된 배경 = ctx['image'], 모든 ROI가 캐시 적중인지)
+        """
+        image = ctx['image']
+        image_digest = (ctx.get('image_digest') or array_digest(image)) if self.stage_cache else None
+        all_cached = True
+        for rect, roi_mask in ctx['mask_rois']:
+            x0, y0, x1, y1 = rect
+            crop = image[y0:y1, x0:x1]
+            roi_digest = f"{image_digest}@{rect}" if image_digest else None
+            restored, cached = self._inpaint_cached(np.ascontiguousarray(crop), roi_mask, roi_digest)
+            crop[...] = restored
+            all_cached = all_cached and cached
+        return image, all_cached and bool(ctx['mask_rois'])
+
+    def _inpaint_cached(self, image, mask, image_digest=None):
+        """
+        단계 캐시가 있으면 이미지 해시 + 마스크 해시 + Inpainter 설정으로 이전에 복원한 배경을 재사용합니다.
+        Returns: (복원된 배경, 캐시 적중 여부)
+        """
+        if self.stage_cache is None:
+            return self.inpainter.inpaint(image, mask), False
+        image_digest = image_digest or array_digest(image)
+        key = StageCache.make_key("inpaint", image_digest, array_digest(mask), _identity(self.inpainter))
+        data = self.stage_cache.get("inpaint", key)
+        if data is not None:
+            background = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+            if background is not None and background.shape == image.shape:
+                telemetry.count("stage_cache_hits_total", stage="inpaint")
+                return background, True
+        telemetry.count("stage_cache_misses_total", stage="inpaint")
+        background = self.inpainter.inpaint(image, mask)
+        cacheable = getattr(self.inpainter, 'last_result_cacheable', None)
+        if cacheable is None or cacheable():
+            # 무손실(PNG), 속도를 위해 압축 수준은 낮게
+            ok, encoded = cv2.imencode(".png", background, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+            if ok:
+                self.stage_cache.put("inpaint", key, encoded.tobytes())
+        return background, False
+
+    def translate(self, ctx, memo=None):
+        """
+        3-1. Translation
+        모든 영역을 한 번의 배치 요청으로 번역 (중복 문자열은 한 번만)
+        memo(dict, 원문 → 번역문)를 넘기면 이미 번역한 원문은 요청하지 않고, 새 번역을 memo에 추가합니다.
+        (동영상/애니메이션처럼 같은 문장이 프레임마다 반복되는 경우, 대상 언어가 하나일 때만 사용)
+        대상 언어가 여러 개면 언어별 배치 요청을 동시에 보내고 ctx['translations'] ({언어: 번역문 리스트})에
+        모두 남깁니다. regions.translated_texts는 첫 번째 언어의 번역문입니다.
+        """
+        regions = ctx['regions']
+        target_langs = ctx.get('target_langs') or [None]
+        keep_original = ctx.get('keep_original') or {}
+        with telemetry.span("pipeline.translate", regions=len(regions), languages=len(target_langs)) as span:
+            texts = regions.texts
+            if len(target_langs) == 1:
+                results = [self._translate_texts(texts, target_langs[0], memo, span)]
+            else:
+                with ThreadPoolExecutor(max_workers=len(target_langs), thread_name_prefix="translate-lang") as pool:
+                    results = list(pool.map(
+                        lambda lang: self._translate_texts(texts, lang, keep=keep_original.get(lang)), target_langs))
+        translate_time = span.duration
+        ctx['latency']['translation'] = translate_time
+        self._record_memory(ctx, 'translation', span)
+        languages = f" into {len(target_langs)} languages" if len(target_langs) > 1 else ""
+        print(f"[Pipeline] Translated {len(regions)} regions{languages}. (Time: {translate_time:.2f}s)")
+        ctx['translations'] = dict(zip(target_langs, results))
+        regions.translated_texts = results[0]
+        return ctx
+
+    def _translate_texts(self, texts, target_lang, memo=None, span=None, keep=None):
+        """
+        한 언어의 번역문 리스트 (keep이 True인 영역은 이미 그 언어이므로 요청하지 않고 원문 그대로)
+        """
+        if keep is not None:
+            pending = [text for text, kept in zip(texts, keep) if not kept]
+            translated = iter(self._translate_texts(pending, target_lang))
+            return [text if kept else next(translated) for text, kept in zip(texts, keep)]
+        # 기본 대상 언어는 target_lang 인자 없이 요청 (translate_batch(texts)만 구현한 번역기 호환)
+        options = {} if target_lang == getattr(self.translator, 'target_lang', None) else {'target_lang': target_lang}
+        if memo is None:
+            return list(self.translator.translate_batch(texts, **options))
+        missing = list(dict.fromkeys(text for text in texts if text not in memo))
+        if span is not None:
+            span.set(memo_hits=sum(text in memo for text in texts))
+        if missing:
+            memo.update(zip(missing, self.translator.translate_batch(missing, **options)))
+        return [memo[text] for text in texts]
+
+    def render(self, ctx, use_rotation=True, target_lang=None):
+        """
+        3-2. Rendering: 복원된 배경 위에 번역문을 그립니다.
+        target_lang을 주면 그 언어의 번역문(ctx['translations'])을 복원 배경의 복사본에 그립니다.
+        (여러 언어는 ctx['target_langs'] 순서대로 호출, 마지막 언어는 복사하지 않고 배경을 그대로 씀)
+        """
+        with telemetry.span("pipeline.render", regions=len(ctx['regions']), target_lang=target_lang) as span:
+            self._render(ctx, use_rotation, target_lang)
+        # 여러 언어를 그리면 'rendering'은 언어별 렌더링 시간의 합, 언어별 시간은 'rendering.<언어>'
+        ctx['latency']['rendering'] = ctx['latency'].get('rendering', 0.0) + span.duration
+        if target_lang is not None:
+            ctx['latency'][f'rendering.{target_lang}'] = span.duration
+        self._record_memory(ctx, 'rendering', span)
+        return ctx
+
+    def _render(self, ctx, use_rotation, target_lang=None):
+        background = ctx['background']
+        regions = ctx['regions']
+        texts = regions.translated_texts
+        if target_lang is not None:
+            texts = ctx['translations'][target_lang]
+            if target_lang != ctx['target_langs'][-1]:
+                background = background.copy()
             else:
-                render_angle = 0.0
-            
-            # Render (Pillow) - 깔끔한 폰트로 그리기
-            # [Phase 4] Use Smart Color
-            text_color = item.get('text_color', (0, 0, 0))
-            self.renderer.render(pil_image, translated_text, box, render_angle, text_color=text_color)
-            
-            self.renderer.render(pil_image, translated_text, box, render_angle, text_color=text_color)
-            
-        # [Phase 6] Export Metrics to JSON for Jupyter Notebook
-        import json
+                ctx['background'] = None
+            keep = (ctx.get('keep_original') or {}).get(target_lang)
+            if keep is not None:
+                # 이미 이 언어인 영역은 원본 픽셀을 다시 붙이고 그리지 않음
+                for index, ((x0, y0, x1, y1), patch, patch_mask) in ctx['original_patches'].items():
+                    if keep[index]:
+                        np.copyto(background[y0:y1, x0:x1], patch, where=patch_mask[..., None])
+                texts = ["" if kept else text for text, kept in zip(texts, keep)]
+        else:
+            ctx['background'] = None
+        # 저메모리 모드: 제자리에서 복원한 원본(BGR)에 글자색만 BGR 순서로 바꿔 바로 그림 (색 변환/PIL 복사 없음)
+        bgr = bool(ctx.get('low_memory'))
+        if bgr:
+            background_restored_rgb = background
+        else:
+            # OpenCV -> PIL 변환 (렌더링은 PIL이 한글 폰트 처리에 유리)
+            # 복원된 배경은 이 파이프라인 소유이므로 제자리(in-place)에서 RGB로 변환
+            if background is ctx['image']:
+                background = background.copy()
+            background_restored_rgb = cv2.cvtColor(background, cv2.COLOR_BGR2RGB, dst=background)
+
+        # 텍스트 회전 각도 (윗변 기울기, 모든 영역을 한 번에 계산)
+        # [Phase 4] Rotation Control
+        render_angles = -regions.angles if use_rotation else np.zeros(len(regions))
+
+        # [Phase 4] Use Smart Color
+        text_colors = regions.text_colors if regions.text_colors is not None else np.zeros((len(regions), 3), np.uint8)
+        if bgr:
+            text_colors = text_colors[:, ::-1]
+
+        # Render (Pillow + 오버레이 합성) - 모든 영역을 한 번에 그리고 한 번만 블렌딩
+        sizes = np.stack([regions.widths, regions.heights], axis=1)
+        self.renderer.render_layout(background_restored_rgb, texts, sizes, regions.centers,
+                                    render_angles, text_colors)
+        if bgr:
+            ctx['result'] = None
+            ctx['result_bgr'] = background_restored_rgb
+        else:
+            ctx['result'] = Image.fromarray(background_restored_rgb)
+
+    def result_array(self, ctx) -> np.ndarray:
+        """
+        렌더링 결과(PIL, RGB)를 BGR ndarray로 변환합니다. (저메모리 모드는 이미 BGR 배열이므로 그대로 반환)
+        """
+        if ctx.get('result_bgr') is not None:
+            return ctx['result_bgr']
+        result = np.array(ctx['result'])
+        return cv2.cvtColor(result, cv2.COLOR_RGB2BGR, dst=result)
+
+    def save(self, ctx, output_path, target_lang=None):
+        """
+        4. Save: 결과 이미지를 저장합니다.
+        메트릭은 기록하지 않으므로 (여러 언어를 저장할 때 한 번만 쓰도록) 호출한 쪽에서 마지막에 record_metrics를 부릅니다.
+        target_lang: render(target_lang=...)로 그린 결과면 저장 시간을 'save.<언어>'에도 남김
+        """
+        with telemetry.span("pipeline.save", output=output_path) as span:
+            if ctx.get('result_bgr') is not None:
+                self._write_bgr(ctx['result_bgr'], output_path)
+            else:
+                ctx['result'].save(output_path)
+        ctx['latency']['save'] = ctx['latency'].get('save', 0.0) + span.duration
+        if target_lang is not None:
+            ctx['latency'][f'save.{target_lang}'] = span.duration
+        self._record_memory(ctx, 'save', span)
+        print(f"[Pipeline] Saved result to {output_path}")
+        return ctx
+
+    @staticmethod
+    def _write_bgr(image, output_path):
+        """
+        BGR 배열을 파일로 바로 인코딩합니다. (cv2.imwrite는 줄 단위로 인코딩해 파일에 쓰므로 인코딩 버퍼가 작음)
+        """
+        if not cv2.imwrite(output_path, image):
+            # 일부 플랫폼에서 ASCII가 아닌 경로는 imwrite가 실패하므로 메모리에서 인코딩해 직접 씀
+            ok, encoded = cv2.imencode(os.path.splitext(output_path)[1] or ".png", image)
+            if not ok:
+                raise ValueError(f"Could not encode result as {output_path}")
+            encoded.tofile(output_path)
+
+    def record_metrics(self, ctx):
+        """
+        [Phase 6] Export Metrics to JSON for Jupyter Notebook
+        디버그 기록기의 실행 디렉터리에 pipeline_metrics.json으로 저장합니다.
+        """
+        artifacts = ctx.get('artifacts')
+        if artifacts is None:
+            return
+
         metrics = {
-             "latency": {
-                 "detection": detect_time,
-                 "inpainting": inpaint_time
-             },
+             "latency": dict(ctx['latency']),
              "regions": []
         }
-        
-        for idx, item in enumerate(detected_texts):
+        if ctx.get('memory'):
+             metrics["peak_rss_mb"] = dict(ctx['memory'])
+        cache = getattr(self.translator, 'cache', None)
+        if cache:
+             metrics["translation_cache"] = cache.stats()
+
+        translations = ctx.get('translations') or {}
+        for idx, item in enumerate(ctx['regions']):
              metrics["regions"].append({
                  "id": idx + 1,
                  "confidence": float(item.get('confidence', 0)),
                  "original_text": item['text'],
-                 "translated_text": self.translator.translate(item['text']) 
+                 "translated_text": item['translated_text']
              })
-             
-        with open("pipeline_metrics.json", "w", encoding="utf-8") as f:
-            json.dump(metrics, f, indent=4, ensure_ascii=False)
-        print("[Phase 6] Saved metrics to 'pipeline_metrics.json'")
-            
-        # 4. Save
-        pil_image.save(output_path)
-        print(f"[Pipeline] Saved result to {output_path}")
+             if len(translations) > 1:
+                 metrics["regions"][-1]["translations"] = {lang: texts[idx] for lang, texts in translations.items()}
+        if ctx.get('outputs'):
+             metrics["outputs"] = dict(ctx['outputs'])
+        skipped = ctx.get('skipped_regions')
+        if skipped is not None:
+             metrics["skipped_regions"] = [
+                 {"original_text": item['text'], "reason": item['skip_reason']} for item in skipped
+             ]
+
+        artifacts.json("pipeline_metrics.json", metrics)
+        print(f"[Phase 6] Metrics queued: '{artifacts.run_dir}/pipeline_metrics.json'")
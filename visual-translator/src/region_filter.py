@@ -0,0 +1,166 @@
+import os
+import re
+import numpy as np
+from dotenv import load_dotenv
+from src.cache import normalize_text
+
+load_dotenv()
+
+# 번역 전 영역 필터 (0이면 모든 영역을 지우고 번역)
+REGION_FILTER = os.getenv("REGION_FILTER", "1").lower() not in ("0", "false", "no")
+# 번역하지 않을 문자열 목록 파일 (한 줄에 하나, '#'은 주석, 're:'로 시작하면 정규식)
+DO_NOT_TRANSLATE_PATH = os.getenv("DO_NOT_TRANSLATE_PATH", "")
+
+# 문자 코드 범위 → 문자 체계 (글자(Letter)만 분류)
+_SCRIPT_RANGES = [
+    (0x0041, 0x024F, "latin"), (0x1E00, 0x1EFF, "latin"), (0xFF21, 0xFF5A, "latin"),
+    (0x0370, 0x03FF, "greek"), (0x0400, 0x052F, "cyrillic"),
+    (0x0590, 0x05FF, "hebrew"), (0x0600, 0x06FF, "arabic"), (0x0E00, 0x0E7F, "thai"),
+    (0x1100, 0x11FF, "hangul"), (0x3130, 0x318F, "hangul"), (0xAC00, 0xD7A3, "hangul"),
+    (0x3040, 0x309F, "hiragana"), (0x30A0, 0x30FF, "katakana"), (0x31F0, 0x31FF, "katakana"),
+    (0xFF66, 0xFF9F, "katakana"),
+    (0x3400, 0x4DBF, "han"), (0x4E00, 0x9FFF, "han"), (0xF900, 0xFAFF, "han"),
+]
+
+# 대상 언어별 (허용 문자 체계, 반드시 하나는 있어야 하는 문자 체계)
+# 이 조건을 만족하는 텍스트는 이미 대상 언어로 보고 번역하지 않습니다.
+# 라틴 문자를 쓰는 언어(영어/프랑스어 등)끼리는 문자 체계로 구분할 수 없으므로 넣지 않습니다.
+TARGET_SCRIPTS = {
+    "japanese": ({"hiragana", "katakana", "han", "latin"}, {"hiragana", "katakana"}),
+    "korean": ({"hangul", "han", "latin"}, {"hangul"}),
+    "chinese": ({"han", "latin"}, {"han"}),
+    "russian": ({"cyrillic", "latin"}, {"cyrillic"}),
+    "greek": ({"greek", "latin"}, {"greek"}),
+    "hebrew": ({"hebrew", "latin"}, {"hebrew"}),
+    "arabic": ({"arabic", "latin"}, {"arabic"}),
+    "thai": ({"thai", "latin"}, {"thai"}),
+}
+# 언어 코드로 지정한 경우 (--target-langs ja,ko,zh 등)
+_LANG_ALIASES = {
+    "ja": "japanese", "jp": "japanese", "ko": "korean", "kr": "korean",
+    "zh": "chinese", "zh-cn": "chinese", "zh-tw": "chinese", "ru": "russian",
+    "el": "greek", "he": "hebrew", "ar": "arabic", "th": "thai",
+}
+
+_URL = re.compile(
+    r"(?:https?://|www\.)\S+"
+    r"|[\w.+-]+@[\w-]+(?:\.[\w-]+)+"
+    r"|[a-z0-9-]+(?:\.[a-z0-9-]+)*\.(?:com|net|org|io|co|kr|jp|cn|me|app|dev|shop|info|biz)(?:/\S*)?",
+    re.IGNORECASE)
+# 제품 코드 / 모델명 / SKU (대문자 + 숫자 + 구분 기호, 공백 없음)
+_CODE = re.compile(r"(?=.*\d)(?=.*[A-Z])[A-Z0-9][A-Z0-9\-_/.#:]{2,}")
+
+
+def text_scripts(text):
+    """
+    텍스트에 들어 있는 글자의 문자 체계 집합 (숫자/기호/공백은 제외, 모르는 문자 체계는 'other')
+    """
+    scripts = set()
+    for char in text:
+        if not char.isalpha():
+            continue
+        code = ord(char)
+        for start, end, name in _SCRIPT_RANGES:
+            if start <= code <= end:
+                scripts.add(name)
+                break
+        else:
+            scripts.add("other")
+    return scripts
+
+
+def load_terms(path):
+    """
+    번역하지 않을 문자열 목록 파일을 읽습니다. Returns: (정규화된 문자열 집합, 정규식 리스트)
+    """
+    terms, patterns = set(), []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("re:"):
+                patterns.append(re.compile(line[3:].strip(), re.IGNORECASE))
+            else:
+                terms.add(normalize_text(line).casefold())
+    return terms, patterns
+
+
+class RegionFilter:
+    """
+    마스크 생성 전에 번역할 필요가 없는 영역을 골라냅니다. (로컬 규칙만 사용, 네트워크 없음)
+    골라낸 영역은 Inpainting 마스크와 번역 요청에서 모두 빠지고 원본 그대로 남습니다.
+
+    이유(reason):
+        - keep_list: 번역하지 않을 문자열 목록과 전체가 일치 (브랜드명 등, 대소문자/공백 무시)
+        - url: URL / 이메일 / 도메인
+        - numeric: 글자 없이 숫자와 기호만 (가격, 전화번호, 날짜, 퍼센트 등)
+        - code: 대문자와 숫자로 된 코드 (SKU, 모델명 등)
+        - target_script: 이미 대상 언어의 문자 체계로만 쓰인 텍스트 (TARGET_SCRIPTS)
+    """
+
+    def __init__(self, target_lang=None, terms=(), patterns=(), rules=True):
+        self.target_lang = target_lang
+        self.terms = {normalize_text(term).casefold() for term in terms}
+        self.patterns = list(patterns)
+        self.rules = rules
+
+    @classmethod
+    def from_env(cls, target_lang=None, terms_path=None):
+        """
+        환경 변수로 필터를 생성합니다. REGION_FILTER=0이면 None (필터 사용 안 함)
+        terms_path(없으면 DO_NOT_TRANSLATE_PATH): 번역하지 않을 문자열 목록 파일
+        """
+        if not REGION_FILTER:
+            return None
+        terms, patterns = (), ()
+        terms_path = terms_path or DO_NOT_TRANSLATE_PATH
+        if terms_path:
+            terms, patterns = load_terms(terms_path)
+        return cls(target_lang, terms, patterns)
+
+    def reason(self, text, target_langs=None):
+        """
+        번역하지 않아도 되는 이유, 번역해야 하면 None
+        target_langs(없으면 [self.target_lang]): 여러 언어로 한 번에 번역할 때는 모든 언어에서
+        이미 대상 언어인 텍스트만 target_script로 제외합니다.
+        """
+        normalized = normalize_text(text)
+        if not normalized:
+            return "empty"
+        folded = normalized.casefold()
+        if folded in self.terms or any(p.fullmatch(normalized) for p in self.patterns):
+            return "keep_list"
+        if not self.rules:
+            return None
+        if _URL.fullmatch(normalized):
+            return "url"
+        scripts = text_scripts(normalized)
+        if not scripts:
+            return "numeric"
+        if " " not in normalized and _CODE.fullmatch(normalized):
+            return "code"
+        target_langs = target_langs or [self.target_lang]
+        if all(self._in_target_script(scripts, lang) for lang in target_langs):
+            return "target_script"
+        return None
+
+    def split(self, texts, target_langs=None):
+        """
+        Returns: (번역할 영역 bool 배열, 영역별 이유 리스트 - 번역할 영역은 None)
+        """
+        reasons = [self.reason(text, target_langs) for text in texts]
+        return np.array([r is None for r in reasons], dtype=bool), reasons
+
+    def in_target_script(self, text, target_lang):
+        """
+        텍스트가 이미 target_lang의 문자 체계로만 쓰였는지 (규칙을 끈 경우 항상 False)
+        """
+        return self.rules and self._in_target_script(text_scripts(normalize_text(text)), target_lang)
+
+    @staticmethod
+    def _in_target_script(scripts, target_lang):
+        lang = (target_lang or "").strip().lower()
+        allowed, required = TARGET_SCRIPTS.get(_LANG_ALIASES.get(lang, lang), (None, None))
+        return bool(allowed and scripts <= allowed and scripts & required)
+
@@ -0,0 +1,269 @@
+from collections.abc import MutableMapping
+import numpy as np
+
+_MISSING = object()
+
+
+def _quad(points):
+    """
+    꼭짓점이 4개가 아닌 다각형은 감싸는 사각형(시계 방향, 왼쪽 위부터)으로 바꿉니다.
+    """
+    points = np.asarray(points).reshape(-1, 2)
+    if len(points) == 4:
+        return points
+    x0, y0 = points.min(axis=0)
+    x1, y1 = points.max(axis=0)
+    return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]])
+
+
+class RegionView(MutableMapping):
+    """
+    RegionBatch의 한 영역을 dict처럼 다루는 뷰 (기존 item['box'], item['text'] 코드와 호환)
+    값을 바꾸면 RegionBatch의 배열이 바뀝니다. 'box'는 복사본을 돌려줍니다.
+    """
+
+    __slots__ = ("batch", "index")
+
+    def __init__(self, batch, index):
+        self.batch = batch
+        self.index = index
+
+    def __getitem__(self, key):
+        return self.batch._get(self.index, key)
+
+    def __setitem__(self, key, value):
+        self.batch._set(self.index, key, value)
+
+    def __delitem__(self, key):
+        self.batch._delete(self.index, key)
+
+    def __iter__(self):
+        return iter(self.batch._keys(self.index))
+
+    def __len__(self):
+        return len(self.batch._keys(self.index))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class RegionBatch:
+    """
+    감지된 텍스트 영역들을 배열로 묶어 들고 있는 구조체 (struct-of-arrays)
+
+    - polygons: (N, 4, 2) int32 꼭짓점 (왼쪽 위부터 시계 방향)
+    - texts: 인식된 문자열 리스트, scores: (N,) 신뢰도
+    - text_colors: (N, 3) uint8 RGB 글자색 (마스크 생성 단계에서 채움)
+    - translated_texts: 번역문 리스트 (번역 단계에서 채움)
+    - bounds / centers / widths / heights / angles: 꼭짓점에서 한 번에 계산해 캐시 (꼭짓점을 바꾸면 다시 계산)
+
+    batch[i] / for item in batch 는 dict처럼 쓸 수 있는 RegionView를 돌려주므로
+    item['box'], item.get('text_color') 같은 기존 코드가 그대로 동작합니다.
+    """
+
+    def __init__(self, polygons, texts, scores=None):
+        self.polygons = np.ascontiguousarray(np.asarray(polygons, dtype=np.int32).reshape(-1, 4, 2))
+        self.texts = list(texts)
+        count = len(self.polygons)
+        if len(self.texts) != count:
+            raise ValueError(f"RegionBatch: {count} polygons but {len(self.texts)} texts")
+        self.scores = np.ones(count) if scores is None else np.asarray(scores, dtype=np.float64).reshape(count)
+        self.text_colors = None
+        self.translated_texts = None
+        self._extras = {}
+        self._geometry = None
+
+    # ---- 생성 ----
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, 4, 2), dtype=np.int32), [])
+
+    @classmethod
+    def from_arrays(cls, polygons, texts, scores=None):
+        """
+        다각형 리스트(꼭짓점 수가 섞여 있어도 됨)와 문자열/점수로 만듭니다.
+        """
+        polygons = list(polygons)
+        if not polygons:
+            return cls.empty()
+        try:
+            points = np.asarray(polygons)
+            if points.ndim != 3 or points.shape[1:] != (4, 2):
+                raise ValueError
+        except ValueError:
+            points = np.stack([_quad(p) for p in polygons])
+        return cls(np.round(points) if points.dtype.kind == 'f' else points, texts, scores)
+
+    @classmethod
+    def from_regions(cls, regions):
+        """
+        RegionBatch는 그대로, dict(또는 RegionView) 리스트는 RegionBatch로 변환합니다.
+        'box' / 'text' / 'confidence' 외의 키(text_color, translated_text 등)도 함께 옮깁니다.
+        """
+        if isinstance(regions, cls):
+            return regions
+        regions = list(regions)
+        batch = cls.from_arrays([r['box'] for r in regions], [r['text'] for r in regions],
+                                [float(r.get('confidence', 1.0)) for r in regions])
+        for index, region in enumerate(regions):
+            for key in region:
+                if key not in ('box', 'text', 'confidence'):
+                    batch._set(index, key, region[key])
+        return batch
+
+    @classmethod
+    def concatenate(cls, batches):
+        batches = [cls.from_regions(b) for b in batches]
+        batches = [b for b in batches if len(b)] or [cls.empty()]
+        result = cls(np.concatenate([b.polygons for b in batches]), [t for b in batches for t in b.texts],
+                     np.concatenate([b.scores for b in batches]))
+        if all(b.text_colors is not None for b in batches):
+            result.text_colors = np.concatenate([b.text_colors for b in batches])
+        if all(b.translated_texts is not None for b in batches):
+            result.translated_texts = [t for b in batches for t in b.translated_texts]
+        for key in {k for b in batches for k in b._extras}:
+            result._extras[key] = [v for b in batches for v in b._extras.get(key, [_MISSING] * len(b))]
+        return result
+
+    # ---- 선택 / 변환 ----
+
+    def select(self, indices):
+        """
+        인덱스 배열(또는 bool 마스크)로 일부 영역만 고른 새 RegionBatch
+        """
+        indices = np.arange(len(self))[indices] if len(self) else np.zeros(0, dtype=np.int64)
+        result = RegionBatch(self.polygons[indices], [self.texts[i] for i in indices], self.scores[indices])
+        if self.text_colors is not None:
+            result.text_colors = self.text_colors[indices]
+        if self.translated_texts is not None:
+            result.translated_texts = [self.translated_texts[i] for i in indices]
+        result._extras = {key: [values[i] for i in indices] for key, values in self._extras.items()}
+        return result
+
+    def offset(self, dx, dy):
+        """
+        모든 꼭짓점을 (dx, dy)만큼 옮긴 새 RegionBatch (잘라낸 영역의 결과를 전체 좌표로 되돌릴 때)
+        """
+        result = self.select(slice(None))
+        result.polygons += np.array([dx, dy], dtype=np.int32)
+        return result
+
+    def rects(self, pad, width, height):
+        """
+        영역을 pad만큼 넓힌 (x0, y0, x1, y1) 사각형 배열 (이미지 범위로 자름)
+        Returns: (N, 4) int64 배열 - color_utils.box_rects와 같은 형식
+        """
+        rects = self.bounds.astype(np.int64) + np.array([-pad, -pad, pad, pad])
+        rects[:, [0, 2]] = np.clip(rects[:, [0, 2]], 0, width)
+        rects[:, [1, 3]] = np.clip(rects[:, [1, 3]], 0, height)
+        return rects
+
+    def to_dicts(self):
+        return [dict(view) for view in self]
+
+    # ---- 기하 정보 (한 번에 계산해 캐시) ----
+
+    def _compute_geometry(self):
+        if self._geometry is None:
+            points = self.polygons
+            top = (points[:, 1] - points[:, 0]).astype(np.float64)
+            side = (points[:, 3] - points[:, 0]).astype(np.float64)
+            self._geometry = {
+                'bounds': np.concatenate([points.min(axis=1), points.max(axis=1)], axis=1),
+                'centers': points.mean(axis=1).astype(np.int64),
+                'widths': np.sqrt((top ** 2).sum(axis=1)).astype(np.int64),
+                'heights': np.sqrt((side ** 2).sum(axis=1)).astype(np.int64),
+                'angles': np.degrees(np.arctan2(top[:, 1], top[:, 0])),
+            }
+        return self._geometry
+
+    @property
+    def bounds(self):
+        """(N, 4) int32 [x_min, y_min, x_max, y_max]"""
+        return self._compute_geometry()['bounds']
+
+    @property
+    def centers(self):
+        """(N, 2) 꼭짓점 평균 (정수로 버림)"""
+        return self._compute_geometry()['centers']
+
+    @property
+    def widths(self):
+        """(N,) 윗변 길이 (정수로 버림)"""
+        return self._compute_geometry()['widths']
+
+    @property
+    def heights(self):
+        """(N,) 왼쪽 변 길이 (정수로 버림)"""
+        return self._compute_geometry()['heights']
+
+    @property
+    def angles(self):
+        """(N,) 윗변의 기울기 (도, 이미지 좌표계)"""
+        return self._compute_geometry()['angles']
+
+    # ---- dict 호환 ----
+
+    def __len__(self):
+        return len(self.polygons)
+
+    def __iter__(self):
+        return (RegionView(self, i) for i in range(len(self)))
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if not -len(self) <= index < len(self):
+                raise IndexError(index)
+            return RegionView(self, int(index) % len(self))
+        return self.select(index)
+
+    def __repr__(self):
+        return f"RegionBatch({len(self)} regions)"
+
+    def _get(self, index, key):
+        if key == 'box':
+            return self.polygons[index].copy()
+        if key == 'text':
+            return self.texts[index]
+        if key == 'confidence':
+            return float(self.scores[index])
+        if key == 'text_color' and self.text_colors is not None:
+            return tuple(int(v) for v in self.text_colors[index])
+        if key == 'translated_text' and self.translated_texts is not None:
+            return self.translated_texts[index]
+        value = self._extras.get(key, None)
+        value = _MISSING if value is None else value[index]
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def _set(self, index, key, value):
+        if key == 'box':
+            self.polygons[index] = _quad(value)
+            self._geometry = None
+        elif key == 'text':
+            self.texts[index] = value
+        elif key == 'confidence':
+            self.scores[index] = value
+        elif key == 'text_color' and self.text_colors is not None:
+            self.text_colors[index] = value
+        elif key == 'translated_text' and self.translated_texts is not None:
+            self.translated_texts[index] = value
+        else:
+            self._extras.setdefault(key, [_MISSING] * len(self))[index] = value
+
+    def _delete(self, index, key):
+        values = self._extras.get(key)
+        if values is None or values[index] is _MISSING:
+            raise KeyError(key)
+        values[index] = _MISSING
+
+    def _keys(self, index):
+        keys = ['box', 'text', 'confidence']
+        if self.text_colors is not None:
+            keys.append('text_color')
+        if self.translated_texts is not None:
+            keys.append('translated_text')
+        keys.extend(key for key, values in self._extras.items() if values[index] is not _MISSING)
+        return keys
@@ -1,10 +1,98 @@
 from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
 import numpy as np
-import math
+import os
+from src.telemetry import telemetry
+from src.compositor import OverlayCompositor, glyph_transform, premultiply
+
+# 폰트 객체 / 텍스트 크기 측정 결과 캐시 크기 (영역과 이미지 사이에서 공유)
+FONT_CACHE_SIZE = int(os.getenv("RENDER_FONT_CACHE_SIZE", "256"))
+MEASURE_CACHE_SIZE = int(os.getenv("RENDER_MEASURE_CACHE_SIZE", "8192"))
+
+# 폰트 크기 탐색 하한
+MIN_FONT_SIZE = 5
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def _load_font_cached(font_path, size):
+    """
+    (경로, 크기)별로 FreeTypeFont를 한 번만 로드합니다. (TTF/TTC 파일 재파싱 방지)
+    """
+    telemetry.count("renderer_font_loads_total")
+    try:
+        return ImageFont.truetype(font_path, size)
+    except Exception as e:
+        print(f"[Renderer] ERROR: Could not load {font_path} at size {size}. Error: {e}")
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=MEASURE_CACHE_SIZE)
+def _measure_text(font_path, size, text):
+    """
+    텍스트의 (너비, 높이)를 측정합니다.
+    """
+    bbox = _load_font_cached(font_path, size).getbbox(text)
+    return bbox[2] - bbox[0], bbox[3] - bbox[1]
+
+
+def _box_size(box):
+    # Box 좌표에서 너비와 높이 계산
+    return int(np.linalg.norm(box[1] - box[0])), int(np.linalg.norm(box[3] - box[0]))
+
 
 class TextRenderer:
-    def __init__(self, font_path="C:/Windows/Fonts/msgothic.ttc"): # 윈도우 시스템 폰트 절대 경로 사용
+    def __init__(self, font_path="C:/Windows/Fonts/msgothic.ttc", compositor=None): # 윈도우 시스템 폰트 절대 경로 사용
         self.font_path = font_path
+        self.compositor = compositor or OverlayCompositor()
+
+    def render_regions(self, background: np.ndarray, regions) -> np.ndarray:
+        """
+        모든 영역의 번역문을 한 번에 그립니다. (render_layout의 영역 리스트 버전)
+        Args:
+            background: (H, W, 3) RGB uint8 이미지 (제자리에서 수정됨)
+            regions: [(text, box, angle, text_color), ...]
+        Returns: background
+        """
+        regions = list(regions)
+        boxes = np.array([box for _, box, _, _ in regions], dtype=np.float64).reshape(-1, 4, 2)
+        top, side = boxes[:, 1] - boxes[:, 0], boxes[:, 3] - boxes[:, 0]
+        sizes = np.stack([np.sqrt((top ** 2).sum(axis=1)), np.sqrt((side ** 2).sum(axis=1))], axis=1).astype(np.int64)
+        return self.render_layout(background, [r[0] for r in regions], sizes, boxes.mean(axis=1).astype(np.int64),
+                                  [r[2] for r in regions], [r[3] for r in regions])
+
+    def render_layout(self, background: np.ndarray, texts, sizes, centers, angles, colors) -> np.ndarray:
+        """
+        영역 배열(RegionBatch의 widths/heights/centers/angles)로 모든 번역문을 한 번에 그립니다.
+        영역별 글자 레이어를 (같은 텍스트/크기/색이면 한 번만) 만든 뒤, 아핀 변환으로 하나의 오버레이에
+        모아 배경에 한 번만 알파 블렌딩합니다.
+        Args:
+            background: (H, W, 3) RGB uint8 이미지 (제자리에서 수정됨)
+            texts: 영역별 문자열 리스트
+            sizes: (N, 2) 레이어 (너비, 높이)
+            centers: (N, 2) 회전 중심 (박스 중심)
+            angles: (N,) 회전 각도 (도, 반시계 방향이 양수)
+            colors: (N, 3) 글자색
+        Returns: background
+        """
+        layers = {}
+        glyphs = []
+        with telemetry.span("renderer.render_regions", regions=len(texts)) as span:
+            for text, (width, height), (cx, cy), angle, text_color in zip(
+                    texts, np.asarray(sizes).tolist(), np.asarray(centers).tolist(),
+                    np.asarray(angles, dtype=np.float64).tolist(), np.asarray(colors).tolist()):
+                if width == 0 or height == 0 or not text:
+                    continue
+                key = (text, width, height, tuple(text_color))
+                if key not in layers:
+                    with telemetry.span("renderer.layer", text=text, width=width, height=height):
+                        layers[key] = premultiply(self.render_layer(text, width, height, text_color))
+                glyphs.append((layers[key], glyph_transform((width, height), (cx, cy), angle)))
+
+            span.set(layers=len(layers))
+            self.compositor.composite(background, glyphs)
+        telemetry.count("renderer_layers_total", len(layers))
+        telemetry.count("renderer_layers_reused_total", len(glyphs) - len(layers))
+        return background
 
     def render(self, image: Image.Image, text: str, box: np.ndarray, angle: float = 0, text_color: tuple = (0, 0, 0)):
         """
@@ -16,70 +104,85 @@ class TextRenderer:
             angle: 텍스트 회전 각도
             text_color: 텍스트 색상 (R, G, B) - 기본값 검정
         """
-        # Box 좌표에서 너비와 높이 계산
-        width = int(np.linalg.norm(box[1] - box[0]))
-        height = int(np.linalg.norm(box[3] - box[0]))
-        
+        width, height = _box_size(box)
+
         if width == 0 or height == 0:
             return
 
-        # 텍스트를 그릴 투명 레이어 생성
-        print(f"[Renderer] Rendering text: '{text}' into box {width}x{height} with color {text_color}")
-        text_layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(text_layer)
-        
-        # 폰트 크기 자동 조절
-        font_size = height # 초기값
-        font = self._load_font(font_size)
-        
-        # 텍스트가 박스 안에 들어갈 때까지 폰트 줄이기
-        while font_size > 5:
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_w = bbox[2] - bbox[0]
-            text_h = bbox[3] - bbox[1]
-            if text_w <= width and text_h <= height:
-                break
-            font_size -= 1
-            font = self._load_font(font_size)
-            
-        # 텍스트 중앙 정렬 좌표 계산
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_w = bbox[2] - bbox[0]
-        text_h = bbox[3] - bbox[1]
-        x = (width - text_w) // 2
-        y = (height - text_h) // 2
-        
-        # 외곽선 색상 자동 계산 (보색/반전)
-        outline_color = (255 - text_color[0], 255 - text_color[1], 255 - text_color[2])
-        
-        # 텍스트 그리기
-        stroke_width = max(1, font_size // 15)
-        
-        # 가독성을 위해 외곽선(Stroke)을 그리고, 그 위에 글자(Fill)를 그림
-        draw.text((x, y), text, font=font, fill=text_color, stroke_width=stroke_width, stroke_fill=outline_color)
+        with telemetry.span("renderer.render", width=width, height=height):
+            self._render(image, text, box, angle, text_color, width, height)
+
+    def _render(self, image, text, box, angle, text_color, width, height):
+        text_layer = Image.fromarray(self.render_layer(text, width, height, text_color), 'RGBA')
 
         # 회전 (Pillow는 시계 반대 방향이 양수)
         # PaddleOCR의 각도 처리는 상황에 따라 다를 수 있으므로 테스트 필요
         # 여기서는 입력받은 angle만큼 회전
         rotated_layer = text_layer.rotate(angle, expand=True, resample=Image.BICUBIC)
-        
+
         # 원본 이미지에 붙여넣기 위한 좌표 계산
         # 회전 중심은 box의 중심
         center_x = int(np.mean(box[:, 0]))
         center_y = int(np.mean(box[:, 1]))
-        
+
         # 회전된 레이어의 크기
         rw, rh = rotated_layer.size
         paste_x = center_x - rw // 2
         paste_y = center_y - rh // 2
-        
-        image.paste(rotated_layer, (paste_x, paste_y), rotated_layer)
 
         image.paste(rotated_layer, (paste_x, paste_y), rotated_layer)
 
+    def render_layer(self, text, width, height, text_color=(0, 0, 0)) -> np.ndarray:
+        """
+        (width, height) 크기의 투명 레이어 중앙에 텍스트를 그립니다.
+        Returns: (height, width, 4) RGBA uint8 배열
+        """
+        # 텍스트를 그릴 투명 레이어 생성
+        text_layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(text_layer)
+
+        # 폰트 크기 자동 조절 (이진 탐색)
+        font_size = self._fit_font_size(text, width, height)
+        font = self._load_font(font_size)
+
+        # 텍스트 중앙 정렬 좌표 계산
+        text_w, text_h = _measure_text(self.font_path, font_size, text)
+        x = (width - text_w) // 2
+        y = (height - text_h) // 2
+
+        # 외곽선 색상 자동 계산 (보색/반전)
+        text_color = tuple(int(c) for c in text_color)
+        outline_color = (255 - text_color[0], 255 - text_color[1], 255 - text_color[2])
+
+        # 텍스트 그리기
+        stroke_width = max(1, font_size // 15)
+
+        # 가독성을 위해 외곽선(Stroke)을 그리고, 그 위에 글자(Fill)를 그림
+        draw.text((x, y), text, font=font, fill=text_color, stroke_width=stroke_width, stroke_fill=outline_color)
+        return np.asarray(text_layer)
+
+    def _fit_font_size(self, text, width, height):
+        """
+        텍스트가 (width, height) 박스 안에 들어가는 가장 큰 폰트 크기를 이진 탐색으로 찾습니다.
+        (MIN_FONT_SIZE에서도 넘치면 MIN_FONT_SIZE를 반환)
+        """
+        def fits(size):
+            text_w, text_h = _measure_text(self.font_path, size, text)
+            return text_w <= width and text_h <= height
+
+        if height <= MIN_FONT_SIZE or fits(height):
+            return height
+
+        best = MIN_FONT_SIZE
+        lo, hi = MIN_FONT_SIZE + 1, height - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            if fits(mid):
+                best = mid
+                lo = mid + 1
+            else:
+                hi = mid - 1
+        return best
+
     def _load_font(self, size):
-        try:
-            return ImageFont.truetype(self.font_path, size)
-        except Exception as e:
-            print(f"[Renderer] ERROR: Could not load {self.font_path} at size {size}. Error: {e}")
-            return ImageFont.load_default()
+        return _load_font_cached(self.font_path, size)
@@ -0,0 +1,342 @@
+import json
+import time
+import uuid
+import queue
+import threading
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+import numpy as np
+from src.telemetry import telemetry
+
+CONTENT_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp"}
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, image, use_rotation=True, output_format=".png"):
+        self.id = uuid.uuid4().hex
+        self.image = image
+        self.use_rotation = use_rotation
+        self.output_format = output_format
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.regions = 0
+        self.created = time.time()
+        self.finished = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "regions": self.regions,
+            "created": self.created,
+            "finished": self.finished,
+            "seconds": (self.finished or time.time()) - self.created,
+        }
+
+
+class TranslationService:
+    """
+    파이프라인을 여러 요청이 동시에 쓸 수 있게 감싸는 작업 큐입니다.
+
+    - 입장 제어: 처리 중인 작업이 capacity개면 새 요청은 QueueFullError (HTTP 429)
+    - 탐지 마이크로 배치: batch_window초 안에 도착한 이미지(최대 max_batch개)를 모아
+      detector.detect_batch() 한 번으로 처리 (탐지 워커 풀: detect_workers)
+    - 요청별 후처리: 마스크 → Inpainting/번역(동시) → 렌더링 → 인코딩을 workers개 스레드에서 병렬 처리
+
+    동시 실행 범위: 탐지는 detect_workers개(기본 1) 스레드에서만 호출하고, build_mask / inpaint / translate / render는
+    작업마다 따로 만든 ctx만 고치므로 여러 작업에서 동시에 실행합니다. 이때 공유하는 Inpainter / Translator /
+    TextRenderer / 캐시는 스레드 안전해야 합니다. (StabilityAIInpainter는 통계를 잠금으로, HTTP 세션을 스레드별로 관리)
+    """
+
+    def __init__(self, pipeline, capacity=32, workers=4, detect_workers=1, batch_window=0.02, max_batch=8, job_ttl=600):
+        self.pipeline = pipeline
+        self.capacity = capacity
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.job_ttl = job_ttl
+
+        self._pending = queue.Queue()
+        self._jobs = {}
+        self._active = 0
+        self._last_expiry = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._detect_slots = threading.Semaphore(detect_workers)
+        self._detect_pool = ThreadPoolExecutor(max_workers=detect_workers, thread_name_prefix="service-detect")
+        self._workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service-worker")
+        self._translate_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service-translate")
+        self._batcher = threading.Thread(target=self._batch_loop, name="service-batcher", daemon=True)
+        self._batcher.start()
+
+    # ---- 작업 제출 / 조회 ----
+
+    def submit(self, image, use_rotation=True, output_format=".png"):
+        with self._lock:
+            if self._active >= self.capacity:
+                telemetry.count("service_rejected_total")
+                raise QueueFullError(f"Queue is full ({self.capacity} jobs in progress)")
+            self._active += 1
+            job = Job(image, use_rotation, output_format)
+            self._jobs[job.id] = job
+        self._pending.put(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def discard(self, job_id):
+        """
+        결과를 이미 응답한 작업을 바로 지웁니다. (동기 API는 나중에 결과를 다시 조회하지 않음)
+        """
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": self._active,
+                "capacity": self.capacity,
+                "waiting_for_detection": self._pending.qsize(),
+                "jobs": len(self._jobs),
+            }
+
+    def shutdown(self):
+        self._stop.set()
+        self._batcher.join()
+        self._detect_pool.shutdown()
+        self._workers.shutdown()
+        self._translate_pool.shutdown()
+
+    # ---- 내부 단계 ----
+
+    def _batch_loop(self):
+        while not self._stop.is_set():
+            # 요청이 끊이지 않아도 오래된 작업이 쌓이지 않도록 매 반복마다 (최대 1초에 한 번) 정리
+            self._expire_jobs()
+            try:
+                first = self._pending.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._detect_slots.acquire()
+            self._detect_pool.submit(self._detect_batch, batch)
+
+    def _detect_batch(self, batch):
+        try:
+            for job in batch:
+                job.status = "detecting"
+            images = [job.image for job in batch]
+            with telemetry.span("service.detect_batch", batch=len(batch)) as span:
+                detector = self.pipeline.detector
+                if hasattr(detector, "detect_batch"):
+                    results = detector.detect_batch(images)
+                else:
+                    results = [detector.detect(image) for image in images]
+            telemetry.count("service_detect_batches_total")
+            telemetry.count("service_detect_images_total", len(batch))
+        except Exception as e:
+            for job in batch:
+                self._finish(job, error=f"detect: {e}")
+            return
+        finally:
+            self._detect_slots.release()
+
+        per_image = span.duration / len(batch)
+        results = list(results)
+        for index, job in enumerate(batch):
+            # 작업 하나의 준비가 실패해도 나머지 작업과 처리 중 작업 수(_active)는 정리되도록 작업마다 처리
+            try:
+                if index >= len(results):
+                    raise ValueError(f"detector returned {len(results)} results for {len(batch)} images")
+                job.status = "processing"
+                job.regions = len(results[index])
+                ctx = self.pipeline.make_context(job.image, results[index], per_image)
+                self._workers.submit(self._process, job, ctx)
+            except Exception as e:
+                self._finish(job, error=f"setup: {type(e).__name__}: {e}")
+
+    def _process(self, job, ctx):
+        try:
+            with telemetry.span("service.process", job=job.id, regions=len(ctx['regions'])):
+                self.pipeline.build_mask(ctx)
+                translate_future = self._translate_pool.submit(self.pipeline.translate, ctx)
+                try:
+                    self.pipeline.inpaint(ctx)
+                finally:
+                    translate_future.result()
+                self.pipeline.render(ctx, use_rotation=job.use_rotation)
+                self.pipeline.record_metrics(ctx)
+                ok, encoded = cv2.imencode(job.output_format, self.pipeline.result_array(ctx))
+                if not ok:
+                    raise ValueError(f"Could not encode result as {job.output_format}")
+            self._finish(job, result=encoded.tobytes())
+        except Exception as e:
+            self._finish(job, error=f"{type(e).__name__}: {e}")
+
+    def _finish(self, job, result=None, error=None):
+        job.result = result
+        job.error = error
+        job.image = None
+        job.status = "failed" if error else "done"
+        job.finished = time.time()
+        telemetry.count("service_jobs_total", status=job.status)
+        with self._lock:
+            self._active -= 1
+        job.done.set()
+
+    def _expire_jobs(self):
+        now = time.monotonic()
+        if now - self._last_expiry < 1.0:
+            return
+        self._last_expiry = now
+        cutoff = time.time() - self.job_ttl
+        with self._lock:
+            for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished < cutoff]:
+                del self._jobs[job_id]
+
+
+def _make_handler(service, sync_timeout):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, content_type="application/json", headers=None):
+            if not isinstance(body, bytes):
+                body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+            telemetry.count("service_requests_total", method=self.command, status=status)
+
+        def _submit_from_body(self, params):
+            length = int(self.headers.get("Content-Length", 0))
+            data = self.rfile.read(length)
+            image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR) if data else None
+            if image is None:
+                self._send(400, {"error": "Request body must be an encoded image"})
+                return None
+
+            output_format = "." + params.get("format", ["png"])[0].lstrip(".").lower()
+            if output_format not in CONTENT_TYPES:
+                self._send(400, {"error": f"Unsupported format: {output_format}"})
+                return None
+            use_rotation = params.get("rotate", ["1"])[0] not in ("0", "false", "no")
+            try:
+                return service.submit(image, use_rotation=use_rotation, output_format=output_format)
+            except QueueFullError as e:
+                self._send(429, {"error": str(e)}, headers={"Retry-After": "1"})
+                return None
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+
+            # 동기 API: 결과 이미지를 바로 응답
+            if url.path == "/v1/translate":
+                job = self._submit_from_body(params)
+                if job is None:
+                    return
+                if not job.done.wait(sync_timeout):
+                    self._send(504, {"error": "Timed out", "job": job.to_dict()})
+                elif job.error:
+                    self._send(500, {"error": job.error, "job": job.to_dict()})
+                    service.discard(job.id)
+                else:
+                    try:
+                        self._send(200, job.result, CONTENT_TYPES[job.output_format], {"X-Job-Id": job.id})
+                    finally:
+                        # 결과 bytes를 job_ttl 동안 들고 있지 않도록 바로 지움 (시간 초과된 작업은 폴링할 수 있게 남김)
+                        service.discard(job.id)
+                return
+
+            # 비동기 API: 작업 ID를 돌려주고 폴링
+            if url.path == "/v1/jobs":
+                job = self._submit_from_body(params)
+                if job is None:
+                    return
+                self._send(202, dict(job.to_dict(), status_url=f"/v1/jobs/{job.id}",
+                                     result_url=f"/v1/jobs/{job.id}/result"),
+                           headers={"Location": f"/v1/jobs/{job.id}"})
+                return
+
+            self._send(404, {"error": "Not found"})
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/healthz":
+                self._send(200, service.stats())
+                return
+
+            parts = path.strip("/").split("/")
+            if len(parts) >= 3 and parts[:2] == ["v1", "jobs"]:
+                job = service.get(parts[2])
+                if job is None:
+                    self._send(404, {"error": "Unknown job"})
+                elif len(parts) == 3:
+                    self._send(200, job.to_dict())
+                elif parts[3:] == ["result"]:
+                    if job.status == "done":
+                        self._send(200, job.result, CONTENT_TYPES[job.output_format])
+                    elif job.status == "failed":
+                        self._send(500, job.to_dict())
+                    else:
+                        self._send(202, job.to_dict(), headers={"Retry-After": "1"})
+                else:
+                    self._send(404, {"error": "Not found"})
+                return
+
+            self._send(404, {"error": "Not found"})
+
+    return Handler
+
+
+def serve(pipeline, host="127.0.0.1", port=8080, sync_timeout=300, **service_options):
+    """
+    HTTP 서비스를 실행합니다.
+        POST /v1/translate?format=png&rotate=1   (본문: 이미지) → 번역된 이미지
+        POST /v1/jobs                            (본문: 이미지) → 202 {"id": ...}
+        GET  /v1/jobs/<id>                       → 작업 상태
+        GET  /v1/jobs/<id>/result                → 번역된 이미지 (완료 전 202)
+        GET  /healthz                            → 큐 상태
+    처리 중인 작업이 가득 차면 429 (Retry-After)로 응답합니다.
+    """
+    service = TranslationService(pipeline, **service_options)
+    httpd = ThreadingHTTPServer((host, port), _make_handler(service, sync_timeout))
+    httpd.daemon_threads = True
+    print(f"[Service] Listening on http://{host}:{httpd.server_address[1]}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.shutdown()
+        print("[Service] Stopped.")
@@ -0,0 +1,411 @@
+import os
+import cv2
+import numpy as np
+from PIL import Image, ImageSequence
+from src.telemetry import telemetry
+from src.regions import RegionBatch
+from src.geometry import merge_rects
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm", ".m4v")
+MULTI_FRAME_EXTENSIONS = (".gif", ".webp", ".tif", ".tiff", ".pdf") + VIDEO_EXTENSIONS
+
+# 동영상 코덱 (출력 확장자별)
+FOURCC = {".mp4": "mp4v", ".m4v": "mp4v", ".mov": "mp4v", ".avi": "MJPG", ".mkv": "mp4v", ".webm": "VP80"}
+
+
+def is_multi_frame(path):
+    """
+    여러 프레임(애니메이션/동영상/여러 페이지)으로 처리해야 하는 입력인지 확인합니다.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in VIDEO_EXTENSIONS or ext == ".pdf":
+        return True
+    if ext in MULTI_FRAME_EXTENSIONS:
+        try:
+            with Image.open(path) as im:
+                return getattr(im, "n_frames", 1) > 1
+        except OSError:
+            return False
+    return False
+
+
+# ---- 입력: 프레임을 하나씩 디코딩하는 제너레이터 ----
+
+def read_frames(path, dpi=150):
+    """
+    입력 파일의 프레임을 하나씩 디코딩해서 돌려줍니다. (전체 프레임을 메모리에 올리지 않음)
+    Yields:
+        (BGR 프레임, 표시 시간 ms)
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in VIDEO_EXTENSIONS:
+        yield from _read_video(path)
+    elif ext == ".pdf":
+        yield from _read_pdf(path, dpi)
+    else:
+        yield from _read_image_sequence(path)
+
+
+def _read_video(path):
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video: {path}")
+    fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            yield frame, 1000.0 / fps
+    finally:
+        capture.release()
+
+
+def _read_pdf(path, dpi):
+    try:
+        import pypdfium2
+    except ImportError:
+        raise RuntimeError("PDF input requires pypdfium2 (pip install pypdfium2)")
+
+    document = pypdfium2.PdfDocument(path)
+    try:
+        for index in range(len(document)):
+            page = document[index]
+            rgb = np.asarray(page.render(scale=dpi / 72).to_pil().convert("RGB"))
+            page.close()
+            yield cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR), 0
+    finally:
+        document.close()
+
+
+def _read_image_sequence(path):
+    # GIF/WebP/TIFF: Pillow가 프레임 합성(disposal 등)을 처리한 전체 프레임을 하나씩 읽음
+    with Image.open(path) as im:
+        for frame in ImageSequence.Iterator(im):
+            rgb = np.asarray(frame.convert("RGB"))
+            yield cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR), frame.info.get("duration", 100)
+
+
+# ---- 출력: 프레임을 받는 대로 바로 인코딩하는 writer ----
+
+class GifWriter:
+    """
+    프레임마다 팔레트(로컬 컬러 테이블)를 만들어 바로 파일에 씁니다.
+    (Pillow의 save_all은 모든 프레임을 모아 최적화한 뒤에 쓰므로 사용하지 않음)
+    """
+
+    def __init__(self, path, loop=0):
+        self.path = path
+        self.loop = loop
+        self._file = None
+
+    def write(self, frame, duration=100):
+        from PIL import GifImagePlugin
+
+        image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).quantize(256)
+        if self._file is None:
+            w, h = image.size
+            self._file = open(self.path, "wb")
+            # 헤더 (전역 컬러 테이블 없음) + 반복 재생(NETSCAPE2.0) 확장
+            self._file.write(b"GIF89a" + w.to_bytes(2, "little") + h.to_bytes(2, "little") + b"\x00\x00\x00")
+            self._file.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + self.loop.to_bytes(2, "little") + b"\x00")
+        for chunk in GifImagePlugin.getdata(image, duration=int(duration or 100), include_color_table=True):
+            self._file.write(chunk)
+
+    def close(self):
+        if self._file is not None:
+            self._file.write(b";")
+            self._file.close()
+            self._file = None
+
+
+class TiffWriter:
+    """
+    여러 페이지 TIFF를 한 페이지씩 이어 씁니다.
+    """
+
+    def __init__(self, path, compression="tiff_deflate"):
+        self.path = path
+        self.compression = compression
+        self._writer = None
+
+    def write(self, frame, duration=None):
+        from PIL import TiffImagePlugin
+
+        if self._writer is None:
+            self._writer = TiffImagePlugin.AppendingTiffWriter(self.path, new=True)
+        Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).save(
+            self._writer, format="TIFF", compression=self.compression)
+        self._writer.newFrame()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class PdfWriter:
+    """
+    페이지마다 JPEG 이미지 하나를 담은 PDF를 한 페이지씩 이어 씁니다.
+    페이지 트리/카탈로그/xref는 마지막(close)에 씁니다.
+    """
+
+    def __init__(self, path, dpi=150, quality=90):
+        self.path = path
+        self.dpi = dpi
+        self.quality = quality
+        self._file = None
+        self._offsets = {}
+        self._pages = []
+        self._next_id = 3  # 1: Catalog, 2: Pages
+
+    def _object(self, number, body, stream=None):
+        self._offsets[number] = self._file.tell()
+        self._file.write(f"{number} 0 obj\n".encode() + body)
+        if stream is not None:
+            self._file.write(b"\nstream\n" + stream + b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    def write(self, frame, duration=None):
+        if self._file is None:
+            self._file = open(self.path, "wb")
+            self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise ValueError("Could not encode PDF page")
+        jpeg = jpeg.tobytes()
+        h, w = frame.shape[:2]
+        page_w, page_h = w * 72 / self.dpi, h * 72 / self.dpi
+        image_id, content_id, page_id = self._next_id, self._next_id + 1, self._next_id + 2
+        self._next_id += 3
+
+        self._object(image_id, (f"<< /Type /XObject /Subtype /Image /Width {w} /Height {h} /ColorSpace /DeviceRGB "
+                                f"/BitsPerComponent 8 /Filter /DCTDecode /Length {len(jpeg)} >>").encode(), jpeg)
+        content = f"q {page_w:.2f} 0 0 {page_h:.2f} 0 0 cm /Im0 Do Q".encode()
+        self._object(content_id, f"<< /Length {len(content)} >>".encode(), content)
+        self._object(page_id, (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_w:.2f} {page_h:.2f}] "
+                               f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>").encode())
+        self._pages.append(page_id)
+
+    def close(self):
+        if self._file is None:
+            return
+        kids = " ".join(f"{page} 0 R" for page in self._pages)
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>".encode())
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref = self._file.tell()
+        self._file.write(f"xref\n0 {self._next_id}\n0000000000 65535 f \n".encode())
+        for number in range(1, self._next_id):
+            self._file.write(f"{self._offsets[number]:010d} 00000 n \n".encode())
+        self._file.write(f"trailer\n<< /Size {self._next_id} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+        self._file.close()
+        self._file = None
+
+
+class VideoWriter:
+    """
+    cv2.VideoWriter로 프레임을 바로 인코딩합니다. (첫 프레임에서 크기/FPS 결정)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._writer = None
+
+    def write(self, frame, duration=40):
+        if self._writer is None:
+            fourcc = cv2.VideoWriter_fourcc(*FOURCC.get(os.path.splitext(self.path)[1].lower(), "mp4v"))
+            fps = 1000.0 / duration if duration else 25.0
+            self._writer = cv2.VideoWriter(self.path, fourcc, fps, (frame.shape[1], frame.shape[0]))
+            if not self._writer.isOpened():
+                raise ValueError(f"Could not open video writer: {self.path}")
+        self._writer.write(frame)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+
+class ImageSequenceWriter:
+    """
+    프레임마다 이미지 파일 하나 (예: out/frame_%04d.png)
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self._index = 0
+
+    def write(self, frame, duration=None):
+        path = self.pattern % self._index
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        cv2.imwrite(path, frame)
+        self._index += 1
+
+    def close(self):
+        pass
+
+
+def open_writer(path, dpi=150):
+    """
+    출력 경로(확장자)에 맞는 writer를 만듭니다. 경로에 '%'가 있으면 프레임별 이미지 파일로 저장합니다.
+    """
+    if "%" in path:
+        return ImageSequenceWriter(path)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".gif":
+        return GifWriter(path)
+    if ext in (".tif", ".tiff"):
+        return TiffWriter(path)
+    if ext == ".pdf":
+        return PdfWriter(path, dpi=dpi)
+    if ext in VIDEO_EXTENSIONS:
+        return VideoWriter(path)
+    raise ValueError(f"Unsupported multi-frame output format: {path} (use .gif/.tiff/.pdf/.mp4 or a %d pattern)")
+
+
+# ---- 프레임 간 재사용 ----
+
+class StreamTranslator:
+    """
+    애니메이션 GIF / 동영상 / 여러 페이지 문서를 프레임 단위로 번역합니다.
+
+    이전 프레임과의 차이(축소한 흑백 이미지의 픽셀 차이)로 바뀐 영역만 찾아서:
+    - 바뀐 곳이 없으면 이전 결과 프레임을 그대로 사용
+    - 일부만 바뀌었으면 그 영역(겹치는 텍스트 영역 포함)만 잘라서 탐지/Inpainting/번역/렌더링하고,
+      나머지 텍스트 영역은 이전 결과(지우고 다시 그린 픽셀)를 재사용
+    - 바뀐 면적이 full_frame_ratio를 넘거나 keyframe_interval마다 전체 프레임을 다시 처리
+    번역은 스트림 안에서 같은 원문이면 다시 요청하지 않습니다.
+    입력은 제너레이터로 한 프레임씩 읽고 결과는 바로 인코딩하므로 메모리에는 몇 프레임만 유지됩니다.
+    pipeline은 단계 캐시 없이(stage_cache=None) 만드세요. 프레임마다 디스크에 쓰는 비용만 들고 다시 적중하는 일은 드뭅니다.
+    """
+
+    def __init__(self, pipeline, pixel_threshold=12, diff_scale=0.25, padding=24,
+                 full_frame_ratio=0.5, keyframe_interval=0):
+        self.pipeline = pipeline
+        self.pixel_threshold = pixel_threshold
+        self.diff_scale = diff_scale
+        self.padding = padding
+        self.full_frame_ratio = full_frame_ratio
+        self.keyframe_interval = keyframe_interval
+
+    def run(self, input_path, output_path, use_rotation=True, dpi=150):
+        print(f"[Stream] Start processing: {input_path} -> {output_path}")
+        writer = open_writer(output_path, dpi=dpi)
+        summary = {'frames': 0, 'full': 0, 'partial': 0, 'reused': 0, 'redetected_areas': 0}
+        self._state = None
+        self._memo = {}
+        self._areas = 0
+        try:
+            with telemetry.span("stream.run", input=input_path) as span:
+                for index, (frame, duration) in enumerate(read_frames(input_path, dpi=dpi)):
+                    with telemetry.span("stream.frame", index=index) as frame_span:
+                        output, mode = self._process(frame, index, use_rotation)
+                        frame_span.set(mode=mode)
+                    writer.write(output, duration)
+                    summary['frames'] += 1
+                    summary[mode] += 1
+                    telemetry.count("stream_frames_total", mode=mode)
+                summary['redetected_areas'] = self._areas
+                span.set(**summary)
+        finally:
+            writer.close()
+            self._state = None
+        summary['seconds'] = span.duration
+        print(f"[Stream] Done: {summary['frames']} frames (full {summary['full']}, partial {summary['partial']}, "
+              f"reused {summary['reused']}). (Time: {span.duration:.2f}s)")
+        return summary
+
+    def _small_gray(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, None, fx=self.diff_scale, fy=self.diff_scale, interpolation=cv2.INTER_AREA)
+
+    def _process(self, frame, index, use_rotation):
+        small = self._small_gray(frame)
+        state = self._state
+        keyframe = self.keyframe_interval and index % self.keyframe_interval == 0
+        if state is None or keyframe or state['output'].shape != frame.shape:
+            return self._process_full(frame, small, use_rotation), 'full'
+
+        changed = cv2.absdiff(small, state['reference']) > self.pixel_threshold
+        if not changed.any():
+            return state['output'], 'reused'
+
+        rects = self._changed_rects(changed, frame.shape)
+        h, w = frame.shape[:2]
+        if sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects) > self.full_frame_ratio * w * h:
+            return self._process_full(frame, small, use_rotation), 'full'
+
+        self._process_partial(frame, small, rects, use_rotation)
+        return state['output'], 'partial'
+
+    def _changed_rects(self, changed, shape):
+        """
+        바뀐 픽셀 덩어리를 원본 좌표 사각형으로 바꾸고, 걸치는 기존 텍스트 영역을 통째로 포함하도록 넓힙니다.
+        """
+        h, w = shape[:2]
+        scale = 1.0 / self.diff_scale
+        count, _, stats, _ = cv2.connectedComponentsWithStats(changed.astype(np.uint8), connectivity=8)
+        rects = []
+        for x, y, bw, bh, _ in stats[1:count]:
+            rects.append((max(0, int(x * scale) - self.padding), max(0, int(y * scale) - self.padding),
+                          min(w, int((x + bw) * scale) + self.padding), min(h, int((y + bh) * scale) + self.padding)))
+
+        # 텍스트 영역이 잘리지 않도록, 겹치는 영역의 박스를 더해 다시 합치기를 반복
+        region_rects = [tuple(rect) for rect in self._state['regions'].rects(self.padding, w, h).tolist()]
+        while True:
+            rects = merge_rects(rects)
+            grown = []
+            for x0, y0, x1, y1 in rects:
+                for rx0, ry0, rx1, ry1 in region_rects:
+                    if rx0 < x1 and x0 < rx1 and ry0 < y1 and y0 < ry1:
+                        x0, y0, x1, y1 = min(x0, rx0), min(y0, ry0), max(x1, rx1), max(y1, ry1)
+                grown.append((x0, y0, x1, y1))
+            if grown == rects:
+                return rects
+            rects = grown
+
+    def _run_stages(self, image, use_rotation):
+        """
+        이미지(또는 잘라낸 영역)에 탐지 → 마스크 → Inpainting → 번역 → 렌더링을 실행합니다.
+        Returns: (결과 BGR, RegionBatch, 마스크)
+        """
+        ctx = self.pipeline.detect(image, debug=False)
+        if not len(ctx['regions']):
+            return image.copy(), ctx['regions'], np.zeros(image.shape[:2], np.uint8)
+        self.pipeline.build_mask(ctx)
+        self.pipeline.inpaint(ctx)
+        self.pipeline.translate(ctx, memo=self._memo)
+        self.pipeline.render(ctx, use_rotation=use_rotation)
+        return self.pipeline.result_array(ctx), ctx['regions'], ctx['mask']
+
+    def _process_full(self, frame, small, use_rotation):
+        output, regions, mask = self._run_stages(frame, use_rotation)
+        self._state = {'output': output, 'regions': regions, 'mask': mask, 'reference': small}
+        return output
+
+    def _process_partial(self, frame, small, rects, use_rotation):
+        state = self._state
+        # 바뀌지 않은 곳: 텍스트 영역은 이전 결과, 나머지는 현재 프레임
+        output = frame.copy()
+        keep = state['mask'] > 0
+        output[keep] = state['output'][keep]
+
+        regions = state['regions']
+        for x0, y0, x1, y1 in rects:
+            # 이 영역에 걸친 기존 텍스트 영역은 버리고 다시 탐지
+            bx0, by0, bx1, by1 = regions.bounds.T
+            regions = regions.select(~((bx0 < x1) & (x0 < bx1) & (by0 < y1) & (y0 < by1)))
+            crop = np.ascontiguousarray(frame[y0:y1, x0:x1])
+            with telemetry.span("stream.area", x=x0, y=y0, width=x1 - x0, height=y1 - y0):
+                result, crop_regions, crop_mask = self._run_stages(crop, use_rotation)
+            output[y0:y1, x0:x1] = result
+            state['mask'][y0:y1, x0:x1] = crop_mask
+            regions = RegionBatch.concatenate([regions, crop_regions.offset(x0, y0)])
+            telemetry.count("stream_redetected_areas_total")
+            self._areas += 1
+
+        state['output'] = output
+        state['regions'] = regions
+        state['reference'] = small
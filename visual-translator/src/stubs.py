@@ -0,0 +1,128 @@
+import os
+import time
+import cv2
+import numpy as np
+from src.inpainter import Inpainter
+from src.regions import RegionBatch
+
+
+class StubDetector:
+    """
+    PaddleOCR 없이 동작하는 결정적(deterministic) 텍스트 탐지기입니다.
+    배경과 대비되는 글자(연결 요소)를 같은 줄끼리 묶어 박스를 만들고,
+    텍스트는 'text N' 형식의 자리표시자로 채웁니다.
+
+    latency: 호출당 고정 지연(초), per_image_latency: 이미지당 추가 지연(초)
+    """
+
+    def __init__(self, latency=0.0, per_image_latency=0.0, min_area=80):
+        self.latency = latency
+        self.per_image_latency = per_image_latency
+        self.min_area = min_area
+
+    def warmup(self):
+        return self
+
+    def cache_identity(self):
+        return f"StubDetector|min_area={self.min_area}"
+
+    def detect(self, image):
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images):
+        images = [cv2.imread(i) if isinstance(i, str) else i for i in images]
+        time.sleep(self.latency + self.per_image_latency * len(images))
+        return [self._find_regions(image) for image in images]
+
+    def _find_regions(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        # 글자가 배경보다 적은 쪽이 되도록 반전
+        if np.count_nonzero(binary) > binary.size // 2:
+            binary = cv2.bitwise_not(binary)
+        # 글자(연결 요소)마다 자기 높이에 비례해 가로로 넓힌 사각형을 그려서 같은 줄의 글자끼리 묶음
+        # (고정 크기 커널과 달리 이미지 해상도/글자 크기와 관계없이 비슷하게 동작)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        img_h, img_w = binary.shape[:2]
+        glyphs = [s for s in stats[1:count] if s[4] >= 4]
+        grouping = np.zeros_like(binary)
+        for x, y, w, h, _ in glyphs:
+            pad_x, pad_y = int(h * 0.6) + 1, int(h * 0.15)
+            cv2.rectangle(grouping, (max(0, x - pad_x), max(0, y - pad_y)),
+                          (min(img_w - 1, x + w + pad_x), min(img_h - 1, y + h + pad_y)), 255, -1)
+        _, group_labels = cv2.connectedComponents(grouping, connectivity=8)
+
+        groups = {}
+        for x, y, w, h, _ in glyphs:
+            label = group_labels[y + h // 2, x + w // 2]
+            x0, y0, x1, y1 = groups.get(label, (x, y, x + w, y + h))
+            groups[label] = (min(x0, x), min(y0, y), max(x1, x + w), max(y1, y + h))
+
+        boxes = []
+        for x0, y0, x1, y1 in groups.values():
+            w, h = x1 - x0, y1 - y0
+            if w * h < self.min_area or h < 6:
+                continue
+            boxes.append((int(y0), int(x0), int(w), int(h)))
+
+        boxes = np.array(sorted(boxes), dtype=np.int32).reshape(-1, 4)
+        y, x, w, h = boxes.T
+        polygons = np.stack([np.stack([x, y], axis=1), np.stack([x + w, y], axis=1),
+                             np.stack([x + w, y + h], axis=1), np.stack([x, y + h], axis=1)], axis=1)
+        return RegionBatch(polygons, [f"text {i + 1}" for i in range(len(boxes))], np.full(len(boxes), 0.99))
+
+
+class StubTranslator:
+    """
+    네트워크 없이 결정적으로 '번역'하는 Translator 대체 구현입니다. (원문 앞에 [언어] 접두어)
+    latency: translate_batch 호출당 지연(초), 실제 API의 한 번 왕복을 흉내 냅니다.
+    """
+
+    def __init__(self, latency=0.0, target_lang="Japanese"):
+        self.latency = latency
+        self.target_lang = target_lang
+        self.cache = None
+        self.calls = 0
+
+    def _fake(self, text, target_lang=None):
+        return f"[{(target_lang or self.target_lang)[:2].upper()}] {text}"
+
+    def translate(self, text, context_glossary=None, target_lang=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._fake(text, target_lang)
+
+    def translate_batch(self, texts, target_lang=None):
+        texts = list(texts)
+        if not texts:
+            return []
+        self.calls += 1
+        time.sleep(self.latency)
+        return [self._fake(text, target_lang) for text in texts]
+
+    def analyze_and_translate(self, image_crop, text):
+        return {
+            'translated_text': self.translate(text),
+            'style_prompt': "High quality text, clean font, professional design"
+        }
+
+
+class StubInpainter(Inpainter):
+    """
+    원격 Inpainting API 대신 쓰는 로컬 구현입니다. (cv2 TELEA + 선택적 지연)
+    """
+
+    def __init__(self, latency=0.0, latency_per_mp=0.0):
+        self.latency = latency
+        self.latency_per_mp = latency_per_mp
+
+    def inpaint(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        time.sleep(self.latency + self.latency_per_mp * image.shape[0] * image.shape[1] / 1e6)
+        return cv2.inpaint(image, mask, 3, cv2.INPAINT_TELEA)
+
+
+def stub_latency(name, default=0.0):
+    """
+    STUB_<NAME>_LATENCY 환경 변수로 스텁 지연을 설정합니다.
+    """
+    return float(os.getenv(f"STUB_{name.upper()}_LATENCY", default))
@@ -0,0 +1,268 @@
+import os
+import sys
+import json
+import time
+import uuid
+import bisect
+import threading
+from contextlib import contextmanager
+
+# 지연 시간 히스토그램 버킷 경계 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _proc_status_bytes(field):
+    """
+    /proc/self/status의 메모리 항목(kB)을 bytes로 읽습니다. (Linux가 아니면 None)
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss():
+    """
+    현재 RSS(bytes), 알 수 없으면 None
+    """
+    return _proc_status_bytes("VmRSS")
+
+
+def peak_rss():
+    """
+    프로세스 최대 RSS(bytes). reset_peak_rss() 이후의 최대값입니다. (Linux가 아니면 프로세스 시작 이후 최대값)
+    """
+    peak = _proc_status_bytes("VmHWM")
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 bytes, Linux는 kB 단위
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def reset_peak_rss():
+    """
+    최대 RSS 기록을 현재 RSS로 되돌립니다. (Linux 4.0+, 실패하면 False)
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Span:
+    def __init__(self, name, trace_id, parent_id, attrs):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attrs = dict(attrs)
+        self.start = time.time()
+        self.duration = None
+        self.rss_peak = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration": self.duration,
+            "attrs": self.attrs,
+            "thread": threading.current_thread().name,
+        }
+
+
+class Telemetry:
+    """
+    파이프라인 전체에서 공유하는 계측 레지스트리입니다.
+    - span(): 단계/영역별 구간 시간 기록 (같은 스레드 안에서 중첩되면 부모-자식으로 연결)
+    - count(): 카운터 (API 호출 수, 캐시 적중, OpenCV 폴백 등)
+    - observe(): 지연 시간 히스토그램
+    완료된 span은 등록된 exporter들에게 전달되고, 모든 span 시간은
+    span_duration_seconds{span="..."} 히스토그램에도 누적됩니다.
+
+    track_memory가 켜져 있으면 span마다 구간 중 최대 RSS를 rss_peak_mb 속성으로 남깁니다.
+    (프로세스 전체 값이므로 한 번에 이미지 하나를 처리할 때 단계별로 의미가 있음)
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.track_memory = os.getenv("TELEMETRY_TRACK_MEMORY", "0").lower() in ("1", "true", "yes")
+        self.exporters = []
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def add_exporter(self, exporter):
+        self.exporters.append(exporter)
+        return exporter
+
+    @contextmanager
+    def span(self, name, **attrs):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = stack[-1] if stack else None
+        span = Span(name, parent.trace_id if parent else uuid.uuid4().hex, parent.span_id if parent else None, attrs)
+        track_memory = self.track_memory
+        if track_memory:
+            self._start_memory(span, parent)
+        stack.append(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except Exception as e:
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            stack.pop()
+            if track_memory:
+                self._end_memory(span, parent)
+            self.observe("span_duration_seconds", span.duration, span=name)
+            record = span.to_dict()
+            for exporter in self.exporters:
+                exporter.export_span(record)
+
+    def _start_memory(self, span, parent):
+        # 지금까지의 최대값은 부모 구간 몫으로 넘기고, 이 구간부터 다시 측정
+        if parent is not None and parent.rss_peak is not None:
+            parent.rss_peak = max(parent.rss_peak, peak_rss() or 0)
+        reset_peak_rss()
+        span.rss_peak = current_rss() or 0
+
+    def _end_memory(self, span, parent):
+        span.rss_peak = max(span.rss_peak, peak_rss() or 0)
+        span.set(rss_peak_mb=round(span.rss_peak / 1024 ** 2, 1))
+        if parent is not None and parent.rss_peak is not None:
+            parent.rss_peak = max(parent.rss_peak, span.rss_peak)
+
+    def count(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                hist["buckets"][index] += 1
+            hist["count"] += 1
+            hist["sum"] += value
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: {"buckets": list(v["buckets"]), "count": v["count"], "sum": v["sum"]}
+                          for k, v in self._histograms.items()}
+        return counters, histograms
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def prometheus_text(self):
+        """
+        현재 카운터와 히스토그램을 Prometheus 텍스트 형식으로 반환합니다.
+        """
+        counters, histograms = self.snapshot()
+
+        def fmt_labels(pairs):
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        lines = []
+        for name in sorted({n for n, _ in counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{name}{fmt_labels(labels)} {value}")
+
+        for name in sorted({n for n, _ in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (n, labels), hist in sorted(histograms.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, bucket in zip(self.buckets, hist["buckets"]):
+                    cumulative += bucket
+                    lines.append(f"{name}_bucket{fmt_labels(labels + (('le', repr(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{fmt_labels(labels + (('le', '+Inf'),))} {hist['count']}")
+                lines.append(f"{name}_sum{fmt_labels(labels)} {hist['sum']}")
+                lines.append(f"{name}_count{fmt_labels(labels)} {hist['count']}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        for exporter in self.exporters:
+            exporter.flush(self)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+class JsonLinesExporter:
+    """
+    완료된 span을 한 줄에 하나씩 JSON으로 기록합니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export_span(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def flush(self, telemetry):
+        with self._lock:
+            self._file.flush()
+
+
+class PrometheusExporter:
+    """
+    flush() 시점의 카운터/히스토그램을 Prometheus 텍스트 형식 파일로 저장합니다.
+    (node_exporter textfile collector 등에서 읽을 수 있음)
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def export_span(self, record):
+        pass
+
+    def flush(self, telemetry):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(telemetry.prometheus_text())
+
+
+# 모든 구성 요소가 공유하는 기본 레지스트리
+telemetry = Telemetry()
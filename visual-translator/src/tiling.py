@@ -0,0 +1,218 @@
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+from src.telemetry import telemetry
+from src.geometry import merge_rects
+
+
+def make_tiles(width, height, tile_size, overlap):
+    """
+    이미지를 overlap만큼 겹치는 tile_size 크기의 타일로 나눕니다.
+    마지막 타일은 이미지 끝에 맞춰 당겨서 모든 타일이 같은 크기가 되도록 합니다.
+    Returns:
+        list[tuple]: [(x0, y0, x1, y1), ...]
+    """
+    stride = max(1, tile_size - overlap)
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size, stride))
+        return positions + [length - tile_size]
+
+    return [(x, y, min(width, x + tile_size), min(height, y + tile_size))
+            for y in starts(height) for x in starts(width)]
+
+
+def _bbox(box):
+    return (int(box[:, 0].min()), int(box[:, 1].min()), int(box[:, 0].max()), int(box[:, 1].max()))
+
+
+def polygon_overlap(a, b):
+    """
+    두 다각형(4점 박스)의 (IoU, 작은 쪽 대비 교집합 비율)을 반환합니다.
+    타일 경계에서 잘린 텍스트는 전체 텍스트 박스 안에 들어가므로 IoU가 낮아도 두 번째 값이 큽니다.
+    """
+    ax0, ay0, ax1, ay1 = _bbox(a)
+    bx0, by0, bx1, by1 = _bbox(b)
+    if ax1 <= bx0 or bx1 <= ax0 or ay1 <= by0 or by1 <= ay0:
+        return 0.0, 0.0
+
+    pa, pb = a.astype(np.float32), b.astype(np.float32)
+    area_a, area_b = abs(cv2.contourArea(pa)), abs(cv2.contourArea(pb))
+    if area_a == 0 or area_b == 0:
+        return 0.0, 0.0
+    try:
+        inter, _ = cv2.intersectConvexConvex(cv2.convexHull(pa), cv2.convexHull(pb))
+    except cv2.error:
+        inter = max(0, min(ax1, bx1) - max(ax0, bx0)) * max(0, min(ay1, by1) - max(ay0, by0))
+    return inter / (area_a + area_b - inter), inter / min(area_a, area_b)
+
+
+def merge_regions(regions, iou_threshold=0.5, containment_threshold=0.8):
+    """
+    타일 이음새에서 중복으로 감지된 영역을 polygon NMS로 제거합니다.
+    타일 경계에 걸리지 않은 영역, 그다음 면적이 큰 영역을 우선으로 남깁니다.
+    ('_clipped' 키: 타일 내부 경계에 닿은 영역 - 잘렸을 가능성이 있음)
+    """
+    order = sorted(regions, key=lambda r: (r.get('_clipped', False), -abs(cv2.contourArea(r['box'].astype(np.float32))),
+                                           -r.get('confidence', 0)))
+    kept = []
+    for region in order:
+        duplicate = False
+        for other in kept:
+            iou, containment = polygon_overlap(region['box'], other['box'])
+            if iou >= iou_threshold or containment >= containment_threshold:
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(region)
+
+    for region in kept:
+        region.pop('_clipped', None)
+    # 원래 읽기 순서(위→아래, 왼→오른쪽)로 정렬
+    kept.sort(key=lambda r: (int(r['box'][:, 1].min()), int(r['box'][:, 0].min())))
+    return kept
+
+
+def _detect_crops(image, rects, detect_batch, batch_size, max_workers):
+    """
+    이미지에서 rects 영역을 잘라 batch_size개씩 detect_batch로 감지하고, 좌표를 전체 이미지 기준으로 되돌립니다.
+    """
+    height, width = image.shape[:2]
+    chunks = [rects[i:i + batch_size] for i in range(0, len(rects), batch_size)]
+
+    def run(chunk):
+        crops = [np.ascontiguousarray(image[y0:y1, x0:x1]) for x0, y0, x1, y1 in chunk]
+        return chunk, detect_batch(crops)
+
+    if max_workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(run, chunks))
+    else:
+        results = [run(chunk) for chunk in chunks]
+
+    regions = []
+    for chunk, chunk_results in results:
+        for (x0, y0, x1, y1), crop_regions in zip(chunk, chunk_results):
+            for region in crop_regions:
+                box = region['box'] + np.array([x0, y0], dtype=np.int32)
+                bx0, by0, bx1, by1 = _bbox(box)
+                # 이미지 바깥쪽 경계가 아닌, 타일 안쪽 경계에 닿았으면 잘렸을 수 있음
+                clipped = ((bx0 <= x0 + 1 and x0 > 0) or (by0 <= y0 + 1 and y0 > 0) or
+                           (bx1 >= x1 - 1 and x1 < width) or (by1 >= y1 - 1 and y1 < height))
+                regions.append(dict(region, box=box, _clipped=clipped))
+    return regions
+
+
+def _seam_rects(regions, width, height, padding):
+    """
+    타일 경계에서 잘린 조각끼리(같은 줄에서 서로 겹치는 경우) 묶어, 다시 감지할 영역을 만듭니다.
+    겹침 폭보다 긴 텍스트 줄은 양쪽 타일에 조각으로만 잡히므로 NMS만으로는 합칠 수 없습니다.
+    Returns:
+        list[tuple]: [(rect, [조각 인덱스, ...]), ...]
+    """
+    clipped = [i for i, r in enumerate(regions) if r.get('_clipped')]
+    boxes = {i: _bbox(regions[i]['box']) for i in clipped}
+    parent = {i: i for i in clipped}
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a_idx, a in enumerate(clipped):
+        for b in clipped[a_idx + 1:]:
+            ax0, ay0, ax1, ay1 = boxes[a]
+            bx0, by0, bx1, by1 = boxes[b]
+            overlap_y = min(ay1, by1) - max(ay0, by0)
+            if min(ax1, bx1) > max(ax0, bx0) and overlap_y >= 0.5 * min(ay1 - ay0, by1 - by0):
+                parent[find(a)] = find(b)
+
+    groups = {}
+    for i in clipped:
+        groups.setdefault(find(i), []).append(i)
+
+    result = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        x0 = min(boxes[i][0] for i in members)
+        y0 = min(boxes[i][1] for i in members)
+        x1 = max(boxes[i][2] for i in members)
+        y1 = max(boxes[i][3] for i in members)
+        rect = (max(0, x0 - padding), max(0, y0 - padding), min(width, x1 + padding), min(height, y1 + padding))
+        result.append((rect, members))
+    return result
+
+
+def _candidate_rects(regions, padding, width, height):
+    """
+    저해상도 감지 결과 주변을 padding만큼 넓히고, 겹치는 영역끼리 합쳐 정밀 감지할 후보 영역을 만듭니다.
+    """
+    rects = []
+    for region in regions:
+        x0, y0, x1, y1 = _bbox(region['box'])
+        rects.append((max(0, x0 - padding), max(0, y0 - padding), min(width, x1 + padding), min(height, y1 + padding)))
+    return merge_rects(rects)
+
+
+def detect_tiled(image, detect_batch, tile_size=1280, overlap=160, batch_size=4, max_workers=1,
+                 coarse_to_fine=False, coarse_padding=32, iou_threshold=0.5):
+    """
+    큰 이미지를 겹치는 타일로 나눠 감지한 뒤, 전체 좌표로 되돌리고 이음새 중복을 합칩니다.
+
+    Args:
+        image: BGR 이미지 (np.ndarray)
+        detect_batch: 이미지 리스트를 받아 이미지별 감지 결과 리스트를 돌려주는 함수
+        tile_size / overlap: 타일 한 변 길이와 겹침 폭 (가장 긴 텍스트 줄 높이보다 크게)
+        batch_size: detect_batch 한 번에 넘길 타일 수
+        max_workers: 타일 묶음 병렬 처리 스레드 수
+        coarse_to_fine: True면 축소 이미지로 먼저 감지한 뒤 후보 영역만 원본 해상도로 다시 감지
+            (텍스트가 드문 이미지에서 빠르지만, 축소 시 사라지는 아주 작은 글자는 놓칠 수 있음)
+    """
+    height, width = image.shape[:2]
+
+    if not coarse_to_fine:
+        rects = make_tiles(width, height, tile_size, overlap)
+        with telemetry.span("detector.tiled", tiles=len(rects), width=width, height=height) as span:
+            regions = _detect_crops(image, rects, detect_batch, batch_size, max_workers)
+
+            # 이음새에 걸친 긴 텍스트 줄은 조각들을 합친 영역에서 한 번 더 감지
+            seams = _seam_rects(regions, width, height, padding=overlap // 4)
+            if seams:
+                stitched = _detect_crops(image, [rect for rect, _ in seams], detect_batch, batch_size, max_workers)
+                replaced = {i for _, members in seams for i in members}
+                regions = [r for i, r in enumerate(regions) if i not in replaced] + \
+                          [dict(r, _clipped=False) for r in stitched]
+            span.set(seams=len(seams))
+
+            merged = merge_regions(regions, iou_threshold)
+        telemetry.count("detector_tiles_total", len(rects) + len(seams))
+        telemetry.count("detector_tile_duplicates_total", len(regions) - len(merged))
+        return merged
+
+    with telemetry.span("detector.coarse_to_fine", width=width, height=height) as span:
+        scale = tile_size / max(width, height)
+        small = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+        coarse = detect_batch([small])[0]
+        for region in coarse:
+            region['box'] = np.round(region['box'] / scale).astype(np.int32)
+
+        # 후보 영역이 타일보다 크면 다시 타일로 나눔
+        rects = []
+        for x0, y0, x1, y1 in _candidate_rects(coarse, coarse_padding, width, height):
+            for tx0, ty0, tx1, ty1 in make_tiles(x1 - x0, y1 - y0, tile_size, overlap):
+                rects.append((x0 + tx0, y0 + ty0, x0 + tx1, y0 + ty1))
+        span.set(coarse_regions=len(coarse), candidates=len(rects))
+
+        fine = _detect_crops(image, rects, detect_batch, batch_size, max_workers)
+
+        # 정밀 감지에서 아무것도 찾지 못한 저해상도 결과는 그대로 유지
+        for region in coarse:
+            if not any(polygon_overlap(region['box'], f['box'])[1] > 0.3 for f in fine):
+                fine.append(dict(region, _clipped=True))
+        merged = merge_regions(fine, iou_threshold)
+    telemetry.count("detector_tiles_total", len(rects) + 1)
+    return merged
@@ -0,0 +1,214 @@
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from dotenv import load_dotenv
+from src.telemetry import telemetry
+
+load_dotenv()
+
+# 요청이 백엔드의 이 분위수(기본 p95) 지연보다 오래 걸리면 다음 백엔드에도 같은 요청을 보냄 (0이면 hedging 사용 안 함)
+HEDGE_PERCENTILE = float(os.getenv("TRANSLATE_HEDGE_PERCENTILE", "95"))
+# 분위수를 쓰기 전에 모아야 하는 성공 요청 수 (그 전에는 실패했을 때만 다음 백엔드로 넘김)
+HEDGE_MIN_SAMPLES = int(os.getenv("TRANSLATE_HEDGE_MIN_SAMPLES", "20"))
+# hedge 전에 최소한 기다릴 시간(초) - 아주 빠른 백엔드(용어집 등)를 스레드 스케줄링 지연만으로 hedge하지 않도록
+HEDGE_MIN_DELAY = float(os.getenv("TRANSLATE_HEDGE_MIN_DELAY", "0.05"))
+# 백엔드 / 요청 종류별로 기억할 최근 지연 시간 수
+LATENCY_WINDOW = int(os.getenv("TRANSLATE_LATENCY_WINDOW", "200"))
+# 연속으로 이만큼 실패한 백엔드는 FAILURE_COOLDOWN초 동안 순서를 맨 뒤로 미룸
+FAILURE_THRESHOLD = int(os.getenv("TRANSLATE_FAILURE_THRESHOLD", "3"))
+FAILURE_COOLDOWN = float(os.getenv("TRANSLATE_FAILURE_COOLDOWN", "30"))
+
+
+class LatencyTracker:
+    """
+    최근 성공 요청의 지연 시간(초)을 보관하고 분위수를 계산합니다. (여러 스레드에서 기록해도 안전)
+    """
+
+    def __init__(self, window=None):
+        self._samples = deque(maxlen=window or LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, q):
+        with self._lock:
+            samples = list(self._samples)
+        return float(np.percentile(samples, q)) if samples else None
+
+
+class BackendRouter:
+    """
+    여러 번역 백엔드(TranslationBackend)에 요청을 나눠 보냅니다.
+    - 설정 순서대로 첫 번째 백엔드에 보내고, 실패하거나 일부 항목만 번역하면 남은 항목을 다음 백엔드로 보냄
+    - 응답이 그 백엔드의 p95(hedge_percentile) 지연보다 늦으면 다음 백엔드에도 보내고 먼저 온 답을 씀 (hedging)
+      (늦은 요청은 취소하지 않고 끝까지 받아 지연 통계에만 반영)
+    - 연속으로 실패하는 백엔드는 잠시 맨 뒤로 미룸
+    백엔드 / 요청 종류(batch / single)별 지연 분위수와 hedging 결과는 stats()로 확인합니다.
+    """
+
+    def __init__(self, backends, hedge_percentile=None, min_samples=None, max_workers=8):
+        self.backends = list(backends)
+        self.hedge_percentile = HEDGE_PERCENTILE if hedge_percentile is None else hedge_percentile
+        self.min_samples = HEDGE_MIN_SAMPLES if min_samples is None else min_samples
+        self._latency = {}
+        self._counts = {backend: {'requests': 0, 'errors': 0, 'hedges': 0, 'wins': 0} for backend in self.backends}
+        self._failures = {backend: (0, 0.0) for backend in self.backends}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translate-backend")
+
+    def __bool__(self):
+        return bool(self.backends)
+
+    def latency(self, backend, kind):
+        with self._lock:
+            if (backend, kind) not in self._latency:
+                self._latency[(backend, kind)] = LatencyTracker()
+            return self._latency[(backend, kind)]
+
+    def hedge_delay(self, backend, kind):
+        """
+        이 시간(초)이 지나도 응답이 없으면 다음 백엔드에도 보냄 (샘플이 부족하거나 hedging을 끄면 None)
+        """
+        if not self.hedge_percentile:
+            return None
+        tracker = self.latency(backend, kind)
+        if len(tracker) < self.min_samples:
+            return None
+        return max(HEDGE_MIN_DELAY, tracker.percentile(self.hedge_percentile))
+
+    def _ordered(self):
+        """
+        백엔드 순서: 설정 순서를 따르되, 연속 실패로 쉬는 중인 백엔드는 맨 뒤로
+        """
+        now = time.monotonic()
+        with self._lock:
+            cooling = {b for b, (failures, until) in self._failures.items() if failures >= FAILURE_THRESHOLD and until > now}
+        return [b for b in self.backends if b not in cooling] + [b for b in self.backends if b in cooling]
+
+    def _call(self, backend, texts, target_lang, kind):
+        start = time.perf_counter()
+        with self._lock:
+            self._counts[backend]['requests'] += 1
+        try:
+            with telemetry.span("translator.backend", backend=backend.name, kind=kind, texts=len(texts)):
+                if kind == "single":
+                    result = backend.translate_one(texts[0], target_lang)
+                    results = {} if result is None else {0: result}
+                else:
+                    results = backend.translate_batch(texts, target_lang)
+        except Exception as e:
+            with self._lock:
+                self._counts[backend]['errors'] += 1
+                failures = self._failures[backend][0] + 1
+                self._failures[backend] = (failures, time.monotonic() + FAILURE_COOLDOWN)
+            telemetry.count("translator_backend_errors_total", backend=backend.name, kind=kind, error=type(e).__name__)
+            print(f"[Translator] {backend.name} {kind} request failed: {type(e).__name__}: {e}")
+            raise
+        self.latency(backend, kind).add(time.perf_counter() - start)
+        with self._lock:
+            self._failures[backend] = (0, 0.0)
+        return results
+
+    def translate(self, texts, target_lang, kind="batch"):
+        """
+        texts를 번역합니다. (kind="single"이면 텍스트 하나를 개별 프롬프트로)
+        Returns: ({index: 번역문}, {index: 답한 백엔드}) - 모든 백엔드가 번역하지 못한 항목은 빠짐
+        """
+        texts = list(texts)
+        results, sources = {}, {}
+        queue = self._ordered()
+        # future → [백엔드, 보낸 항목 번호, 시작 시각, hedge로 보낸 요청인지, 이미 hedge했는지]
+        in_flight = {}
+
+        def launch(hedge=False):
+            backend = queue.pop(0)
+            indices = [i for i in range(len(texts)) if i not in results]
+            future = self._executor.submit(self._call, backend, [texts[i] for i in indices], target_lang, kind)
+            in_flight[future] = [backend, indices, time.perf_counter(), hedge, False]
+
+        launch()
+        while in_flight and len(results) < len(texts):
+            timeout = None
+            if queue:
+                # 아직 hedge하지 않은 요청 중 가장 먼저 p95를 넘기는 시각까지 기다림
+                deadlines = []
+                for backend, _, started, _, hedged in in_flight.values():
+                    delay = None if hedged else self.hedge_delay(backend, kind)
+                    if delay is not None:
+                        deadlines.append(started + delay)
+                if deadlines:
+                    timeout = max(0.0, min(deadlines) - time.perf_counter())
+            done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                now = time.perf_counter()
+                expired = False
+                for entry in in_flight.values():
+                    backend, _, started, _, hedged = entry
+                    delay = None if hedged else self.hedge_delay(backend, kind)
+                    if delay is not None and now >= started + delay:
+                        entry[4] = expired = True
+                        with self._lock:
+                            self._counts[backend]['hedges'] += 1
+                        telemetry.count("translator_hedges_total", backend=backend.name, kind=kind)
+                if expired:
+                    launch(hedge=True)
+                continue
+
+            for future in done:
+                backend, indices, _, hedge, _ = in_flight.pop(future)
+                try:
+                    partial = future.result()
+                except Exception:
+                    partial = {}
+                answered = 0
+                for j, value in partial.items():
+                    if 0 <= j < len(indices) and indices[j] not in results:
+                        results[indices[j]] = value
+                        sources[indices[j]] = backend
+                        answered += 1
+                if hedge and answered:
+                    with self._lock:
+                        self._counts[backend]['wins'] += 1
+                    telemetry.count("translator_hedge_wins_total", backend=backend.name, kind=kind)
+
+            # 진행 중인 요청이 모두 끝났는데 남은 항목이 있으면 다음 백엔드로 (실패 / 일부만 번역)
+            if not in_flight and queue and len(results) < len(texts):
+                launch()
+        return results, sources
+
+    def translate_one(self, text, target_lang):
+        """
+        Returns: (번역문 또는 None, 답한 백엔드 또는 None)
+        """
+        results, sources = self.translate([text], target_lang, kind="single")
+        return results.get(0), sources.get(0)
+
+    def stats(self):
+        """
+        백엔드별 요청/오류/hedge/hedge 승리 수와 요청 종류별 지연 분위수 (ms)
+        """
+        with self._lock:
+            counts = {backend: dict(values) for backend, values in self._counts.items()}
+            trackers = dict(self._latency)
+        stats = {}
+        for backend in self.backends:
+            entry = counts[backend]
+            for (owner, kind), tracker in trackers.items():
+                if owner is backend and len(tracker):
+                    entry[kind] = {
+                        'samples': len(tracker),
+                        'p50_ms': tracker.percentile(50) * 1000,
+                        'p95_ms': tracker.percentile(95) * 1000,
+                        'p99_ms': tracker.percentile(99) * 1000,
+                    }
+            stats[backend.name] = entry
+        return stats
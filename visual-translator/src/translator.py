@@ -1,73 +1,427 @@
 import os
-import openai
+import threading
+import json
+import time
+import random
+from abc import ABC, abstractmethod
+from urllib.parse import urlparse
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from src.cache import TranslationCache
+from src.telemetry import telemetry
+from src.translation_router import BackendRouter
 
 load_dotenv()
 
-class Translator:
-    def __init__(self):
-        # OpenAI 설정
-        api_key = os.getenv("OPENAI_API_KEY")
-        if api_key:
-            self.client = openai.OpenAI(api_key=api_key)
-            # OpenAI 모델 설정 (GPT-4o 사용 권장)
-            self.model_name = "gpt-4o" 
-            print(f"Translator initialized with model: {self.model_name}") 
-        else:
-            self.client = None
-            print("Warning: OPENAI_API_KEY not found. Translation will be skipped.")
-        
-        self.retriever = None
+# 배치 요청 한 번에 담을 입력 토큰 예산 (대략적인 추정치 기준)
+BATCH_TOKEN_BUDGET = int(os.getenv("TRANSLATE_BATCH_TOKENS", "1500"))
+
+# 동시 요청 수 / 요청당 타임아웃(초) / 재시도 횟수
+MAX_CONCURRENCY = int(os.getenv("TRANSLATE_CONCURRENCY", "4"))
+REQUEST_TIMEOUT = float(os.getenv("TRANSLATE_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("TRANSLATE_MAX_RETRIES", "3"))
+
+# 번역 백엔드 (쉼표로 구분, 앞에 있을수록 먼저 사용)
+#   openai: OPENAI_API_KEY / OPENAI_BASE_URL 의 OpenAI API
+#   glossary: GLOSSARY_PATH 용어집 (오프라인)
+#   http(s)://host/v1#model: OpenAI 호환 서버 (vLLM, Ollama, llama.cpp 등 로컬 모델 포함)
+TRANSLATE_BACKENDS = os.getenv("TRANSLATE_BACKENDS", "openai")
+TRANSLATE_MODEL = os.getenv("TRANSLATE_MODEL", "gpt-4o")
+
+
+def _retryable_errors():
+    """
+    재시도할 오류 (429, 5xx, 타임아웃, 연결 오류)
+    openai는 import 비용이 커서 실제로 요청할 때 불러옵니다.
+    """
+    import openai
+    return (
+        openai.RateLimitError,
+        openai.InternalServerError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+    )
+
+# 프롬프트 문구를 바꾸면 이 값을 올려서 이전 캐시 항목이 재사용되지 않도록 합니다.
+PROMPT_VERSION = "v1"
+
+
+def _estimate_tokens(text):
+    """
+    토크나이저 없이 토큰 수를 대략 추정합니다.
+    (한/중/일 문자는 글자당 약 1토큰, 라틴 문자는 4글자당 약 1토큰)
+    """
+    wide = sum(1 for ch in text if ord(ch) > 0x2E80)
+    return wide + (len(text) - wide) // 4 + 1
+
 
-    def translate(self, text, context_glossary=None):
+def _clean(content):
+    return content.strip().replace('`', '').replace('"', '').replace("'", "")
+
+
+def _retry_delay(error, attempt):
+    """
+    재시도 전 대기 시간을 계산합니다.
+    서버가 Retry-After 헤더를 주면 그 값을 따르고, 없으면 지수 백오프 + 지터를 사용합니다.
+    """
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), 60.0)
+        except ValueError:
+            try:
+                return min(max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()), 60.0)
+            except (TypeError, ValueError):
+                pass
+    return min(0.5 * (2 ** attempt) + random.uniform(0, 0.25), 30.0)
+
+
+class TranslationBackend(ABC):
+    """
+    번역 백엔드 공통 인터페이스 (OpenAI 호환 HTTP / 오프라인 용어집 등)
+    요청 자체가 실패하면 예외를 올리고, 번역하지 못한 항목은 결과에서 뺍니다.
+    (BackendRouter가 실패/빠진 항목을 다음 백엔드로 넘김)
+    """
+    name = "base"
+    # 이 백엔드의 번역을 영구 번역 캐시에 저장할지 (빠른 로컬 백엔드는 저장할 필요 없음)
+    cacheable = True
+
+    @abstractmethod
+    def translate_batch(self, texts, target_lang):
         """
-        텍스트를 일본어로 번역합니다.
+        Returns: {index: 번역문} - 번역하지 못한 항목은 빠짐
         """
-        
-        if not self.client:
-            return text
+        pass
 
+    def translate_one(self, text, target_lang):
+        """
+        Returns: 번역문 또는 None
+        """
+        return self.translate_batch([text], target_lang).get(0)
+
+    def cache_identity(self):
+        """
+        번역 캐시 키에 들어가는 백엔드 설정 (바뀌면 캐시된 번역을 쓰지 않음)
+        """
+        return self.name
+
+
+class OpenAIBackend(TranslationBackend):
+    """
+    OpenAI Chat Completions API (또는 같은 API를 제공하는 서버)로 번역합니다.
+    """
+
+    def __init__(self, api_key, base_url=None, model=None, name=None, timeout=None, max_retries=None):
+        import openai
+
+        # 하나의 클라이언트(커넥션 풀)를 모든 스레드가 공유합니다.
+        # 재시도는 _create()에서 직접 처리하므로 SDK 재시도는 끕니다.
+        # (base_url이 없으면 OPENAI_BASE_URL 환경 변수로 로컬 스텁 서버를 가리킬 수 있습니다)
+        self.client = openai.OpenAI(api_key=api_key, base_url=base_url,
+                                    timeout=REQUEST_TIMEOUT if timeout is None else timeout, max_retries=0)
+        # OpenAI 모델 설정 (GPT-4o 사용 권장)
+        self.model_name = model or TRANSLATE_MODEL
+        self.name = name or "openai"
+        self.max_retries = MAX_RETRIES if max_retries is None else max_retries
+
+    def cache_identity(self):
+        return self.model_name
+
+    def _create(self, kind, **kwargs):
+        """
+        chat.completions.create 호출에 429/5xx/타임아웃 재시도(백오프)를 적용합니다.
+        """
+        retryable = _retryable_errors()
+        attempt = 0
+        while True:
+            telemetry.count("translator_api_calls_total", kind=kind, backend=self.name)
+            try:
+                with telemetry.span("translator.request", kind=kind, model=self.model_name, attempt=attempt):
+                    return self.client.chat.completions.create(**kwargs)
+            except retryable as e:
+                if attempt >= self.max_retries:
+                    raise
+                telemetry.count("translator_retries_total", kind=kind, error=type(e).__name__)
+                delay = _retry_delay(e, attempt)
+                print(f"[Translator] {type(e).__name__}, retrying in {delay:.2f}s ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+                attempt += 1
+
+    def translate_one(self, text, target_lang):
+        """
+        한 개의 텍스트를 번역 요청합니다.
+        """
         # 기본 프롬프트
         prompt = f"""You are a professional translator.
-        Translate the following text into Japanese.
-        
+        Translate the following text into {target_lang}.
+
         Rules:
-        1. Output ONLY the translated text. 
+        1. Output ONLY the translated text.
         2. Do not add any explanations, notes, or punctuation that wasn't in the original.
         3. If the text is heavily broken or untranslatable, return the original text.
         4. Keep it short and fit for a poster.
-        
+
         Original Text:
         {text}
-        
+
         Translation:"""
-        
+
+        response = self._create(
+            "single",
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": "You are a helpful translator."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=100
+        )
+        return _clean(response.choices[0].message.content)
+
+    def translate_batch(self, texts, target_lang):
+        """
+        번호가 매겨진 JSON 객체로 묶음 번역을 요청하고 {index: 번역문} 딕셔너리를 반환합니다.
+        응답을 파싱하지 못한 항목은 빠집니다.
+        """
+        payload = json.dumps({str(i): text for i, text in enumerate(texts)}, ensure_ascii=False)
+        prompt = f"""You are a professional translator.
+        Translate every value of the following JSON object into {target_lang}.
+
+        Rules:
+        1. Output ONLY a JSON object with exactly the same keys.
+        2. Do not add any explanations, notes, or punctuation that wasn't in the original.
+        3. If a text is heavily broken or untranslatable, keep the original text as its value.
+        4. Keep it short and fit for a poster.
+
+        Input:
+        {payload}"""
+
+        response = self._create(
+            "batch",
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": "You are a helpful translator."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            max_tokens=max(100, sum(_estimate_tokens(t) for t in texts) * 3)
+        )
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "You are a helpful translator."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=100
-            )
-            cleaned = response.choices[0].message.content.strip().replace('`', '').replace('"', '').replace("'", "")
-            return cleaned
-        except Exception as e:
-            print(f"Translation Error with OpenAI: {e}")
+            data = json.loads(response.choices[0].message.content)
+        except (TypeError, ValueError):
+            return {}
+
+        if not isinstance(data, dict):
+            return {}
+
+        results = {}
+        for i in range(len(texts)):
+            value = data.get(str(i))
+            if isinstance(value, str) and value.strip():
+                results[i] = _clean(value)
+        return results
+
+
+def create_backends(spec=None):
+    """
+    TRANSLATE_BACKENDS(또는 spec) 설정으로 번역 백엔드 리스트를 만듭니다.
+    설정이 빠진 백엔드(API 키 / 용어집 경로 없음)는 경고만 출력하고 건너뜁니다.
+    """
+    backends = []
+    for entry in (spec or TRANSLATE_BACKENDS).split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if entry == "openai":
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                print("Warning: OPENAI_API_KEY not found. Skipping the openai translation backend.")
+                continue
+            backends.append(OpenAIBackend(api_key))
+        elif entry == "glossary":
+            from src.glossary import GlossaryBackend, GLOSSARY_PATH
+            if not GLOSSARY_PATH:
+                print("Warning: GLOSSARY_PATH not set. Skipping the glossary translation backend.")
+                continue
+            backends.append(GlossaryBackend.from_path(GLOSSARY_PATH))
+        elif entry.startswith(("http://", "https://")):
+            # http://127.0.0.1:8000/v1#qwen2.5-7b-instruct (키는 TRANSLATE_FALLBACK_API_KEY, 로컬 서버는 아무 값)
+            base_url, _, model = entry.partition("#")
+            api_key = os.getenv("TRANSLATE_FALLBACK_API_KEY") or os.getenv("OPENAI_API_KEY") or "local"
+            backends.append(OpenAIBackend(api_key, base_url=base_url, model=model or None, name=urlparse(base_url).netloc))
+        else:
+            raise ValueError(f"Unknown translation backend: {entry} (expected 'openai', 'glossary' or an http(s) URL)")
+    return backends
+
+
+class Translator:
+    def __init__(self, cache=None, backends=None, router=None):
+        # 번역 백엔드 (없으면 TRANSLATE_BACKENDS 설정으로 생성)
+        # 여러 개면 BackendRouter가 실패 시 다음 백엔드로 넘기고, 느린 요청은 다음 백엔드에도 보냄(hedging)
+        if router is None:
+            backends = create_backends() if backends is None else list(backends)
+            router = BackendRouter(backends, max_workers=max(4, MAX_CONCURRENCY * 4)) if backends else None
+        self.router = router
+        if router:
+            # 캐시 키는 캐시하는 첫 번째(주) 백엔드 기준 (OpenAI는 모델 이름이라 기존 캐시 그대로 사용)
+            # 보조 백엔드가 대신 답한 번역은 주 백엔드의 번역으로 저장하지 않음 (_cache_put)
+            self._cache_backend = next((b for b in router.backends if b.cacheable), router.backends[0])
+            self.model_name = self._cache_backend.cache_identity()
+            if len(router.backends) == 1:
+                print(f"Translator initialized with model: {self.model_name}")
+            else:
+                print(f"Translator initialized with backends: {', '.join(b.name for b in router.backends)}")
+        else:
+            self._cache_backend = None
+            self.model_name = None
+            print("Warning: No translation backend available. Translation will be skipped.")
+
+        self.retriever = None
+        # 기본 대상 언어 (translate/translate_batch의 target_lang 인자로 요청마다 바꿀 수 있음)
+        self.target_lang = os.getenv("TARGET_LANG", "Japanese")
+        self.batch_token_budget = BATCH_TOKEN_BUDGET
+        self.max_concurrency = MAX_CONCURRENCY
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        # 영구 번역 캐시 (TRANSLATION_CACHE_PATH="" 이면 비활성화)
+        self.cache = cache if cache is not None else TranslationCache.from_env()
+
+    def _cache_key(self, text, target_lang=None):
+        return TranslationCache.make_key(text, target_lang or self.target_lang, getattr(self, "model_name", None),
+                                         PROMPT_VERSION)
+
+    def _cache_get(self, text, target_lang=None):
+        if not self.cache:
+            return None
+        cached = self.cache.get(self._cache_key(text, target_lang))
+        telemetry.count("translator_cache_hits_total" if cached is not None else "translator_cache_misses_total")
+        return cached
+
+    def _cache_put(self, text, translated, target_lang=None, backend=None):
+        # 캐시 키의 주인인 백엔드가 답한 번역만 저장 (용어집 / 실패·hedge로 대신 답한 백엔드의 번역은 저장하지 않음)
+        if self.cache and (backend is None or (backend.cacheable and backend is getattr(self, "_cache_backend", None))):
+            self.cache.put(self._cache_key(text, target_lang), translated)
+
+    def _get_executor(self):
+        # 서비스 모드에서는 여러 작업 스레드가 동시에 번역하므로 풀은 한 번만 만듦
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=max(1, self.max_concurrency), thread_name_prefix="translate")
+        return self._executor
+
+    def _map(self, fn, items):
+        """
+        최대 max_concurrency개의 요청을 동시에 실행하고, 입력 순서대로 결과를 반환합니다.
+        """
+        items = list(items)
+        if len(items) <= 1 or self.max_concurrency <= 1:
+            return [fn(item) for item in items]
+        return list(self._get_executor().map(fn, items))
+
+    def translate(self, text, context_glossary=None, target_lang=None):
+        """
+        텍스트를 target_lang(없으면 self.target_lang)으로 번역합니다.
+        캐시에 있으면 API를 호출하지 않고, 성공한 번역만 캐시에 저장합니다.
+        """
+
+        if not self.router:
             return text
 
+        target_lang = target_lang or self.target_lang
+        cached = self._cache_get(text, target_lang)
+        if cached is not None:
+            return cached
+
+        translated, backend = self.router.translate_one(text, target_lang)
+        if translated is None:
+            self._untranslated([text])
+            return text
+        self._cache_put(text, translated, target_lang, backend)
+        return translated
+
+    def translate_batch(self, texts, target_lang=None):
+        """
+        여러 텍스트를 한 번(또는 몇 번)의 요청으로 target_lang(없으면 self.target_lang)으로 번역합니다.
+        - 동일한 문자열은 한 번만 번역합니다.
+        - 토큰 예산(batch_token_budget)에 맞춰 요청을 나누고, 나뉜 요청은 동시에 보냅니다.
+        - 캐시에 있는 항목은 요청하지 않고, 파싱하지 못한 항목만 개별 재시도합니다.
+        - 모든 백엔드가 실패한 항목은 원문을 그대로 돌려주고 경고를 출력합니다.
+        Returns:
+            list[str]: 입력 순서와 동일한 번역 결과
+        """
+        texts = list(texts)
+        if not self.router or not texts:
+            return texts
+
+        target_lang = target_lang or self.target_lang
+        # 1. 중복 제거 (입력 순서 유지) 후 캐시에 있는 항목은 제외
+        translated = {}
+        pending = []
+        for text in dict.fromkeys(texts):
+            cached = self._cache_get(text, target_lang)
+            if cached is not None:
+                translated[text] = cached
+            else:
+                pending.append(text)
+
+        # 2. 토큰 예산 단위로 묶기
+        chunks = []
+        current, current_tokens = [], 0
+        for text in pending:
+            tokens = _estimate_tokens(text)
+            if current and current_tokens + tokens > self.batch_token_budget:
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            chunks.append(current)
+
+        telemetry.count("translator_texts_total", len(texts))
+        telemetry.count("translator_unique_texts_total", len(translated) + len(pending))
+
+        # 3. 묶음별 요청(동시 실행) 후 파싱 실패 항목만 개별 번역(동시 실행)
+        failed = []
+        for chunk, (results, sources) in zip(chunks, self._map(lambda chunk: self.router.translate(chunk, target_lang), chunks)):
+            for i, text in enumerate(chunk):
+                if i in results:
+                    translated[text] = results[i]
+                    self._cache_put(text, results[i], target_lang, sources[i])
+                else:
+                    telemetry.count("translator_batch_fallbacks_total")
+                    failed.append(text)
+
+        untranslated = []
+        for text, (result, backend) in zip(failed, self._map(lambda text: self.router.translate_one(text, target_lang), failed)):
+            if result is None:
+                translated[text] = text
+                untranslated.append(text)
+            else:
+                translated[text] = result
+                self._cache_put(text, result, target_lang, backend)
+        self._untranslated(untranslated)
+
+        return [translated[text] for text in texts]
+
+    def _untranslated(self, texts):
+        if texts:
+            telemetry.count("translator_untranslated_total", len(texts))
+            print(f"[Translator] Warning: {len(texts)} texts could not be translated by any backend; keeping the source text.")
+
     def analyze_and_translate(self, image_crop, text):
         """
         이미지 조각을 분석하여 번역문과 스타일 프롬프트를 생성합니다.
         (OpenAI 마이그레이션: 현재는 텍스트 번역만 수행하고 기본 스타일을 반환합니다)
+        번역은 translate()를 거치므로 같은 영구 캐시를 공유합니다.
         """
         # 1. Translate Text
         translated = self.translate(text)
-        
+
         # 2. Default Style
         style_desc = "High quality text, clean font, professional design"
-        
+
         return {
             'translated_text': translated,
             'style_prompt': style_desc